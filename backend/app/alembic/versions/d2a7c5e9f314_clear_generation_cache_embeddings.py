@@ -0,0 +1,30 @@
+"""Clear generation cache embeddings
+
+Revision ID: d2a7c5e9f314
+Revises: b6d1f4a8c920
+Create Date: 2026-10-19 11:14:37.520694
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a7c5e9f314'
+down_revision: Union[str, None] = 'b6d1f4a8c920'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Entries were embedded with the persona and designer in the text, lookups
+    # now embed the preferences alone; the cache refills as requests come in
+    op.execute("DELETE FROM generation_cache")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    pass
@@ -0,0 +1,341 @@
+"""
+Offline bulk generation, e.g. for galleries and evaluation sets.
+
+Reads a JSONL spec, one entry per line, and generates every persona/designer
+combination it describes through GenerativeService, storing the components
+like the API does::
+
+    {"id": "signup", "userPrefferences": "dark theme", "designerIds": [1, 3], "repeat": 2}
+
+``personaIds``/``designerIds`` default to every entry of the catalog. Results
+are appended to the output JSONL as they finish, one line per item with its
+``key``; the output doubles as the checkpoint, so rerunning the same command
+after a crash or Ctrl-C skips the items already generated and retries the
+failed ones::
+
+    python -m app.bulk_generate spec.jsonl -o components.jsonl --concurrency 8 --requests-per-minute 120
+
+SIGINT/SIGTERM stop starting new items; items in flight are finished first.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import signal
+import time
+from dataclasses import asdict, dataclass
+
+import structlog
+from pydantic import Field, ValidationError
+
+from app.database import sessionmanager
+from app.errors import ObjectNotFoundError, RateLimitExceededError
+from app.models.history_meta import versioned_session
+from app.services.core.catalog import CatalogSnapshot, catalog_cache
+from app.services.core.generative import GenerativeService
+from app.services.core.prompt_bandit import prompt_bandit
+from app.services.core.rate_limiter import BucketLimit, GenerationQuota, InMemoryTokenBuckets
+from app.types.base import BaseAPISchema
+from app.types.generative import GenerativeCreate, GenerativeDetail
+
+logger = structlog.stdlib.get_logger(__name__)
+
+UNLIMITED = BucketLimit(capacity=1e12, refill_per_second=1e12)
+"""Stands in for the limit that was not set when only one of them is"""
+
+
+class BulkSpec(BaseAPISchema):
+    id: str | None = None
+    """Prefix of the item keys, the line number if omitted"""
+    user_prefferences: str = ""
+    persona_ids: list[int] | None = None
+    """Personas to generate for, every persona if omitted"""
+    designer_ids: list[int] | None = None
+    """Designers to generate for, every designer if omitted"""
+    repeat: int = Field(default=1, ge=1)
+    """Components per persona/designer pair"""
+
+
+@dataclass
+class BulkItem:
+    """One component to generate."""
+
+    key: str
+    """Stable identifier, used to resume"""
+
+    request: GenerativeCreate
+    """The generation request"""
+
+
+@dataclass
+class BulkReport:
+    """Outcome of a bulk generation run."""
+
+    items: int = 0
+    skipped: int = 0
+    """Items already generated by an earlier run"""
+    succeeded: int = 0
+    failed: int = 0
+    elapsed_seconds: float = 0.0
+    components_per_minute: float = 0.0
+    tokens: int = 0
+    latency_p50_seconds: float | None = None
+    latency_p95_seconds: float | None = None
+
+
+def expand_spec(lines: list[str], catalog: CatalogSnapshot, fresh: bool) -> list[BulkItem]:
+    """
+    Turn the spec lines into the items to generate.
+
+    Args:
+        lines (list[str]): The JSONL spec, blank lines are ignored
+        catalog (CatalogSnapshot): The personas and designers
+        fresh (bool): Whether the items skip the semantic cache and request coalescing
+
+    Returns:
+        list[BulkItem]: The items, in spec order
+
+    Raises:
+        ValueError: On a malformed line, a duplicate key or an unknown persona or designer
+    """
+    items: list[BulkItem] = []
+    keys: set[str] = set()
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            spec = BulkSpec.model_validate_json(line)
+        except ValidationError as exc:
+            raise ValueError(f"Spec line {number}: {exc}") from exc
+
+        persona_ids = spec.persona_ids if spec.persona_ids is not None else list(catalog.personas)
+        designer_ids = spec.designer_ids if spec.designer_ids is not None else list(catalog.designers)
+        try:
+            for persona_id in persona_ids:
+                catalog.persona(persona_id)
+            for designer_id in designer_ids:
+                catalog.designer(designer_id)
+        except ObjectNotFoundError as exc:
+            raise ValueError(f"Spec line {number}: {exc.message}") from exc
+
+        for persona_id in persona_ids:
+            for designer_id in designer_ids:
+                for index in range(spec.repeat):
+                    key = f"{spec.id or number}:p{persona_id}:d{designer_id}:{index}"
+                    if key in keys:
+                        raise ValueError(f"Spec line {number}: duplicate item {key}")
+                    keys.add(key)
+                    request = GenerativeCreate(
+                        user_prefferences=spec.user_prefferences,
+                        persona_id=persona_id,
+                        designer_id=designer_id,
+                        fresh=fresh,
+                    )
+                    items.append(BulkItem(key=key, request=request))
+    return items
+
+
+def load_checkpoint(path: str) -> set[str]:
+    """
+    Read the keys of the items an earlier run generated.
+
+    A line cut short by a killed run is truncated away, so appending resumes
+    on a clean line boundary.
+
+    Args:
+        path (str): The output JSONL
+
+    Returns:
+        set[str]: Keys of the succeeded items
+    """
+    if not os.path.exists(path):
+        return set()
+
+    with open(path, "rb+") as output:
+        content = output.read()
+        complete = content.rfind(b"\n") + 1
+        if complete < len(content):
+            output.truncate(complete)
+
+    done = set()
+    for line in content[:complete].decode().splitlines():
+        record = json.loads(line)
+        if record["status"] == "succeeded":
+            done.add(record["key"])
+    return done
+
+
+def build_quota(requests_per_minute: float | None, tokens_per_minute: float | None, concurrency: int) -> GenerationQuota:
+    """
+    Build the run's rate limits, reusing the API's token buckets.
+
+    Args:
+        requests_per_minute (float | None): Sustained generation rate
+        tokens_per_minute (float | None): Sustained LLM token rate
+        concurrency (int): Items in flight, the request burst
+
+    Returns:
+        GenerationQuota: The quota, admitting everything without limits
+    """
+    if requests_per_minute is None and tokens_per_minute is None:
+        return GenerationQuota(None, "bulk", UNLIMITED, UNLIMITED)
+    requests = BucketLimit(concurrency, requests_per_minute / 60) if requests_per_minute else UNLIMITED
+    tokens = BucketLimit(tokens_per_minute, tokens_per_minute / 60) if tokens_per_minute else UNLIMITED
+    return GenerationQuota(InMemoryTokenBuckets(), "bulk", requests, tokens)
+
+
+async def generate(item: BulkItem, quota: GenerationQuota, store: bool) -> GenerativeDetail:
+    """
+    Generate one item once the quota admits it.
+
+    Args:
+        item (BulkItem): The item
+        quota (GenerationQuota): The run's rate limits
+        store (bool): Whether to store the component, giving it an id
+
+    Returns:
+        GenerativeDetail: The component
+    """
+    while True:
+        try:
+            await quota.admit()
+            break
+        except RateLimitExceededError as exc:
+            await asyncio.sleep(exc.retry_after)
+
+    async with quota.metered():
+        if not store:
+            return await GenerativeService().find_or_generate_component(item.request)
+        async with sessionmanager.session() as session:
+            versioned_session(session.sync_session)  # type: ignore
+            detail = await GenerativeService(session).build_generative_component(item.request)
+            await session.commit()
+            return detail
+
+
+async def run(args: argparse.Namespace) -> BulkReport:
+    with open(args.spec) as spec:
+        lines = spec.readlines()
+    catalog = await catalog_cache.get()
+    items = expand_spec(lines, catalog, fresh=not args.reuse)
+    done = load_checkpoint(args.output)
+    pending = [item for item in items if item.key not in done]
+
+    report = BulkReport(items=len(items), skipped=len(items) - len(pending))
+    latencies: list[float] = []
+    logger.info("Bulk generation started", items=len(items), skipped=report.skipped, concurrency=args.concurrency)
+
+    quota = build_quota(args.requests_per_minute, args.tokens_per_minute, args.concurrency)
+    queue: asyncio.Queue[BulkItem] = asyncio.Queue()
+    for item in pending:
+        queue.put_nowait(item)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    started = time.perf_counter()
+    output = open(args.output, "a")
+
+    def write(record: dict[str, object]) -> None:
+        output.write(json.dumps(record) + "\n")
+        # Flushed per line, so the checkpoint is at most one item behind a crash
+        output.flush()
+
+    async def worker() -> None:
+        while not stop.is_set():
+            try:
+                item = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            item_started = time.perf_counter()
+            try:
+                detail = await generate(item, quota, store=not args.no_store)
+            except Exception as exc:
+                report.failed += 1
+                logger.warning(
+                    "Bulk item failed",
+                    key=item.key,
+                    exception_type=exc.__class__.__name__,
+                    exception_detail=str(exc),
+                )
+                write({"key": item.key, "status": "failed", "error": f"{exc.__class__.__name__}: {exc}"})
+                continue
+            seconds = time.perf_counter() - item_started
+            report.succeeded += 1
+            latencies.append(seconds)
+            if detail.usage is not None:
+                report.tokens += detail.usage.prompt_tokens + detail.usage.completion_tokens
+            write(
+                {
+                    "key": item.key,
+                    "status": "succeeded",
+                    "seconds": round(seconds, 3),
+                    "component": detail.model_dump(mode="json", by_alias=True),
+                }
+            )
+
+    async def progress() -> None:
+        while not stop.is_set():
+            await asyncio.sleep(args.report_interval)
+            elapsed = time.perf_counter() - started
+            logger.info(
+                "Bulk generation progress",
+                succeeded=report.succeeded,
+                failed=report.failed,
+                remaining=queue.qsize(),
+                components_per_minute=round(report.succeeded / elapsed * 60, 1),
+                tokens=report.tokens,
+            )
+
+    reporter = asyncio.create_task(progress())
+    try:
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    finally:
+        reporter.cancel()
+        output.close()
+        await prompt_bandit.flush()
+        await sessionmanager.close()
+
+    report.elapsed_seconds = round(time.perf_counter() - started, 1)
+    if report.elapsed_seconds:
+        report.components_per_minute = round(report.succeeded / report.elapsed_seconds * 60, 1)
+    latencies.sort()
+    for name, fraction in (("p50", 0.5), ("p95", 0.95)):
+        if latencies:
+            value = latencies[min(max(math.ceil(fraction * len(latencies)) - 1, 0), len(latencies) - 1)]
+            setattr(report, f"latency_{name}_seconds", round(value, 2))
+    if stop.is_set():
+        logger.info("Bulk generation interrupted, rerun the command to resume", remaining=queue.qsize())
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("spec", help="JSONL spec of the components to generate")
+    parser.add_argument("-o", "--output", required=True, help="JSONL results, appended to and used to resume")
+    parser.add_argument("--concurrency", type=int, default=4, help="Items generated at once")
+    parser.add_argument("--requests-per-minute", type=float, help="Sustained generation rate")
+    parser.add_argument("--tokens-per-minute", type=float, help="Sustained LLM token rate")
+    parser.add_argument("--reuse", action="store_true", help="Serve items from the semantic cache and coalesce identical ones")
+    parser.add_argument("--no-store", action="store_true", help="Do not store the components in the database")
+    parser.add_argument("--report-interval", type=float, default=10.0, help="Seconds between progress logs")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+
+    report = asyncio.run(run(args))
+
+    if args.json:
+        print(json.dumps(asdict(report), indent=2))
+    else:
+        for key, value in asdict(report).items():
+            print(f"{key:>22}: {value}")
+
+
+if __name__ == "__main__":
+    main()
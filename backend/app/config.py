@@ -1,9 +1,47 @@
+from typing import Any
+
+from pydantic import BaseModel
 from pydantic_settings import BaseSettings
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
+
+class LLMBackendSettings(BaseModel):
+    """A chat model backend the provider router can send requests to."""
+
+    name: str
+    """Unique name used in logs and statistics"""
+
+    provider: str
+    """LangChain model provider, e.g. ``openai`` or ``ollama``, or ``fake`` for FakeChatModel"""
+
+    model: str
+    """Model name at the provider"""
+
+    base_url: str | None = None
+    """Endpoint override, e.g. the Ollama server URL"""
+
+    weight: float = 1.0
+    """Share of traffic under the weighted routing policy"""
+
+    options: dict[str, Any] = {}
+    """Extra keyword arguments for the chat model, e.g. temperature or fake latency"""
+
+    batch_max_size: int = 1
+    """Concurrent calls sent together as one micro-batch, 1 disables batching.
+    Ollama receives the batch as concurrent requests, match its OLLAMA_NUM_PARALLEL; other
+    providers need a ``base_url`` whose ``/completions`` takes a list of prompts (vLLM,
+    llama.cpp server), match the server's parallel sequences (``--max-num-seqs``, ``--parallel``)"""
+
+    batch_max_wait_seconds: float = 0.01
+    """Longest a call waits for its micro-batch to fill"""
+
+    batch_prompt_format: str = "chatml"
+    """Chat template the batched prompts are rendered with, ``chatml`` or ``llama3``; unused by Ollama"""
+
+
 class Settings(BaseSettings):
     PROJECT_NAME: str = "FastAPI Backend"
     API_V1_STR: str = "/api/v1"
@@ -12,7 +50,133 @@ class Settings(BaseSettings):
     AUTH_ALGORITHM: str = "HS256"
     AUTH_ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     OPEN_API_KEY: str = ""
-    
+
+    # Maximum number of LLM calls a single process keeps in flight; extra calls queue
+    LLM_MAX_CONCURRENCY: int = 32
+    # Queue waits longer than this are logged as a warning
+    LLM_QUEUE_WAIT_WARNING_SECONDS: float = 1.0
+
+    # Chat model backends, as a JSON list in the environment, e.g.
+    # [{"name": "local", "provider": "ollama", "model": "llama3.2:3b", "base_url": "http://ollama:11434"}]
+    # Self-hosted backends can set "batch_max_size" to send concurrent calls together: Ollama as
+    # concurrent requests, vLLM or llama.cpp as one multi-prompt completions request; streamed
+    # calls are never batched, so set GENERATIVE_EARLY_ABORT_ENABLED=false to batch every
+    # attempt of a generation
+    LLM_BACKENDS: list[LLMBackendSettings] = [
+        LLMBackendSettings(name="openai", provider="openai", model="gpt-4.1-nano"),
+    ]
+    # Backend selection: "latency" (fastest healthy), "weighted" or "sticky" (same backend per persona/designer)
+    LLM_ROUTING_POLICY: str = "latency"
+    # Number of recent calls per backend used for the latency and error-rate statistics
+    LLM_ROUTING_WINDOW: int = 50
+    # A backend is taken out of rotation for the cooldown after this many consecutive failures
+    LLM_ROUTING_MAX_CONSECUTIVE_FAILURES: int = 3
+    LLM_ROUTING_COOLDOWN_SECONDS: float = 30.0
+    # Latency policy: backends without a successful call are ranked at the median latency of
+    # the others (this default when none has one), and this share of calls goes to a random
+    # other backend so that every backend's statistics stay current
+    LLM_ROUTING_DEFAULT_LATENCY_SECONDS: float = 5.0
+    LLM_ROUTING_EXPLORATION_RATE: float = 0.05
+
+    # Hedged requests: a second attempt is raced against calls slower than the
+    # HEDGING_PERCENTILE latency (or HEDGING_DELAY_SECONDS when set), for at most
+    # HEDGING_MAX_EXTRA_RATIO of the calls. Latency is counted from when the call
+    # left the local queue, up to its first token for streamed calls
+    HEDGING_ENABLED: bool = False
+    HEDGING_PERCENTILE: float = 0.9
+    HEDGING_DELAY_SECONDS: float | None = None
+    HEDGING_MIN_SAMPLES: int = 20
+    HEDGING_MAX_EXTRA_RATIO: float = 0.1
+
+    # System prompt layout: "prefix" puts the static instructions first with compact
+    # whitespace so provider prefix caching applies, "legacy" keeps the original layout
+    PROMPT_LAYOUT: str = "prefix"
+
+    # With the bandit enabled, validation and react-live outcomes are recorded per prompt
+    # variant, and requests without a seed or variant id draw each prompt dimension's option by
+    # Thompson sampling instead of uniformly. A valid completion earns a reward of 1, minus
+    # up to LATENCY_WEIGHT as its model time approaches LATENCY_TARGET_SECONDS; workers
+    # write their buffered outcomes and reload the shared ones every REFRESH_SECONDS
+    PROMPT_BANDIT_ENABLED: bool = False
+    PROMPT_BANDIT_LATENCY_WEIGHT: float = 0.2
+    PROMPT_BANDIT_LATENCY_TARGET_SECONDS: float = 30.0
+    PROMPT_BANDIT_REFRESH_SECONDS: float = 60.0
+
+    # Generation requests are cancelled, upstream call included, when the client
+    # disconnects or its X-Request-Deadline-Ms budget runs out; this caps every budget
+    REQUEST_MAX_DEADLINE_SECONDS: float | None = None
+
+    # Personas and designers are served from a per-process cache; every write bumps a
+    # version in the database, which other workers check at most this often
+    CATALOG_CACHE_CHECK_SECONDS: float = 5.0
+
+    # Background pool of pre-generated components per persona/designer pair
+    GENERATIVE_POOL_ENABLED: bool = False
+    GENERATIVE_POOL_DEPTH: int = 3
+    GENERATIVE_POOL_MAX_AGE_SECONDS: float = 3600.0
+    GENERATIVE_POOL_REFILL_CONCURRENCY: int = 2
+
+    # Batch variant generation: upper bound per request, and whether to use the
+    # provider's multi-completion support (one call, n choices) when available
+    GENERATIVE_BATCH_MAX_COUNT: int = 8
+    GENERATIVE_BATCH_MULTI_COMPLETION: bool = True
+
+    # WebSocket sessions (/generative/session) generate the next variant while the user
+    # looks at the current one, at most this many times per session; speculation is
+    # skipped while LLM calls are queueing at the concurrency gate
+    GENERATIVE_PREFETCH_BUDGET: int = 5
+
+    # Responses of at least this many bytes are gzip-compressed for clients that accept it;
+    # Server-Sent Events are never compressed, so streamed tokens are not buffered
+    RESPONSE_GZIP_MINIMUM_SIZE: int = 1024
+    RESPONSE_GZIP_LEVEL: int = 6
+
+    # Generations whose JSX cannot be repaired are regenerated at most this many times.
+    # With early abort, completions are checked while they stream and abandoned as soon
+    # as they break the contract beyond repair, instead of paying for the whole output
+    GENERATIVE_MAX_REPAIR_RETRIES: int = 2
+    GENERATIVE_EARLY_ABORT_ENABLED: bool = True
+
+    # Per-principal token-bucket quotas on generation, keyed by the authenticated user or
+    # else the client address. "memory" keeps the buckets in the process, "postgres"
+    # shares them across uvicorn workers
+    RATE_LIMIT_ENABLED: bool = False
+    RATE_LIMIT_BACKEND: str = "memory"
+    # Generation requests (one per variant for batches): sustained rate and burst size
+    RATE_LIMIT_REQUESTS_PER_MINUTE: float = 20.0
+    RATE_LIMIT_REQUEST_BURST: float = 10.0
+    # LLM tokens (prompt and completion), charged once a generation reports its usage
+    RATE_LIMIT_TOKENS_PER_MINUTE: float = 50_000.0
+    RATE_LIMIT_TOKEN_BURST: float = 100_000.0
+
+    # Asynchronous generation jobs (python -m app.worker): concurrent jobs per worker
+    # process, queue poll interval when idle, and how long a claimed job belongs to its
+    # worker before another one may take it over (e.g. after a crash)
+    GENERATION_JOB_WORKER_CONCURRENCY: int = 4
+    GENERATION_JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    GENERATION_JOB_LEASE_SECONDS: float = 300.0
+    # Failed attempts are retried until a job has been claimed this many times
+    GENERATION_JOB_MAX_ATTEMPTS: int = 3
+    # Longest a GET /generative/jobs/{id}?wait= long-poll may block
+    GENERATION_JOB_MAX_WAIT_SECONDS: float = 30.0
+
+    # Semantic response cache backed by pgvector
+    SEMANTIC_CACHE_ENABLED: bool = False
+    SEMANTIC_CACHE_SIMILARITY_THRESHOLD: float = 0.95
+
+    # Similar-component search (GET /generative/similar). New components are embedded when
+    # stored; hnsw.ef_search is the size of the HNSW candidate list, raising it improves
+    # recall at the cost of latency (see scripts/benchmark_similar.py)
+    COMPONENT_EMBEDDINGS_ENABLED: bool = False
+    COMPONENT_SEARCH_EF_SEARCH: int = 40
+    COMPONENT_SEARCH_MAX_RESULTS: int = 50
+
+    # Embeddings: "openai" or "hashing" (deterministic, local, no network)
+    EMBEDDING_PROVIDER: str = "openai"
+    EMBEDDING_MODEL: str = "text-embedding-3-small"
+    # Must match the vector columns created by the migrations
+    EMBEDDING_DIMENSIONS: int = 512
+
     def get_database_url(self) -> str:
         """
         Get the database URL from environment variables.
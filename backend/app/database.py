@@ -1,22 +1,82 @@
+import time
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
 from typing import Any, Optional
 
 from pgvector.asyncpg import register_vector
-from sqlalchemy import text
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import (
     AsyncConnection,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.config import settings
 from app.models.history_meta import versioned_session
+from app.utils.metrics import metrics
 
 # Based on https://medium.com/@tclaitken/setting-up-a-fastapi-app-with-async-sqlalchemy-2-0-pydantic-v2-e6c540be4308
 # Heavily inspired by https://praciano.com.br/fastapi-and-async-sqlalchemy-20-with-pytest-done-right.html
 
+DB_QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+"""Buckets in seconds for statements and connection checkouts, mostly well under a millisecond"""
+
+db_checkout_seconds = metrics.histogram(
+    "db_connection_checkout_seconds", "Time spent waiting for a pooled database connection", buckets=DB_QUERY_BUCKETS
+)
+db_query_seconds = metrics.histogram(
+    "db_query_duration_seconds", "Duration of database statements", buckets=DB_QUERY_BUCKETS
+)
+
+
+@dataclass
+class RequestDatabaseStats:
+    """Database work done while serving one HTTP request."""
+
+    queries: int = 0
+    """Statements executed"""
+
+    seconds: float = 0.0
+    """Accumulated statement duration"""
+
+
+request_database_stats: ContextVar[RequestDatabaseStats | None] = ContextVar("request_database_stats", default=None)
+"""Set by the metrics middleware for the duration of a request"""
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """The default async connection pool, timing how long checkouts wait for a connection."""
+
+    def _do_get(self) -> Any:
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_checkout_seconds.observe(time.perf_counter() - started)
+
+
+def _before_cursor_execute(conn: Connection, *args: Any) -> None:
+    # A connection runs one statement at a time, a failed statement is simply overwritten by the next
+    conn.info["query_started"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn: Connection, *args: Any) -> None:
+    started = conn.info.pop("query_started", None)
+    if started is None:
+        return
+    duration = time.perf_counter() - started
+    db_query_seconds.observe(duration)
+
+    stats = request_database_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += duration
+
 
 class DatabaseSessionManager:
     """
@@ -34,6 +94,8 @@ class DatabaseSessionManager:
         engine_kwargs = engine_kwargs or {}
 
         self._engine = create_async_engine(host, **engine_kwargs)
+        event.listen(self._engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(self._engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
         self._sessionmaker = async_sessionmaker(
             autocommit=False, expire_on_commit=False, bind=self._engine
         )
@@ -106,7 +168,9 @@ class DatabaseSessionManager:
             await session.close()
 
 
-sessionmanager = DatabaseSessionManager(settings.get_database_url(), {"echo": True})
+sessionmanager = DatabaseSessionManager(
+    settings.get_database_url(), {"echo": True, "poolclass": InstrumentedAsyncQueuePool}
+)
 
 
 async def get_db_session() -> AsyncIterator[AsyncSession]:
@@ -10,6 +10,7 @@ from datetime import datetime, timedelta, timezone
 
 from app.dependencies.services import UserServiceDependency
 from app.types.user import UserBase
+from app.types.enum.user_enum import UserRolesEnum
 from app.types.auth import TokenData, Token
 from app.config import settings
 from app.models import User
@@ -55,6 +56,12 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], user_s
     return user
 
 
+async def get_current_admin(user: Annotated[UserBase, Depends(get_current_user)]) -> UserBase:
+    if user.role != UserRolesEnum.admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return user
+
+
 async def login(form_data: OAuth2PasswordRequestForm, user_service: UserServiceDependency) -> Token:
     query = select(User).where(User.email == form_data.username)
     result = await user_service.db_session.execute(query)
@@ -0,0 +1,30 @@
+from typing import Annotated
+
+from fastapi import Depends, Header, Request
+
+from app.config import settings
+from app.utils.cancellation import CancellationScope
+
+
+def get_cancellation_scope(
+    request: Request,
+    x_request_deadline_ms: Annotated[int | None, Header(gt=0)] = None,
+) -> CancellationScope:
+    """Get the cancellation scope of a request.
+
+    Args:
+        request (Request): The incoming request
+        x_request_deadline_ms (int | None): Client time budget in milliseconds, from the
+            ``X-Request-Deadline-Ms`` header; capped by REQUEST_MAX_DEADLINE_SECONDS
+
+    Returns:
+        CancellationScope: Cancels the request's work on disconnect or at the deadline
+    """
+    timeout = x_request_deadline_ms / 1000 if x_request_deadline_ms is not None else None
+    if settings.REQUEST_MAX_DEADLINE_SECONDS is not None:
+        timeout = min(timeout or settings.REQUEST_MAX_DEADLINE_SECONDS, settings.REQUEST_MAX_DEADLINE_SECONDS)
+    return CancellationScope(request, timeout)
+
+
+CancellationDependency = Annotated[CancellationScope, Depends(get_cancellation_scope)]
+"""FastAPI dependency for injecting the request's CancellationScope"""
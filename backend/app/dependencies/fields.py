@@ -0,0 +1,47 @@
+from collections.abc import Callable
+from typing import Annotated
+
+from fastapi import Depends, Query
+from pydantic import BaseModel
+
+from app.types.generative import GeneratedComponentDetail, GenerativeDetail, SimilarComponentDetail
+from app.types.user import UserDetail
+from app.utils.fields import FieldSelection
+
+
+def field_selection(schema: type[BaseModel]) -> Callable[[str | None], FieldSelection]:
+    """Create a dependency parsing ``?fields=`` for a response schema.
+
+    The fields are validated before the route runs, so a typo fails fast
+    instead of after an expensive generation.
+
+    Args:
+        schema (type[BaseModel]): The schema whose fields can be selected
+
+    Returns:
+        Callable[[str | None], FieldSelection]: The FastAPI dependency
+    """
+
+    def get_field_selection(
+        fields: Annotated[
+            str | None,
+            Query(description="Comma-separated fields to return, e.g. rawComponent,personaId; all when omitted"),
+        ] = None,
+    ) -> FieldSelection:
+        return FieldSelection.parse(fields, schema)
+
+    return get_field_selection
+
+
+# FastAPI dependency annotations
+GenerativeFieldsDependency = Annotated[FieldSelection, Depends(field_selection(GenerativeDetail))]
+"""FastAPI dependency for selecting GenerativeDetail fields"""
+
+GeneratedComponentFieldsDependency = Annotated[FieldSelection, Depends(field_selection(GeneratedComponentDetail))]
+"""FastAPI dependency for selecting GeneratedComponentDetail fields"""
+
+SimilarComponentFieldsDependency = Annotated[FieldSelection, Depends(field_selection(SimilarComponentDetail))]
+"""FastAPI dependency for selecting SimilarComponentDetail fields"""
+
+UserFieldsDependency = Annotated[FieldSelection, Depends(field_selection(UserDetail))]
+"""FastAPI dependency for selecting UserDetail fields"""
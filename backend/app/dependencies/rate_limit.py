@@ -0,0 +1,64 @@
+from typing import Annotated
+
+import jwt
+from fastapi import Depends, Request
+from fastapi.security import OAuth2PasswordBearer
+from jwt.exceptions import InvalidTokenError
+
+from app.config import settings
+from app.services.core.rate_limiter import GenerationQuota, generation_quota
+
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/token", auto_error=False)
+
+
+def resolve_principal(token: str | None, client_host: str | None) -> str:
+    """Identify who a request is accounted to.
+
+    A valid bearer token identifies the user without a database lookup;
+    anonymous requests, and requests with an invalid token, are accounted to
+    the client address.
+
+    Args:
+        token (str | None): The bearer token, if any
+        client_host (str | None): The client address, if known
+
+    Returns:
+        str: "user:<email>" or "ip:<address>"
+    """
+    if token:
+        try:
+            payload = jwt.decode(token, settings.AUTH_SECRET_KEY, algorithms=[settings.AUTH_ALGORITHM])
+            if payload.get("sub"):
+                return f"user:{payload['sub']}"
+        except InvalidTokenError:
+            pass
+    return f"ip:{client_host or 'unknown'}"
+
+
+def get_principal(request: Request, token: Annotated[str | None, Depends(optional_oauth2_scheme)]) -> str:
+    """Identify who a request is accounted to, see resolve_principal.
+
+    Args:
+        request (Request): The incoming request
+        token (str | None): The bearer token, if any
+
+    Returns:
+        str: "user:<email>" or "ip:<address>"
+    """
+    return resolve_principal(token, request.client.host if request.client else None)
+
+
+def get_generation_quota(principal: Annotated[str, Depends(get_principal)]) -> GenerationQuota:
+    """Get the generation quota of the requesting principal.
+
+    Args:
+        principal (str): The principal the request is accounted to
+
+    Returns:
+        GenerationQuota: The principal's quota
+    """
+    return generation_quota(principal)
+
+
+GenerationQuotaDependency = Annotated[GenerationQuota, Depends(get_generation_quota)]
+"""FastAPI dependency for injecting the requesting principal's GenerationQuota"""
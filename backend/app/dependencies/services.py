@@ -5,6 +5,9 @@ from fastapi import Depends
 from app.dependencies.database import DatabaseSession
 from app.services.core.user_service import UserService
 from app.services.core.generative import GenerativeService
+from app.services.core.generation_jobs import GenerationJobService
+from app.services.core.component_search import ComponentSearch
+from app.services.core.catalog import CatalogService
 
 
 def get_user_service(db_session: DatabaseSession) -> UserService:
@@ -17,15 +20,45 @@ def get_user_service(db_session: DatabaseSession) -> UserService:
         """
     return UserService(db_session)
 
-def get_generative_service() -> GenerativeService:
-    """Get a UserService instance with the provided database session.
+def get_generative_service(db_session: DatabaseSession) -> GenerativeService:
+    """Get a GenerativeService instance with the provided database session.
         Args:
             db_session (DatabaseSession): The database session to use.
 
         Returns:
-            UserService: An instance of UserService.
+            GenerativeService: An instance of GenerativeService.
+        """
+    return GenerativeService(db_session)
+
+def get_generation_job_service(db_session: DatabaseSession) -> GenerationJobService:
+    """Get a GenerationJobService instance with the provided database session.
+        Args:
+            db_session (DatabaseSession): The database session to use.
+
+        Returns:
+            GenerationJobService: An instance of GenerationJobService.
         """
-    return GenerativeService()
+    return GenerationJobService(db_session)
+
+def get_component_search(db_session: DatabaseSession) -> ComponentSearch:
+    """Get a ComponentSearch instance with the provided database session.
+        Args:
+            db_session (DatabaseSession): The database session to use.
+
+        Returns:
+            ComponentSearch: An instance of ComponentSearch.
+        """
+    return ComponentSearch(db_session)
+
+def get_catalog_service(db_session: DatabaseSession) -> CatalogService:
+    """Get a CatalogService instance with the provided database session.
+        Args:
+            db_session (DatabaseSession): The database session to use.
+
+        Returns:
+            CatalogService: An instance of CatalogService.
+        """
+    return CatalogService(db_session)
 
 # FastAPI dependency annotations
 UserServiceDependency = Annotated[UserService, Depends(get_user_service)]
@@ -33,3 +66,12 @@ UserServiceDependency = Annotated[UserService, Depends(get_user_service)]
 
 GenerativeServiceDependency = Annotated[GenerativeService, Depends(get_generative_service)]
 """FastAPI dependency for injecting GenerativeService"""
+
+GenerationJobServiceDependency = Annotated[GenerationJobService, Depends(get_generation_job_service)]
+"""FastAPI dependency for injecting GenerationJobService"""
+
+ComponentSearchDependency = Annotated[ComponentSearch, Depends(get_component_search)]
+"""FastAPI dependency for injecting ComponentSearch"""
+
+CatalogServiceDependency = Annotated[CatalogService, Depends(get_catalog_service)]
+"""FastAPI dependency for injecting CatalogService"""
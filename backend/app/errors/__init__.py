@@ -1,8 +1,14 @@
 from .global_handler import global_exception_handler
 from .object_not_found_error import ObjectNotFoundError, object_not_found_handler
+from .rate_limit_exceeded_error import RateLimitExceededError, rate_limit_exceeded_handler
+from .request_cancelled_error import RequestCancelledError, request_cancelled_handler
 
 __all__ = [
     "ObjectNotFoundError",
     "object_not_found_handler",
+    "RateLimitExceededError",
+    "rate_limit_exceeded_handler",
+    "RequestCancelledError",
+    "request_cancelled_handler",
     "global_exception_handler",
 ]
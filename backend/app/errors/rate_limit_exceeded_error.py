@@ -0,0 +1,44 @@
+import math
+
+from fastapi import Request, status
+from fastapi.responses import JSONResponse
+
+
+class RateLimitExceededError(Exception):
+    """Exception raised when a principal has exhausted one of its generation quotas.
+
+    Args:
+        limit (str): The exhausted limit, "requests" or "tokens"
+        retry_after (float): Seconds until the request would be admitted
+    """
+
+    def __init__(self, limit: str, retry_after: float):
+        self.limit = limit
+        self.retry_after = retry_after
+        self.message = f"Generation {limit} quota exceeded, retry in {math.ceil(retry_after)} seconds"
+
+
+async def rate_limit_exceeded_handler(request: Request, exc: Exception) -> JSONResponse:
+    """Handle RateLimitExceededError exceptions with a 429 and a Retry-After header.
+
+    Args:
+        request (Request): The incoming request
+        exc (Exception): The exception that was raised
+
+    Returns:
+        JSONResponse: Response with 429 status code for RateLimitExceededError or 500 for other exceptions
+    """
+    if isinstance(exc, RateLimitExceededError):
+        return JSONResponse(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            content={"message": exc.message, "limit": exc.limit},
+            headers={"Retry-After": str(max(math.ceil(exc.retry_after), 1))},
+        )
+    else:
+        # Handle other exceptions if needed
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={
+                "message": "An unexpected error occurred - invalid exception handler"
+            },
+        )
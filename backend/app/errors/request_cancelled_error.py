@@ -0,0 +1,46 @@
+from fastapi import Request, status
+from fastapi.responses import JSONResponse
+
+HTTP_499_CLIENT_CLOSED_REQUEST = 499
+"""Non-standard status (nginx) for requests abandoned by the client, seen only in logs and metrics"""
+
+
+class RequestCancelledError(Exception):
+    """Exception raised when a request's work was cancelled before it finished.
+
+    Args:
+        reason (str): "deadline" when the client-supplied deadline passed,
+            "client_disconnect" when the client went away
+    """
+
+    def __init__(self, reason: str):
+        self.reason = reason
+        self.message = "Request deadline exceeded" if reason == "deadline" else "Client closed the request"
+
+
+async def request_cancelled_handler(request: Request, exc: Exception) -> JSONResponse:
+    """Handle RequestCancelledError exceptions.
+
+    Args:
+        request (Request): The incoming request
+        exc (Exception): The exception that was raised
+
+    Returns:
+        JSONResponse: Response with 504 status code when the deadline passed, 499 when the
+        client disconnected, or 500 for other exceptions
+    """
+    if isinstance(exc, RequestCancelledError):
+        return JSONResponse(
+            status_code=(
+                status.HTTP_504_GATEWAY_TIMEOUT if exc.reason == "deadline" else HTTP_499_CLIENT_CLOSED_REQUEST
+            ),
+            content={"message": exc.message},
+        )
+    else:
+        # Handle other exceptions if needed
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={
+                "message": "An unexpected error occurred - invalid exception handler"
+            },
+        )
@@ -1,13 +1,61 @@
+from collections.abc import AsyncIterator, Iterable
+from contextlib import asynccontextmanager
+from itertools import product
+
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
-from app.dependencies.auth import get_current_user
+from app.dependencies.auth import get_current_admin, get_current_user
 from app.config import settings
-from app.routers import user_router, auth_router, generative_router
+from app.database import sessionmanager
+from app.errors import (
+    ObjectNotFoundError,
+    RateLimitExceededError,
+    RequestCancelledError,
+    object_not_found_handler,
+    rate_limit_exceeded_handler,
+    request_cancelled_handler,
+)
+from app.middleware.metrics_middleware import MetricsMiddleware
+from app.routers import admin_router, catalog_router, user_router, auth_router, generative_router, metrics_router
+from app.services.core.catalog import catalog_cache
+from app.services.core.component_pool import component_pool
+from app.services.core.generative import GenerativeService
+from app.services.core.prompt_bandit import prompt_bandit
+from app.types.generative import GenerativeCreate
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Start background workers on startup and release resources on shutdown.
+    """
+    if settings.GENERATIVE_POOL_ENABLED:
+        service = GenerativeService()
+
+        async def pool_keys() -> tuple[int, Iterable[tuple[int, int]]]:
+            catalog = await catalog_cache.get()
+            return catalog.version, product(catalog.personas, catalog.designers)
+
+        await component_pool.start(
+            lambda persona_id, designer_id: service.generate_component(
+                GenerativeCreate(persona_id=persona_id, designer_id=designer_id)
+            ),
+            pool_keys,
+        )
+
+    yield
+
+    await component_pool.stop()
+    await prompt_bandit.flush()
+    await sessionmanager.close()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
 
@@ -20,9 +68,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Generated components and their prompts are large and compress well. Starlette skips
+# text/event-stream responses, so streaming endpoints are unaffected
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=settings.RESPONSE_GZIP_MINIMUM_SIZE,
+    compresslevel=settings.RESPONSE_GZIP_LEVEL,
+)
+
+# Added last so it wraps the whole stack, CORS included
+app.add_middleware(MetricsMiddleware)
+
+app.add_exception_handler(ObjectNotFoundError, object_not_found_handler)
+app.add_exception_handler(RateLimitExceededError, rate_limit_exceeded_handler)
+app.add_exception_handler(RequestCancelledError, request_cancelled_handler)
+
 app.include_router(user_router.router, prefix=settings.API_V1_STR, dependencies=[Depends(get_current_user)])
 app.include_router(auth_router.router, prefix=settings.API_V1_STR)
 app.include_router(generative_router.router, prefix=settings.API_V1_STR)
+app.include_router(catalog_router.router, prefix=settings.API_V1_STR)
+app.include_router(admin_router.router, prefix=settings.API_V1_STR, dependencies=[Depends(get_current_admin)])
+app.include_router(metrics_router.router)
 
 
 @app.get("/")
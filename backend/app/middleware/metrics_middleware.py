@@ -0,0 +1,86 @@
+import time
+from typing import Any
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.database import RequestDatabaseStats, request_database_stats
+from app.utils.metrics import metrics
+
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+"""Statements per request; more than a handful usually means an N+1 pattern"""
+
+http_request_seconds = metrics.histogram(
+    "http_request_duration_seconds",
+    "Time to serve HTTP requests, until the last byte of the body for streams",
+    ("router", "handler", "method", "status"),
+)
+db_queries_per_request = metrics.histogram(
+    "db_queries_per_request", "Database statements executed per HTTP request", ("router",), QUERY_COUNT_BUCKETS
+)
+db_query_seconds_per_request = metrics.histogram(
+    "db_query_seconds_per_request", "Time spent in database statements per HTTP request", ("router",)
+)
+
+
+class MetricsMiddleware:
+    """
+    Records latency and database usage for every HTTP request.
+
+    Requests are labelled with the router module and handler that served
+    them, taken from the matched endpoint, so the label set stays bounded;
+    paths matching no route are reported as ``unmatched``. Streaming responses
+    are timed until their last chunk has been sent.
+
+    Args:
+        app (ASGIApp): The wrapped application
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+        db_stats = RequestDatabaseStats()
+        token = request_database_stats.set(db_stats)
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            request_database_stats.reset(token)
+            router, handler = route_labels(scope)
+            http_request_seconds.observe(
+                time.perf_counter() - started,
+                router=router,
+                handler=handler,
+                method=scope["method"],
+                status=str(status),
+            )
+            db_queries_per_request.observe(db_stats.queries, router=router)
+            db_query_seconds_per_request.observe(db_stats.seconds, router=router)
+
+
+def route_labels(scope: Scope) -> tuple[str, str]:
+    """
+    Name the router module and handler that served a request.
+
+    Args:
+        scope (Scope): The ASGI scope, updated by the routing with the matched endpoint
+
+    Returns:
+        tuple[str, str]: e.g. ("generative_router", "get_generative"), ("unmatched", "unmatched") without a route
+    """
+    endpoint: Any = scope.get("endpoint")
+    if endpoint is None:
+        return "unmatched", "unmatched"
+    return endpoint.__module__.rsplit(".", 1)[-1], getattr(endpoint, "__name__", "unknown")
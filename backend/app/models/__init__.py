@@ -45,7 +45,21 @@ class AbstractBase(Base):
 
 
 from .user_model import User  # noqa
+from .generation_cache_model import GenerationCacheEntry  # noqa
+from .generated_component_model import GeneratedComponent  # noqa
+from .rate_limit_bucket_model import RateLimitBucket  # noqa
+from .generation_job_model import GenerationJob  # noqa
+from .prompt_variant_stats_model import PromptVariantStats  # noqa
+from .catalog_model import Persona, Designer, CatalogVersion  # noqa
 
 __all__ = [
     "User",
+    "GenerationCacheEntry",
+    "GeneratedComponent",
+    "RateLimitBucket",
+    "GenerationJob",
+    "PromptVariantStats",
+    "Persona",
+    "Designer",
+    "CatalogVersion",
 ]
@@ -0,0 +1,24 @@
+from . import AbstractBase
+from sqlalchemy import Integer, String, Text
+from sqlalchemy.orm import mapped_column
+
+
+class Persona(AbstractBase):
+    __tablename__ = "personas"
+
+    name = mapped_column(String(100), nullable=False)
+    prompt = mapped_column(Text, nullable=False)
+
+
+class Designer(AbstractBase):
+    __tablename__ = "designers"
+
+    name = mapped_column(String(100), nullable=False)
+    prompt = mapped_column(Text, nullable=False)
+
+
+class CatalogVersion(AbstractBase):
+    __tablename__ = "catalog_versions"
+
+    name = mapped_column(String(50), nullable=False, unique=True, index=True)
+    version = mapped_column(Integer, nullable=False, default=0)
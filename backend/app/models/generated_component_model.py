@@ -0,0 +1,31 @@
+from . import AbstractBase
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import Boolean, Index, Integer, String, Text
+from sqlalchemy.orm import mapped_column
+from app.config import settings
+
+
+class GeneratedComponent(AbstractBase):
+    __tablename__ = "generated_components"
+    __table_args__ = (
+        Index(
+            "ix_generated_components_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
+    )
+
+    content_hash = mapped_column(String(64), unique=True, index=True, nullable=False)
+    persona_id = mapped_column(Integer, nullable=False)
+    designer_id = mapped_column(Integer, nullable=False)
+    user_prefferences = mapped_column(Text, nullable=False, default="")
+    raw_component = mapped_column(Text, nullable=False)
+    generated_prompt = mapped_column(Text, nullable=False, default="")
+    variant_id = mapped_column(Integer, nullable=True)
+    seed = mapped_column(Integer, nullable=True)
+    # Whether the component rendered in react-live, as first reported by a client
+    compiled = mapped_column(Boolean, nullable=True)
+    # Only read by similarity queries, so not loaded with the component
+    embedding = mapped_column(Vector(settings.EMBEDDING_DIMENSIONS), nullable=True, deferred=True)
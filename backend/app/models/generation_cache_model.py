@@ -0,0 +1,28 @@
+from . import AbstractBase
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import Index, Integer, Text
+from sqlalchemy.orm import mapped_column
+from app.config import settings
+
+
+class GenerationCacheEntry(AbstractBase):
+    __tablename__ = "generation_cache"
+    __table_args__ = (
+        Index("ix_generation_cache_persona_designer", "persona_id", "designer_id"),
+        Index(
+            "ix_generation_cache_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
+    )
+
+    persona_id = mapped_column(Integer, nullable=False)
+    designer_id = mapped_column(Integer, nullable=False)
+    user_prefferences = mapped_column(Text, nullable=False, default="")
+    raw_component = mapped_column(Text, nullable=False)
+    generated_prompt = mapped_column(Text, nullable=False, default="")
+    variant_id = mapped_column(Integer, nullable=True)
+    seed = mapped_column(Integer, nullable=True)
+    embedding = mapped_column(Vector(settings.EMBEDDING_DIMENSIONS), nullable=False)
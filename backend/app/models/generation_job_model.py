@@ -0,0 +1,24 @@
+from . import AbstractBase
+from sqlalchemy import Column, DateTime, Enum, Index, Integer, String, Text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import mapped_column
+from app.types.enum.generation_job_enum import GenerationJobStatusEnum
+
+
+class GenerationJob(AbstractBase):
+    __tablename__ = "generation_jobs"
+    __table_args__ = (
+        # Workers claim the oldest claimable job, by status then id
+        Index("ix_generation_jobs_status_id", "status", "id"),
+    )
+
+    status = mapped_column(
+        Enum(GenerationJobStatusEnum), default=GenerationJobStatusEnum.pending, nullable=False
+    )
+    request = mapped_column(JSONB, nullable=False)
+    principal = mapped_column(String(255), nullable=False)
+    result = mapped_column(JSONB, nullable=True)
+    error = mapped_column(Text, nullable=True)
+    attempts = mapped_column(Integer, default=0, nullable=False)
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
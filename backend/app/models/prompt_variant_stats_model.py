@@ -0,0 +1,17 @@
+from . import AbstractBase
+from sqlalchemy import Float, Integer
+from sqlalchemy.orm import mapped_column
+
+
+class PromptVariantStats(AbstractBase):
+    __tablename__ = "prompt_variant_stats"
+
+    variant_id = mapped_column(Integer, nullable=False, unique=True, index=True)
+    attempts = mapped_column(Integer, nullable=False, default=0)
+    valid = mapped_column(Integer, nullable=False, default=0)
+    invalid = mapped_column(Integer, nullable=False, default=0)
+    aborted = mapped_column(Integer, nullable=False, default=0)
+    compiled = mapped_column(Integer, nullable=False, default=0)
+    compile_failed = mapped_column(Integer, nullable=False, default=0)
+    reward = mapped_column(Float, nullable=False, default=0.0)
+    llm_seconds = mapped_column(Float, nullable=False, default=0.0)
@@ -0,0 +1,12 @@
+from . import AbstractBase
+from sqlalchemy import Column, DateTime, Float, String
+from sqlalchemy.orm import mapped_column
+from sqlalchemy.sql import func
+
+
+class RateLimitBucket(AbstractBase):
+    __tablename__ = "rate_limit_buckets"
+
+    key = mapped_column(String(255), nullable=False, unique=True, index=True)
+    level = mapped_column(Float, nullable=False)
+    refilled_at = Column(DateTime(timezone=True), nullable=False, default=func.clock_timestamp())
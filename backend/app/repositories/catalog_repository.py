@@ -0,0 +1,143 @@
+import structlog
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.models import CatalogVersion, Designer, Persona
+
+from app.repositories.base_repository import BaseRepository
+from app.types.catalog import (
+    CatalogEntryBase,
+    CatalogEntryCreate,
+    CatalogEntryDetail,
+    CatalogEntryUpdate,
+    CatalogVersionBase,
+)
+
+logger = structlog.stdlib.get_logger(__name__)
+
+
+class PersonaRepository(
+    BaseRepository[
+        Persona,
+        CatalogEntryBase,
+        CatalogEntryDetail,
+        CatalogEntryDetail,
+        CatalogEntryCreate,
+        CatalogEntryUpdate,
+    ]
+):
+    """
+    Repository for the personas components are generated for.
+    """
+
+    model = Persona
+    """The Persona SQLAlchemy model class"""
+
+    base_schema = CatalogEntryDetail
+    """CatalogEntryDetail schema, so that created entries carry their id"""
+
+    detail_schema = CatalogEntryDetail
+    """CatalogEntryDetail schema for detailed view"""
+
+    list_schema = CatalogEntryDetail
+    """CatalogEntryDetail schema for list operations"""
+
+    detail_options = []
+    """SQLAlchemy load options for detailed queries"""
+
+    list_options = []
+    """Load options for list queries"""
+
+    list_order = [Persona.id]
+    """Ids are the order the entries were created in"""
+
+
+class DesignerRepository(
+    BaseRepository[
+        Designer,
+        CatalogEntryBase,
+        CatalogEntryDetail,
+        CatalogEntryDetail,
+        CatalogEntryCreate,
+        CatalogEntryUpdate,
+    ]
+):
+    """
+    Repository for the designers whose style guidelines components follow.
+    """
+
+    model = Designer
+    """The Designer SQLAlchemy model class"""
+
+    base_schema = CatalogEntryDetail
+    """CatalogEntryDetail schema, so that created entries carry their id"""
+
+    detail_schema = CatalogEntryDetail
+    """CatalogEntryDetail schema for detailed view"""
+
+    list_schema = CatalogEntryDetail
+    """CatalogEntryDetail schema for list operations"""
+
+    detail_options = []
+    """SQLAlchemy load options for detailed queries"""
+
+    list_options = []
+    """Load options for list queries"""
+
+    list_order = [Designer.id]
+    """Ids are the order the entries were created in"""
+
+
+class CatalogVersionRepository(
+    BaseRepository[
+        CatalogVersion,
+        CatalogVersionBase,
+        CatalogVersionBase,
+        CatalogVersionBase,
+        CatalogVersionBase,
+        CatalogVersionBase,
+    ]
+):
+    """
+    Repository for the version counters invalidating cached catalogs.
+    """
+
+    model = CatalogVersion
+    """The CatalogVersion SQLAlchemy model class"""
+
+    base_schema = CatalogVersionBase
+    """CatalogVersionBase schema for basic operations"""
+
+    detail_schema = CatalogVersionBase
+    """CatalogVersionBase schema for detailed view"""
+
+    list_schema = CatalogVersionBase
+    """CatalogVersionBase schema for list operations"""
+
+    async def get_version(self, name: str) -> int:
+        """Read the version of a catalog.
+
+        Args:
+            name: The catalog
+
+        Returns:
+            int: Its version, 0 if it was never written
+        """
+        version = await self.db_session.scalar(select(self.model.version).where(self.model.name == name))
+        return version or 0
+
+    async def bump(self, name: str) -> None:
+        """Increment the version of a catalog, creating its row on first use.
+
+        Run in the transaction that writes the catalog, so the new version is
+        visible exactly when the write is.
+
+        Args:
+            name: The catalog
+        """
+        statement = insert(self.model).values(name=name, version=1)
+        statement = statement.on_conflict_do_update(
+            index_elements=[self.model.name],
+            set_={"version": self.model.version + 1},
+        )
+        await self.db_session.execute(statement)
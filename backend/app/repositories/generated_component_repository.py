@@ -0,0 +1,163 @@
+import structlog
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app.errors import ObjectNotFoundError
+from app.models import GeneratedComponent
+
+from app.repositories.base_repository import BaseRepository
+from app.types.generative import (
+    GeneratedComponentBase,
+    GeneratedComponentCreate,
+    GeneratedComponentDetail,
+    SimilarComponentDetail,
+)
+
+logger = structlog.stdlib.get_logger(__name__)
+
+
+class GeneratedComponentRepository(
+    BaseRepository[
+        GeneratedComponent,
+        GeneratedComponentBase,
+        GeneratedComponentDetail,
+        GeneratedComponentDetail,
+        GeneratedComponentCreate,
+        GeneratedComponentBase,
+    ]
+):
+    """
+    Repository for generated components, addressed by the hash of their code.
+    """
+
+    model = GeneratedComponent
+    """The GeneratedComponent SQLAlchemy model class"""
+
+    base_schema = GeneratedComponentBase
+    """GeneratedComponentBase schema for basic operations"""
+
+    detail_schema = GeneratedComponentDetail
+    """GeneratedComponentDetail schema for detailed view"""
+
+    list_schema = GeneratedComponentDetail
+    """GeneratedComponentDetail schema for list operations"""
+
+    detail_options = []
+    """SQLAlchemy load options for detailed queries"""
+
+    list_options = []
+    """Load options for list queries"""
+
+    async def create_or_get(self, create_schema: GeneratedComponentCreate) -> tuple[GeneratedComponentDetail, bool]:
+        """Store a component unless one with the same content hash already exists.
+
+        The insert and the conflict check are a single statement, so concurrent
+        requests storing the same component cannot create duplicates.
+
+        Args:
+            create_schema: The component and its content hash
+
+        Returns:
+            tuple[GeneratedComponentDetail, bool]: The newly stored component, or
+            the existing one sharing its content hash, and whether it was created
+        """
+        statement = (
+            insert(self.model)
+            .values(**create_schema.model_dump())
+            .on_conflict_do_nothing(index_elements=[self.model.content_hash])
+            .returning(self.model)
+        )
+        result = await self.db_session.execute(statement)
+        db_instance = result.scalar_one_or_none()
+        created = db_instance is not None
+
+        if db_instance is None:
+            db_instance = await self._get_by_content_hash(create_schema.content_hash)
+
+        return self.detail_schema.model_validate(db_instance), created
+
+    async def get_embedding(self, id: int) -> list[float] | None:
+        """Read the embedding of a component.
+
+        Args:
+            id: The component id
+
+        Returns:
+            list[float] | None: The embedding, or None if it has not been computed
+
+        Raises:
+            ObjectNotFoundError: If no component has this id
+        """
+        result = await self.db_session.execute(select(self.model.embedding).where(self.model.id == id))
+        row = result.first()
+        if row is None:
+            raise ObjectNotFoundError(object_type=self.model.__name__, object_id=id)
+        return None if row.embedding is None else list(row.embedding)
+
+    async def set_embedding(self, id: int, embedding: list[float]) -> None:
+        """Store the embedding of a component.
+
+        Args:
+            id: The component id
+            embedding: The embedding of the component
+        """
+        await self.db_session.execute(update(self.model).where(self.model.id == id).values(embedding=embedding))
+
+    async def record_compiled(self, id: int, compiled: bool) -> bool:
+        """Store the react-live outcome of a component, unless one was already reported.
+
+        Args:
+            id: The component id
+            compiled: Whether the component rendered
+
+        Returns:
+            bool: Whether this was the first report for the component
+        """
+        result = await self.db_session.execute(
+            update(self.model)
+            .where(self.model.id == id, self.model.compiled.is_(None))
+            .values(compiled=compiled)
+        )
+        return result.rowcount > 0  # type: ignore[attr-defined]
+
+    async def find_similar(
+        self, embedding: list[float], limit: int, ef_search: int, exclude_id: int | None = None
+    ) -> list[SimilarComponentDetail]:
+        """Find the components closest to an embedding.
+
+        Ordering by cosine distance with a LIMIT lets Postgres answer from the
+        HNSW index instead of scanning the table. ``hnsw.ef_search`` is set
+        for the current transaction only; the index never returns more rows
+        than its candidate list, so it is raised to at least ``limit``.
+
+        Args:
+            embedding: The query embedding
+            limit: Number of components to return
+            ef_search: Size of the HNSW candidate list, trading latency for recall
+            exclude_id: A component left out of the results, e.g. the query component
+
+        Returns:
+            list[SimilarComponentDetail]: The components, most similar first
+        """
+        await self.db_session.execute(
+            select(func.set_config("hnsw.ef_search", str(max(ef_search, limit + 1)), True))
+        )
+
+        distance = self.model.embedding.cosine_distance(embedding).label("distance")
+        query = select(self.model, distance).where(self.model.embedding.is_not(None)).order_by(distance)
+        # Excluded after the index scan, so ask for one extra row rather than filtering the scan
+        result = await self.db_session.execute(query.limit(limit + 1))
+
+        similar = [
+            SimilarComponentDetail(
+                **self.detail_schema.model_validate(component).model_dump(), similarity=1.0 - component_distance
+            )
+            for component, component_distance in result.all()
+            if component.id != exclude_id
+        ]
+        return similar[:limit]
+
+    async def _get_by_content_hash(self, content_hash: str) -> GeneratedComponent:
+        query = select(self.model).where(self.model.content_hash == content_hash)
+        result = await self.db_session.execute(query)
+        return result.scalar_one()
@@ -0,0 +1,82 @@
+import structlog
+from sqlalchemy import select
+
+from app.models import GenerationCacheEntry
+
+from app.repositories.base_repository import BaseRepository
+from app.types.generative import (
+    GenerationCacheEntryBase,
+    GenerationCacheEntryCreate,
+    GenerationCacheEntryDetail,
+)
+
+logger = structlog.stdlib.get_logger(__name__)
+
+
+class GenerationCacheRepository(
+    BaseRepository[
+        GenerationCacheEntry,
+        GenerationCacheEntryBase,
+        GenerationCacheEntryDetail,
+        GenerationCacheEntryDetail,
+        GenerationCacheEntryCreate,
+        GenerationCacheEntryBase,
+    ]
+):
+    """
+    Repository for semantic cache entries, looked up by embedding similarity.
+    """
+
+    model = GenerationCacheEntry
+    """The GenerationCacheEntry SQLAlchemy model class"""
+
+    base_schema = GenerationCacheEntryBase
+    """GenerationCacheEntryBase schema for basic operations"""
+
+    detail_schema = GenerationCacheEntryDetail
+    """GenerationCacheEntryDetail schema for detailed view"""
+
+    list_schema = GenerationCacheEntryDetail
+    """GenerationCacheEntryDetail schema for list operations"""
+
+    detail_options = []
+    """SQLAlchemy load options for detailed queries"""
+
+    list_options = []
+    """Load options for list queries"""
+
+    async def find_nearest(
+        self, embedding: list[float], persona_id: int, designer_id: int
+    ) -> tuple[GenerationCacheEntryDetail, float] | None:
+        """Find the closest cached entry for a persona/designer pair.
+
+        Ordering by cosine distance lets Postgres answer from the HNSW index
+        instead of scanning the table.
+
+        Args:
+            embedding: The embedding of the incoming request
+            persona_id: The requested persona
+            designer_id: The requested designer
+
+        Returns:
+            tuple[GenerationCacheEntryDetail, float] | None: The nearest entry and
+            its cosine similarity to the request, or None if the pair has no entries
+        """
+        distance = self.model.embedding.cosine_distance(embedding).label("distance")
+        query = (
+            select(self.model, distance)
+            .where(
+                self.model.persona_id == persona_id,
+                self.model.designer_id == designer_id,
+            )
+            .order_by(distance)
+            .limit(1)
+        )
+        result = await self.db_session.execute(query)
+        row = result.first()
+
+        if row is None:
+            return None
+
+        entry, entry_distance = row
+        return self.detail_schema.model_validate(entry), 1.0 - entry_distance
@@ -0,0 +1,186 @@
+from datetime import timedelta
+from typing import Any
+
+import structlog
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app.errors import ObjectNotFoundError
+from app.models import GenerationJob
+
+from app.repositories.base_repository import BaseRepository
+from app.types.enum.generation_job_enum import GenerationJobStatusEnum
+from app.types.generation_job import GenerationJobCreate, GenerationJobDetail
+
+logger = structlog.stdlib.get_logger(__name__)
+
+
+class GenerationJobRepository(
+    BaseRepository[
+        GenerationJob,
+        GenerationJobDetail,
+        GenerationJobDetail,
+        GenerationJobDetail,
+        GenerationJobCreate,
+        GenerationJobDetail,
+    ]
+):
+    """
+    Repository for asynchronous generation jobs, used as a work queue by the workers.
+    """
+
+    model = GenerationJob
+    """The GenerationJob SQLAlchemy model class"""
+
+    base_schema = GenerationJobDetail
+    """GenerationJobDetail schema for basic operations"""
+
+    detail_schema = GenerationJobDetail
+    """GenerationJobDetail schema for detailed view"""
+
+    list_schema = GenerationJobDetail
+    """GenerationJobDetail schema for list operations"""
+
+    detail_options = []
+    """SQLAlchemy load options for detailed queries"""
+
+    list_options = []
+    """Load options for list queries"""
+
+    async def enqueue(self, create_schema: GenerationJobCreate) -> GenerationJobDetail:
+        """Insert a pending job.
+
+        Args:
+            create_schema: The request to run and its principal
+
+        Returns:
+            GenerationJobDetail: The queued job
+        """
+        result = await self.db_session.execute(
+            insert(self.model).values(**create_schema.model_dump()).returning(self.model)
+        )
+        return self.detail_schema.model_validate(result.scalar_one())
+
+    async def get_current(self, id: int) -> GenerationJobDetail:
+        """Fetch a job, bypassing the session's identity map.
+
+        Workers update jobs from other processes, so repeated reads within one
+        session (e.g. while long-polling) must see the latest committed row.
+
+        Args:
+            id: The job id
+
+        Returns:
+            GenerationJobDetail: The job
+
+        Raises:
+            ObjectNotFoundError: If no job has this id
+        """
+        result = await self.db_session.execute(
+            select(self.model).where(self.model.id == id).execution_options(populate_existing=True)
+        )
+        job = result.scalar_one_or_none()
+        if job is None:
+            raise ObjectNotFoundError(object_type=self.model.__name__, object_id=id)
+        return self.detail_schema.model_validate(job)
+
+    async def claim(self, lease_seconds: float, max_attempts: int) -> GenerationJobDetail | None:
+        """Claim the oldest claimable job for ``lease_seconds``.
+
+        A job is claimable while pending, or while running past its lease
+        because the worker holding it died, provided it has been claimed fewer
+        than ``max_attempts`` times. ``FOR UPDATE SKIP LOCKED`` lets
+        concurrent workers each claim a different job without waiting on one
+        another.
+
+        Args:
+            lease_seconds: How long the job belongs to the claiming worker
+            max_attempts: Claims after which an expired job is no longer retried
+
+        Returns:
+            GenerationJobDetail | None: The claimed job, or None when the queue is empty
+        """
+        claimable = (
+            select(self.model.id)
+            .where(
+                or_(
+                    self.model.status == GenerationJobStatusEnum.pending,
+                    and_(
+                        self.model.status == GenerationJobStatusEnum.running,
+                        self.model.locked_until < func.now(),
+                        self.model.attempts < max_attempts,
+                    ),
+                )
+            )
+            .order_by(self.model.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = await self.db_session.execute(
+            update(self.model)
+            .where(self.model.id == claimable)
+            .values(
+                status=GenerationJobStatusEnum.running,
+                attempts=self.model.attempts + 1,
+                locked_until=func.now() + timedelta(seconds=lease_seconds),
+            )
+            .returning(self.model)
+            .execution_options(populate_existing=True)
+        )
+        job = result.scalar_one_or_none()
+        return self.detail_schema.model_validate(job) if job is not None else None
+
+    async def fail_expired(self, max_attempts: int) -> list[int]:
+        """Fail the jobs whose last allowed attempt outlived its lease.
+
+        Args:
+            max_attempts: Claims after which an expired job is no longer retried
+
+        Returns:
+            list[int]: Ids of the jobs marked as failed
+        """
+        result = await self.db_session.execute(
+            update(self.model)
+            .where(
+                self.model.status == GenerationJobStatusEnum.running,
+                self.model.locked_until < func.now(),
+                self.model.attempts >= max_attempts,
+            )
+            .values(
+                status=GenerationJobStatusEnum.failed,
+                locked_until=None,
+                finished_at=func.now(),
+                error=f"Lease expired on attempt {max_attempts}, the worker running the job stopped",
+            )
+            .returning(self.model.id)
+        )
+        return list(result.scalars().all())
+
+    async def finish(self, id: int, attempts: int, status: GenerationJobStatusEnum, **values: Any) -> bool:
+        """Record the outcome of an attempt, unless the attempt lost its lease.
+
+        Only the attempt that currently holds the job may finish it: once a
+        lease expires and another worker claims the job, the late outcome of
+        the previous attempt is discarded.
+
+        Args:
+            id: The job id
+            attempts: The job's claim count when the attempt claimed it
+            status: The new status; pending puts the job back in the queue
+            **values: Other columns to set, e.g. result or error
+
+        Returns:
+            bool: Whether the outcome was recorded
+        """
+        finished_at = None if status == GenerationJobStatusEnum.pending else func.now()
+        result = await self.db_session.execute(
+            update(self.model)
+            .where(
+                self.model.id == id,
+                self.model.status == GenerationJobStatusEnum.running,
+                self.model.attempts == attempts,
+            )
+            .values(status=status, locked_until=None, finished_at=finished_at, **values)
+        )
+        return result.rowcount > 0  # type: ignore[attr-defined]
@@ -0,0 +1,75 @@
+import structlog
+from sqlalchemy.dialects.postgresql import insert
+
+from app.models import PromptVariantStats
+
+from app.repositories.base_repository import BaseRepository
+from app.types.prompt_variant import PromptVariantStatsBase, PromptVariantStatsDetail
+
+logger = structlog.stdlib.get_logger(__name__)
+
+COUNTERS = ("attempts", "valid", "invalid", "aborted", "compiled", "compile_failed", "reward", "llm_seconds")
+"""Columns accumulated by ``record``"""
+
+
+class PromptVariantStatsRepository(
+    BaseRepository[
+        PromptVariantStats,
+        PromptVariantStatsBase,
+        PromptVariantStatsDetail,
+        PromptVariantStatsDetail,
+        PromptVariantStatsBase,
+        PromptVariantStatsBase,
+    ]
+):
+    """
+    Repository for the outcomes of each prompt variant, shared by every worker.
+    """
+
+    model = PromptVariantStats
+    """The PromptVariantStats SQLAlchemy model class"""
+
+    base_schema = PromptVariantStatsBase
+    """PromptVariantStatsBase schema for basic operations"""
+
+    detail_schema = PromptVariantStatsDetail
+    """PromptVariantStatsDetail schema for detailed view"""
+
+    list_schema = PromptVariantStatsDetail
+    """PromptVariantStatsDetail schema for list operations"""
+
+    detail_options = []
+    """SQLAlchemy load options for detailed queries"""
+
+    list_options = []
+    """Load options for list queries"""
+
+    list_order = [PromptVariantStats.attempts.desc(), PromptVariantStats.variant_id]
+    """Most attempted variants first"""
+
+    async def record(self, variant_id: int, **increments: float) -> None:
+        """Add to the counters of a variant, creating its row on first use.
+
+        The increments are applied by a single upsert, so concurrent workers
+        recording outcomes for the same variant never lose an update.
+
+        Args:
+            variant_id: The prompt variant
+            **increments: Amounts to add, keyed by a name from COUNTERS
+
+        Raises:
+            ValueError: If a counter name is unknown
+        """
+        if not increments:
+            return
+        unknown = set(increments) - set(COUNTERS)
+        if unknown:
+            raise ValueError(f"Unknown prompt variant counters: {', '.join(sorted(unknown))}")
+
+        values = {name: increments.get(name, 0) for name in COUNTERS}
+        statement = insert(self.model).values(variant_id=variant_id, **values)
+        statement = statement.on_conflict_do_update(
+            index_elements=[self.model.variant_id],
+            set_={name: getattr(self.model, name) + getattr(statement.excluded, name) for name in increments},
+        )
+        await self.db_session.execute(statement)
@@ -0,0 +1,85 @@
+import structlog
+from sqlalchemy import case, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app.models import RateLimitBucket
+
+from app.repositories.base_repository import BaseRepository
+from app.types.rate_limit import RateLimitBucketBase, RateLimitBucketDetail
+
+logger = structlog.stdlib.get_logger(__name__)
+
+
+class RateLimitBucketRepository(
+    BaseRepository[
+        RateLimitBucket,
+        RateLimitBucketBase,
+        RateLimitBucketDetail,
+        RateLimitBucketDetail,
+        RateLimitBucketBase,
+        RateLimitBucketBase,
+    ]
+):
+    """
+    Repository for token buckets shared by every worker through Postgres.
+    """
+
+    model = RateLimitBucket
+    """The RateLimitBucket SQLAlchemy model class"""
+
+    base_schema = RateLimitBucketBase
+    """RateLimitBucketBase schema for basic operations"""
+
+    detail_schema = RateLimitBucketDetail
+    """RateLimitBucketDetail schema for detailed view"""
+
+    list_schema = RateLimitBucketDetail
+    """RateLimitBucketDetail schema for list operations"""
+
+    detail_options = []
+    """SQLAlchemy load options for detailed queries"""
+
+    list_options = []
+    """Load options for list queries"""
+
+    async def take(self, key: str, amount: float, required: float, capacity: float, refill_per_second: float) -> float:
+        """Refill a bucket and take ``amount`` tokens from it if it holds at least ``required``.
+
+        The refill, the check and the deduction run in a single UPDATE on a
+        row locked by the refill CTE, so concurrent workers never spend the
+        same tokens twice. The elapsed time comes from the database clock,
+        not from the workers'.
+
+        Args:
+            key: The bucket key
+            amount: Tokens to take when the check passes
+            required: Minimum level for the check to pass
+            capacity: Maximum level, also the level of a new bucket
+            refill_per_second: Tokens added per second
+
+        Returns:
+            float: The level after the refill and before the deduction
+        """
+        await self.db_session.execute(
+            insert(self.model)
+            .values(key=key, level=capacity, refilled_at=func.clock_timestamp())
+            .on_conflict_do_nothing(index_elements=[self.model.key])
+        )
+
+        elapsed = func.greatest(func.extract("epoch", func.clock_timestamp() - self.model.refilled_at), 0)
+        refilled = (
+            select(self.model.id, func.least(capacity, self.model.level + elapsed * refill_per_second).label("level"))
+            .where(self.model.key == key)
+            .with_for_update()
+            .cte("refilled")
+        )
+        result = await self.db_session.execute(
+            update(self.model)
+            .where(self.model.id == refilled.c.id)
+            .values(
+                level=refilled.c.level - case((refilled.c.level >= required, amount), else_=0.0),
+                refilled_at=func.clock_timestamp(),
+            )
+            .returning(refilled.c.level)
+        )
+        return float(result.scalar_one())
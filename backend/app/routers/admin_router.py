@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Query
+
+from app.dependencies.database import DatabaseSession
+from app.services.core.prompt_bandit import prompt_bandit
+from app.types.prompt_variant import PromptBanditReport
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+@router.get("/prompt-variants", response_model=PromptBanditReport)
+async def get_prompt_variant_stats(
+    db_session: DatabaseSession,
+    limit: int = Query(default=100, ge=1, le=1000, description="Number of variants to list"),
+) -> PromptBanditReport:
+    """
+    Validation and react-live outcomes per prompt variant and per prompt option.
+
+    ``expectedReward`` is the bandit's current belief for each option; with
+    PROMPT_BANDIT_ENABLED, options are drawn in proportion to the chance that
+    they are the best of their dimension.
+    """
+    return await prompt_bandit.report(db_session, limit=limit)
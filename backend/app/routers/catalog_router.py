@@ -0,0 +1,79 @@
+from fastapi import APIRouter, Depends
+
+from app.dependencies.auth import get_current_admin
+from app.dependencies.database import DatabaseSession
+from app.dependencies.services import CatalogServiceDependency
+from app.services.core.catalog import catalog_cache
+from app.types.catalog import CatalogEntryCreate, CatalogEntryDetail, CatalogEntryUpdate
+
+router = APIRouter(prefix="/catalog", tags=["Catalog"])
+
+AdminOnly = [Depends(get_current_admin)]
+
+
+@router.get("/personas", response_model=list[CatalogEntryDetail])
+async def get_personas(catalogService: CatalogServiceDependency) -> list[CatalogEntryDetail]:
+    """List the personas components can be generated for, by ``personaId``."""
+    return await catalogService.get_personas()
+
+
+@router.get("/personas/{persona_id}", response_model=CatalogEntryDetail)
+async def get_persona(catalogService: CatalogServiceDependency, persona_id: int) -> CatalogEntryDetail:
+    return await catalogService.get_persona(persona_id)
+
+
+@router.post("/personas", response_model=CatalogEntryDetail, status_code=201, dependencies=AdminOnly)
+async def create_persona(catalogService: CatalogServiceDependency, persona: CatalogEntryCreate, db_session: DatabaseSession) -> CatalogEntryDetail:
+    created = await catalogService.create_persona(persona)
+    await db_session.commit()
+    catalog_cache.invalidate()
+    return created
+
+
+@router.patch("/personas/{persona_id}", response_model=CatalogEntryDetail, dependencies=AdminOnly)
+async def update_persona(catalogService: CatalogServiceDependency, persona_id: int, persona: CatalogEntryUpdate, db_session: DatabaseSession) -> CatalogEntryDetail:
+    updated = await catalogService.update_persona(persona_id, persona)
+    await db_session.commit()
+    catalog_cache.invalidate()
+    return updated
+
+
+@router.delete("/personas/{persona_id}", status_code=204, dependencies=AdminOnly)
+async def delete_persona(catalogService: CatalogServiceDependency, persona_id: int, db_session: DatabaseSession) -> None:
+    await catalogService.delete_persona(persona_id)
+    await db_session.commit()
+    catalog_cache.invalidate()
+
+
+@router.get("/designers", response_model=list[CatalogEntryDetail])
+async def get_designers(catalogService: CatalogServiceDependency) -> list[CatalogEntryDetail]:
+    """List the designers whose guidelines components can follow, by ``designerId``."""
+    return await catalogService.get_designers()
+
+
+@router.get("/designers/{designer_id}", response_model=CatalogEntryDetail)
+async def get_designer(catalogService: CatalogServiceDependency, designer_id: int) -> CatalogEntryDetail:
+    return await catalogService.get_designer(designer_id)
+
+
+@router.post("/designers", response_model=CatalogEntryDetail, status_code=201, dependencies=AdminOnly)
+async def create_designer(catalogService: CatalogServiceDependency, designer: CatalogEntryCreate, db_session: DatabaseSession) -> CatalogEntryDetail:
+    created = await catalogService.create_designer(designer)
+    await db_session.commit()
+    catalog_cache.invalidate()
+    return created
+
+
+@router.patch("/designers/{designer_id}", response_model=CatalogEntryDetail, dependencies=AdminOnly)
+async def update_designer(catalogService: CatalogServiceDependency, designer_id: int, designer: CatalogEntryUpdate, db_session: DatabaseSession) -> CatalogEntryDetail:
+    updated = await catalogService.update_designer(designer_id, designer)
+    await db_session.commit()
+    catalog_cache.invalidate()
+    return updated
+
+
+@router.delete("/designers/{designer_id}", status_code=204, dependencies=AdminOnly)
+async def delete_designer(catalogService: CatalogServiceDependency, designer_id: int, db_session: DatabaseSession) -> None:
+    await catalogService.delete_designer(designer_id)
+    await db_session.commit()
+    catalog_cache.invalidate()
@@ -1,17 +1,315 @@
-from fastapi import APIRouter
+import json
+from collections.abc import AsyncIterator
 
-from app.dependencies.services import UserServiceDependency, GenerativeServiceDependency
-from app.types.generative import GenerativeCreate, GenerativeDetail
+import structlog
+from fastapi import APIRouter, HTTPException, Query, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.config import settings
+from app.dependencies.services import (
+    ComponentSearchDependency,
+    GenerationJobServiceDependency,
+    GenerativeServiceDependency,
+    UserServiceDependency,
+)
+from app.types.generation_job import GenerationJobDetail
+from app.types.generative import (
+    GeneratedComponentDetail,
+    GenerativeBatchCreate,
+    GenerativeBatchDetail,
+    GenerativeCreate,
+    GenerativeDetail,
+    GenerativeFeedbackCreate,
+    GenerativeSessionEvent,
+    GenerativeSessionMessage,
+    SimilarComponentDetail,
+)
+from app.dependencies.cancellation import CancellationDependency
 from app.dependencies.database import DatabaseSession
+from app.dependencies.fields import (
+    GeneratedComponentFieldsDependency,
+    GenerativeFieldsDependency,
+    SimilarComponentFieldsDependency,
+)
+from app.dependencies.rate_limit import GenerationQuotaDependency, resolve_principal
+from app.database import sessionmanager
+from app.errors import ObjectNotFoundError, RateLimitExceededError, RequestCancelledError
+from app.models.history_meta import versioned_session
+from app.services.core.generative import GenerativeService
+from app.services.core.generative_session import GenerativeSession
+from app.services.core.rate_limiter import generation_quota
+from app.utils.sse import format_sse
 
+logger = structlog.stdlib.get_logger(__name__)
 
 router = APIRouter(prefix="/generative", tags=["Generative components"])
 
 
 @router.post("/react", response_model=GenerativeDetail, status_code=201)
-async def get_generative(generativeService: GenerativeServiceDependency, generative_create: GenerativeCreate) -> GenerativeDetail:
-    users = await generativeService.build_generative_component(
-        generative_schema=generative_create
+async def get_generative(generativeService: GenerativeServiceDependency, generative_create: GenerativeCreate, db_session: DatabaseSession, quota: GenerationQuotaDependency, cancellation: CancellationDependency, fields: GenerativeFieldsDependency) -> GenerativeDetail:
+    """
+    Generate a component.
+
+    Use ``fields`` to return only part of it, e.g.
+    ``?fields=id,rawComponent`` to leave out the (large) generated prompt.
+    """
+    await quota.admit()
+    async with quota.metered():
+        users = await cancellation.run(generativeService.build_generative_component(
+            generative_schema=generative_create
+        ))
+    await db_session.commit()
+    return fields.respond(users, status_code=201)
+
+
+@router.post("/react/stream", response_class=StreamingResponse)
+async def stream_generative(generativeService: GenerativeServiceDependency, generative_create: GenerativeCreate, quota: GenerationQuotaDependency, cancellation: CancellationDependency) -> StreamingResponse:
+    """
+    Server-Sent Events variant of ``POST /generative/react``.
+
+    Emits a ``token`` event (``{"delta": ...}``) for every chunk produced by the
+    model, followed by a single ``done`` event carrying the complete
+    GenerativeDetail. Failures after the stream has started are reported with
+    an ``error`` event, since the status code has already been sent.
+    """
+
+    # Rejected before the stream starts, so the client gets a plain 404 or 429
+    await generativeService.resolve_catalog(generative_create)
+    await quota.admit()
+
+    async def event_stream() -> AsyncIterator[str]:
+        # The request's session is closed once the response starts, the stream needs its own
+        async with sessionmanager.session() as db_session:
+            versioned_session(db_session.sync_session)  # type: ignore
+            try:
+                async with quota.metered():
+                    stream = GenerativeService(db_session).stream_generative_component(generative_create)
+                    async for item in cancellation.iterate(stream):
+                        event = "done" if isinstance(item, GenerativeDetail) else "token"
+                        yield format_sse(item.model_dump_json(by_alias=True), event=event)
+                await db_session.commit()
+            except RequestCancelledError as exc:
+                await db_session.rollback()
+                yield format_sse(json.dumps({"message": exc.message}), event="error")
+            except Exception as exc:
+                await db_session.rollback()
+                logger.error(
+                    "Streaming generation failed",
+                    exception_type=exc.__class__.__name__,
+                    exception_detail=str(exc),
+                )
+                yield format_sse(json.dumps({"message": "Generation failed"}), event="error")
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    return users
 
+
+@router.post("/react/batch", response_model=GenerativeBatchDetail, status_code=201)
+async def get_generative_batch(generativeService: GenerativeServiceDependency, batch_create: GenerativeBatchCreate, db_session: DatabaseSession, quota: GenerationQuotaDependency, cancellation: CancellationDependency, fields: GenerativeFieldsDependency) -> GenerativeBatchDetail:
+    """
+    Generate ``count`` distinct variants of a component in one request.
+
+    ``fields`` selects the fields of every item, as for ``POST /generative/react``.
+    """
+    await quota.admit(batch_create.count)
+    async with quota.metered():
+        items = await cancellation.run(generativeService.build_generative_variants(batch_create))
+    await db_session.commit()
+    if fields.names is not None:
+        return JSONResponse({"items": fields.dump(items)}, status_code=201)
+    return GenerativeBatchDetail(items=items)
+
+
+@router.post("/react/batch/stream", response_class=StreamingResponse)
+async def stream_generative_batch(generativeService: GenerativeServiceDependency, batch_create: GenerativeBatchCreate, quota: GenerationQuotaDependency, cancellation: CancellationDependency) -> StreamingResponse:
+    """
+    Server-Sent Events variant of ``POST /generative/react/batch``.
+
+    Emits a ``variant`` event carrying a GenerativeDetail as soon as each
+    variant is ready, then a ``done`` event with the number of variants sent.
+    """
+
+    await generativeService.resolve_catalog(batch_create)
+    await quota.admit(batch_create.count)
+
+    async def event_stream() -> AsyncIterator[str]:
+        sent = 0
+        async with sessionmanager.session() as db_session:
+            versioned_session(db_session.sync_session)  # type: ignore
+            try:
+                async with quota.metered():
+                    stream = GenerativeService(db_session).stream_generative_variants(batch_create)
+                    async for detail in cancellation.iterate(stream):
+                        sent += 1
+                        yield format_sse(detail.model_dump_json(by_alias=True), event="variant")
+                await db_session.commit()
+                yield format_sse(json.dumps({"count": sent}), event="done")
+            except RequestCancelledError as exc:
+                # The variants already sent are kept
+                await db_session.commit()
+                yield format_sse(json.dumps({"message": exc.message, "count": sent}), event="error")
+            except Exception as exc:
+                await db_session.rollback()
+                logger.error(
+                    "Streaming batch generation failed",
+                    exception_type=exc.__class__.__name__,
+                    exception_detail=str(exc),
+                )
+                yield format_sse(json.dumps({"message": "Generation failed", "count": sent}), event="error")
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/session")
+async def generative_session(websocket: WebSocket) -> None:
+    """
+    WebSocket session for the generative page, prefetching the next variant.
+
+    The client sends ``{"type": "generate", "request": GenerativeCreate}`` to
+    start and ``{"type": "regenerate"}`` for another variant; each is answered
+    with a ``component`` event, flagged ``prefetched`` when the variant was
+    generated while the user was looking at the previous one. Failures are
+    reported with an ``error`` event and keep the session open. Browsers
+    cannot set headers on WebSockets, so the bearer token, if any, is passed
+    as the ``token`` query parameter.
+    """
+    principal = resolve_principal(websocket.query_params.get("token"), websocket.client.host if websocket.client else None)
+    session = GenerativeSession(generation_quota(principal))
+    await websocket.accept()
+
+    try:
+        while True:
+            raw_message = await websocket.receive_text()
+            try:
+                message = GenerativeSessionMessage.model_validate_json(raw_message)
+                prefetched = False
+                if message.type == "generate":
+                    detail = await session.generate(message.request or GenerativeCreate())
+                else:
+                    detail, prefetched = await session.regenerate()
+                event = GenerativeSessionEvent(type="component", component=detail, prefetched=prefetched)
+            except RateLimitExceededError as exc:
+                event = GenerativeSessionEvent(type="error", message=exc.message, retry_after_seconds=exc.retry_after)
+            except ObjectNotFoundError as exc:
+                event = GenerativeSessionEvent(type="error", message=exc.message)
+            except HTTPException as exc:
+                event = GenerativeSessionEvent(type="error", message=str(exc.detail))
+            except ValueError as exc:
+                # Includes pydantic's ValidationError for malformed messages
+                event = GenerativeSessionEvent(type="error", message=str(exc))
+            except Exception as exc:
+                logger.error(
+                    "Session generation failed",
+                    exception_type=exc.__class__.__name__,
+                    exception_detail=str(exc),
+                )
+                event = GenerativeSessionEvent(type="error", message="Generation failed")
+            await websocket.send_text(event.model_dump_json(by_alias=True))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await session.close()
+
+
+@router.post("/jobs", response_model=GenerationJobDetail, status_code=202)
+async def create_generation_job(jobService: GenerationJobServiceDependency, generative_create: GenerativeCreate, db_session: DatabaseSession, quota: GenerationQuotaDependency, response: Response) -> GenerationJobDetail:
+    """
+    Queue a generation and return immediately.
+
+    The job is run by a worker process (``python -m app.worker``); poll
+    ``GET /generative/jobs/{id}`` for its status and result.
+    """
+    await quota.admit()
+    job = await jobService.submit(generative_create, principal=quota.principal)
+    await db_session.commit()
+    response.headers["Location"] = f"{settings.API_V1_STR}{router.prefix}/jobs/{job.id}"
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=GenerationJobDetail)
+async def get_generation_job(
+    jobService: GenerationJobServiceDependency,
+    job_id: int,
+    wait: float = Query(default=0.0, ge=0.0, le=settings.GENERATION_JOB_MAX_WAIT_SECONDS),
+) -> GenerationJobDetail:
+    """
+    Fetch a generation job.
+
+    With ``wait`` (seconds) the request long-polls: it returns as soon as the
+    job succeeds or fails, or with the current status once the wait is over.
+    """
+    return await jobService.get_job(job_id, wait_seconds=wait)
+
+
+@router.get("/similar", response_model=list[SimilarComponentDetail])
+async def get_similar_components(
+    componentSearch: ComponentSearchDependency,
+    fields: SimilarComponentFieldsDependency,
+    db_session: DatabaseSession,
+    quota: GenerationQuotaDependency,
+    component_id: int | None = Query(default=None, alias="componentId", description="Find components similar to this one"),
+    q: str | None = Query(default=None, max_length=2000, description="Find components matching this description"),
+    k: int = Query(default=10, ge=1, le=settings.COMPONENT_SEARCH_MAX_RESULTS),
+    ef_search: int | None = Query(default=None, alias="efSearch", ge=1, le=1000),
+) -> list[SimilarComponentDetail]:
+    """
+    Find the ``k`` stored components most similar to a component or a text.
+
+    Answered from the HNSW index on component embeddings; ``efSearch``
+    overrides COMPONENT_SEARCH_EF_SEARCH for the request, trading latency
+    for recall. Only components embedded so far (see
+    COMPONENT_EMBEDDINGS_ENABLED) can be found; a component that is not is
+    embedded on its first search. A ``q`` search calls the embedding
+    provider, so it counts against the generation request quota.
+    """
+    if q:
+        await quota.admit()
+    similar = await componentSearch.similar(
+        component_id=component_id,
+        query=q,
+        limit=k,
+        ef_search=ef_search or settings.COMPONENT_SEARCH_EF_SEARCH,
+    )
+    # Keeps an embedding computed for the query component, so it is paid for once
+    await db_session.commit()
+    return fields.respond(similar)
+
+
+@router.get("/{component_id}", response_model=GeneratedComponentDetail)
+async def get_generated_component(generativeService: GenerativeServiceDependency, component_id: int, response: Response, fields: GeneratedComponentFieldsDependency) -> GeneratedComponentDetail:
+    """
+    Fetch a previously generated component by the id returned on creation.
+
+    Served from the database without calling the model. Components are
+    content-addressed and never change, so clients and proxies may cache the
+    response indefinitely. ``?fields=generatedPrompt`` fetches just the prompt
+    of a component created without it.
+    """
+    component = await generativeService.get_component(component_id)
+    etag = component.content_hash
+    if fields.names is not None:
+        etag = f"{etag}-{','.join(sorted(fields.names))}"
+    headers = {"Cache-Control": "public, max-age=31536000, immutable", "ETag": f'"{etag}"'}
+    response.headers.update(headers)
+    return fields.respond(component, headers=headers)
+
+
+@router.post("/{component_id}/feedback", status_code=204)
+async def post_component_feedback(generativeService: GenerativeServiceDependency, component_id: int, feedback: GenerativeFeedbackCreate, db_session: DatabaseSession, quota: GenerationQuotaDependency) -> None:
+    """
+    Report whether a component rendered in the client's react-live preview.
+
+    Feeds the per-variant statistics the prompt bandit selects variants from.
+    A report counts against the generation request quota, and only the first
+    report for a component is accepted, later ones get a 409.
+    """
+    await quota.admit()
+    await generativeService.record_feedback(component_id, feedback)
+    await db_session.commit()
@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+# Registers the scrape-time collectors for the pool, caches, gate, hedger and backends
+import app.services.core.runtime_metrics  # noqa: F401
+from app.utils.metrics import metrics
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def get_metrics() -> PlainTextResponse:
+    """
+    Prometheus scrape endpoint, in the text exposition format.
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,234 @@
+import asyncio
+import time
+from dataclasses import dataclass
+
+import structlog
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import sessionmanager
+from app.errors import ObjectNotFoundError
+from app.repositories.catalog_repository import CatalogVersionRepository, DesignerRepository, PersonaRepository
+from app.types.catalog import CatalogEntryCreate, CatalogEntryDetail, CatalogEntryUpdate
+
+logger = structlog.stdlib.get_logger(__name__)
+
+CATALOG = "catalog"
+"""Name of the version counter shared by personas and designers"""
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """Every persona and designer as of one catalog version."""
+
+    version: int
+    """The catalog version the entries were loaded at"""
+
+    personas: dict[int, CatalogEntryDetail]
+    """Personas by id"""
+
+    designers: dict[int, CatalogEntryDetail]
+    """Designers by id"""
+
+    def persona(self, persona_id: int) -> CatalogEntryDetail:
+        """
+        Look up a persona.
+
+        Raises:
+            ObjectNotFoundError: If no persona has this id
+        """
+        if persona_id not in self.personas:
+            raise ObjectNotFoundError(object_type="Persona", object_id=persona_id)
+        return self.personas[persona_id]
+
+    def designer(self, designer_id: int) -> CatalogEntryDetail:
+        """
+        Look up a designer.
+
+        Raises:
+            ObjectNotFoundError: If no designer has this id
+        """
+        if designer_id not in self.designers:
+            raise ObjectNotFoundError(object_type="Designer", object_id=designer_id)
+        return self.designers[designer_id]
+
+
+class CatalogCache:
+    """
+    Process-wide copy of the persona and designer catalog.
+
+    Lookups are served from memory. The catalog version in the database is
+    checked at most every ``check_seconds``, and the entries are reloaded
+    only when it changed; writes made by this process invalidate the copy at
+    once, those of other workers are picked up on their next check.
+
+    Args:
+        check_seconds (float): Longest time between version checks
+    """
+
+    def __init__(self, check_seconds: float = settings.CATALOG_CACHE_CHECK_SECONDS):
+        self.check_seconds = check_seconds
+        self._snapshot: CatalogSnapshot | None = None
+        self._checked_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    async def get(self, db_session: AsyncSession | None = None) -> CatalogSnapshot:
+        """
+        Return the current catalog.
+
+        Args:
+            db_session (AsyncSession | None): Session to read with when a check is
+                due, a new one if omitted
+
+        Returns:
+            CatalogSnapshot: The catalog, at most ``check_seconds`` out of date
+        """
+        if self._snapshot is not None and time.monotonic() - self._checked_at < self.check_seconds:
+            return self._snapshot
+
+        # Concurrent requests wait for one check instead of each reloading
+        async with self._lock:
+            if self._snapshot is None or time.monotonic() - self._checked_at >= self.check_seconds:
+                if db_session is None:
+                    async with sessionmanager.session() as session:
+                        await self._check(session)
+                else:
+                    await self._check(db_session)
+        assert self._snapshot is not None
+        return self._snapshot
+
+    def invalidate(self) -> None:
+        """Check the version on the next lookup, after this process wrote the catalog."""
+        self._checked_at = float("-inf")
+
+    async def _check(self, db_session: AsyncSession) -> None:
+        version = await CatalogVersionRepository(db_session).get_version(CATALOG)
+        if self._snapshot is None or self._snapshot.version != version:
+            personas = await PersonaRepository(db_session).get_all()
+            designers = await DesignerRepository(db_session).get_all()
+            self._snapshot = CatalogSnapshot(
+                version=version,
+                personas={persona.id: persona for persona in personas},
+                designers={designer.id: designer for designer in designers},
+            )
+            logger.info("Loaded catalog", version=version, personas=len(personas), designers=len(designers))
+        self._checked_at = time.monotonic()
+
+
+catalog_cache = CatalogCache()
+"""Process-wide catalog, read by every generation"""
+
+
+class CatalogService:
+    """Service class for managing the persona and designer catalog.
+
+    Reads are served from ``catalog_cache``. Writes bump the catalog version
+    in the same transaction; callers invalidate the cache once they commit.
+    """
+
+    def __init__(self, db_session: AsyncSession):
+        """Initialize CatalogService with database session and required repositories.
+
+        Args:
+            db_session (AsyncSession): SQLAlchemy async database session
+        """
+        self.db_session = db_session
+        self.persona_repository = PersonaRepository(db_session)
+        self.designer_repository = DesignerRepository(db_session)
+        self.version_repository = CatalogVersionRepository(db_session)
+
+    async def get_personas(self) -> list[CatalogEntryDetail]:
+        """Retrieve every persona.
+
+        Returns:
+            list[CatalogEntryDetail]: The personas, by id
+        """
+        return list((await catalog_cache.get(self.db_session)).personas.values())
+
+    async def get_persona(self, persona_id: int) -> CatalogEntryDetail:
+        """Retrieve a persona.
+
+        Raises:
+            ObjectNotFoundError: If no persona has this id
+        """
+        return (await catalog_cache.get(self.db_session)).persona(persona_id)
+
+    async def create_persona(self, persona: CatalogEntryCreate) -> CatalogEntryDetail:
+        """Add a persona.
+
+        Args:
+            persona (CatalogEntryCreate): Its name and prompt
+
+        Returns:
+            CatalogEntryDetail: The persona with its id
+        """
+        created = await self.persona_repository.create(persona)
+        await self.version_repository.bump(CATALOG)
+        return created
+
+    async def update_persona(self, persona_id: int, persona: CatalogEntryUpdate) -> CatalogEntryDetail:
+        """Change the name or prompt of a persona.
+
+        Raises:
+            ObjectNotFoundError: If no persona has this id
+        """
+        updated = await self.persona_repository.update(persona_id, persona)
+        await self.version_repository.bump(CATALOG)
+        return updated
+
+    async def delete_persona(self, persona_id: int) -> None:
+        """Remove a persona. Components stored for it are kept.
+
+        Raises:
+            ObjectNotFoundError: If no persona has this id
+        """
+        await self.persona_repository.delete(persona_id)
+        await self.version_repository.bump(CATALOG)
+
+    async def get_designers(self) -> list[CatalogEntryDetail]:
+        """Retrieve every designer.
+
+        Returns:
+            list[CatalogEntryDetail]: The designers, by id
+        """
+        return list((await catalog_cache.get(self.db_session)).designers.values())
+
+    async def get_designer(self, designer_id: int) -> CatalogEntryDetail:
+        """Retrieve a designer.
+
+        Raises:
+            ObjectNotFoundError: If no designer has this id
+        """
+        return (await catalog_cache.get(self.db_session)).designer(designer_id)
+
+    async def create_designer(self, designer: CatalogEntryCreate) -> CatalogEntryDetail:
+        """Add a designer.
+
+        Args:
+            designer (CatalogEntryCreate): Its name and style guidelines
+
+        Returns:
+            CatalogEntryDetail: The designer with its id
+        """
+        created = await self.designer_repository.create(designer)
+        await self.version_repository.bump(CATALOG)
+        return created
+
+    async def update_designer(self, designer_id: int, designer: CatalogEntryUpdate) -> CatalogEntryDetail:
+        """Change the name or guidelines of a designer.
+
+        Raises:
+            ObjectNotFoundError: If no designer has this id
+        """
+        updated = await self.designer_repository.update(designer_id, designer)
+        await self.version_repository.bump(CATALOG)
+        return updated
+
+    async def delete_designer(self, designer_id: int) -> None:
+        """Remove a designer. Components stored for it are kept.
+
+        Raises:
+            ObjectNotFoundError: If no designer has this id
+        """
+        await self.designer_repository.delete(designer_id)
+        await self.version_repository.bump(CATALOG)
@@ -0,0 +1,305 @@
+import asyncio
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+
+import structlog
+
+from app.config import settings
+from app.services.core.jsx_validator import validate_component
+from app.types.generative import GenerativeDetail
+
+logger = structlog.stdlib.get_logger(__name__)
+
+PoolKey = tuple[int, int]
+"""A (persona_id, designer_id) pair"""
+
+ComponentFactory = Callable[[int, int], Awaitable[GenerativeDetail]]
+"""Coroutine function generating a component for a (persona_id, designer_id) pair"""
+
+PoolKeysSource = Callable[[], Awaitable[tuple[int, Iterable[PoolKey]]]]
+"""Coroutine function returning the current catalog version and the pairs it defines"""
+
+
+@dataclass
+class PooledComponent:
+    """A pre-generated component waiting to be served."""
+
+    detail: GenerativeDetail
+    """The generated component"""
+
+    created_at: float = field(default_factory=time.monotonic)
+    """Monotonic timestamp of when the component was generated"""
+
+
+@dataclass
+class ComponentPoolStats:
+    """Point-in-time snapshot of a ComponentPool."""
+
+    hits: int
+    """Requests served from the pool"""
+
+    misses: int
+    """Eligible requests that found the pool empty"""
+
+    expired: int
+    """Components discarded for exceeding the maximum age"""
+
+    rejected: int
+    """Generated components discarded because they failed validation"""
+
+    invalidated: int
+    """Components discarded because the catalog changed after they were generated"""
+
+    sizes: dict[str, int]
+    """Ready components per "persona_id:designer_id" pair"""
+
+
+class ComponentPool:
+    """
+    Keeps a queue of ready, validated components for every persona/designer pair.
+
+    A background task per pair tops its queue up to ``depth`` components and
+    wakes up again whenever a component is taken or is about to expire, so
+    requests can be served without waiting on the LLM. Refills share a small
+    semaphore so that the pool never monopolises the process' LLM capacity.
+
+    The pairs follow the persona/designer catalog: its version is checked
+    every ``catalog_check_seconds``, and when it changed every pooled
+    component is dropped, since its prompt may have been edited, pairs that
+    no longer exist stop being refilled and new ones start.
+
+    Args:
+        depth (int): Number of ready components to keep per pair
+        max_age_seconds (float): Age after which a component is discarded
+        refill_concurrency (int): Maximum number of refills running at once
+        catalog_check_seconds (float): Time between checks of the catalog version
+    """
+
+    def __init__(self, depth: int, max_age_seconds: float, refill_concurrency: int, catalog_check_seconds: float):
+        self.depth = depth
+        self.max_age_seconds = max_age_seconds
+        self.refill_concurrency = refill_concurrency
+        self.catalog_check_seconds = catalog_check_seconds
+
+        self._queues: dict[PoolKey, deque[PooledComponent]] = {}
+        self._wakeups: dict[PoolKey, asyncio.Event] = {}
+        self._tasks: dict[PoolKey, asyncio.Task[None]] = {}
+        self._watcher: asyncio.Task[None] | None = None
+        self._version: int | None = None
+        self._factory: ComponentFactory | None = None
+        self._validator: Callable[[GenerativeDetail], bool] = _is_servable
+        self._refill_semaphore: asyncio.Semaphore | None = None
+
+        self._hits = 0
+        self._misses = 0
+        self._expired = 0
+        self._rejected = 0
+        self._invalidated = 0
+
+    @property
+    def running(self) -> bool:
+        """Whether the pool is started."""
+        return self._watcher is not None
+
+    async def start(
+        self,
+        factory: ComponentFactory,
+        keys: PoolKeysSource,
+        validator: Callable[[GenerativeDetail], bool] | None = None,
+    ) -> None:
+        """
+        Start a background refill task for each pair of the current catalog.
+
+        Args:
+            factory: Coroutine function generating a component for a pair
+            keys: Coroutine function returning the catalog version and the
+                (persona_id, designer_id) pairs to keep warm, polled for changes
+            validator: Optional predicate deciding whether a generated
+                component may be pooled
+        """
+        if self.running or self.depth < 1:
+            return
+
+        self._factory = factory
+        if validator is not None:
+            self._validator = validator
+        self._refill_semaphore = asyncio.Semaphore(self.refill_concurrency)
+
+        self.sync(*await keys())
+        self._watcher = asyncio.create_task(self._watch_catalog(keys))
+        logger.info("Component pool started", pairs=len(self._tasks), depth=self.depth)
+
+    async def stop(self) -> None:
+        """Cancel the refill tasks and wait for them to finish."""
+        tasks = list(self._tasks.values())
+        if self._watcher is not None:
+            tasks.append(self._watcher)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._watcher = None
+
+    def sync(self, version: int, keys: Iterable[PoolKey]) -> None:
+        """
+        Follow a catalog version: drop the pooled components and refill the pairs it defines.
+
+        Args:
+            version (int): The catalog version
+            keys (Iterable[PoolKey]): Its (persona_id, designer_id) pairs
+        """
+        if version == self._version:
+            return
+
+        keys = set(keys)
+        dropped = sum(len(queue) for queue in self._queues.values())
+        self._invalidated += dropped
+        for key in [key for key in self._tasks if key not in keys]:
+            self._tasks.pop(key).cancel()
+            del self._queues[key], self._wakeups[key]
+        for queue in self._queues.values():
+            queue.clear()
+        for wakeup in self._wakeups.values():
+            wakeup.set()
+        for key in keys - self._tasks.keys():
+            self._queues[key] = deque()
+            self._wakeups[key] = asyncio.Event()
+            self._tasks[key] = asyncio.create_task(self._refill_loop(key))
+
+        if self._version is not None:
+            logger.info("Component pool follows a new catalog", version=version, pairs=len(keys), dropped=dropped)
+        self._version = version
+
+    def pop(self, persona_id: int, designer_id: int, catalog_version: int | None = None) -> GenerativeDetail | None:
+        """
+        Take a ready component for a pair, if one is available.
+
+        Args:
+            persona_id (int): The requested persona
+            designer_id (int): The requested designer
+            catalog_version (int | None): The catalog version the request was
+                checked against; the pool misses until it has caught up with it
+
+        Returns:
+            GenerativeDetail | None: A pooled component, or None on a miss
+        """
+        if not self.running:
+            return None
+
+        key = (persona_id, designer_id)
+        queue = self._queues.get(key)
+        if queue is None:
+            return None
+        if catalog_version is not None and catalog_version != self._version:
+            self._misses += 1
+            return None
+
+        self._evict_expired(key)
+        if not queue:
+            self._misses += 1
+            return None
+
+        pooled = queue.popleft()
+        self._hits += 1
+        self._wakeups[key].set()
+        return pooled.detail
+
+    def stats(self) -> ComponentPoolStats:
+        """
+        Return a snapshot of the pool's counters and queue sizes.
+
+        Returns:
+            ComponentPoolStats: The current pool statistics
+        """
+        return ComponentPoolStats(
+            hits=self._hits,
+            misses=self._misses,
+            expired=self._expired,
+            rejected=self._rejected,
+            invalidated=self._invalidated,
+            sizes={f"{p}:{d}": len(queue) for (p, d), queue in self._queues.items()},
+        )
+
+    def _evict_expired(self, key: PoolKey) -> None:
+        queue = self._queues[key]
+        now = time.monotonic()
+        while queue and now - queue[0].created_at > self.max_age_seconds:
+            queue.popleft()
+            self._expired += 1
+
+    async def _refill_loop(self, key: PoolKey) -> None:
+        assert self._factory is not None and self._refill_semaphore is not None
+        queue = self._queues[key]
+        wakeup = self._wakeups[key]
+        backoff = 1.0
+
+        while True:
+            self._evict_expired(key)
+
+            if len(queue) >= self.depth:
+                # Sleep until a component is taken or the oldest one expires
+                wakeup.clear()
+                timeout = self.max_age_seconds - (time.monotonic() - queue[0].created_at)
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout=max(timeout, 0.0) + 0.01)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            version = self._version
+            try:
+                async with self._refill_semaphore:
+                    detail = await self._factory(*key)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning(
+                    "Component pool refill failed",
+                    persona_id=key[0],
+                    designer_id=key[1],
+                    exception_type=exc.__class__.__name__,
+                    exception_detail=str(exc),
+                    retry_in_seconds=backoff,
+                )
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60.0)
+                continue
+
+            if version != self._version:
+                # Generated from a catalog that has changed since
+                self._invalidated += 1
+            elif self._validator(detail):
+                queue.append(PooledComponent(detail=detail))
+                backoff = 1.0
+            else:
+                self._rejected += 1
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60.0)
+
+    async def _watch_catalog(self, keys: PoolKeysSource) -> None:
+        while True:
+            await asyncio.sleep(self.catalog_check_seconds)
+            try:
+                self.sync(*await keys())
+            except Exception as exc:
+                logger.warning(
+                    "Component pool catalog check failed",
+                    exception_type=exc.__class__.__name__,
+                    exception_detail=str(exc),
+                )
+
+
+def _is_servable(detail: GenerativeDetail) -> bool:
+    """Only pool components that pass JSX validation without further repairs."""
+    return validate_component(detail.raw_component).valid
+
+
+component_pool = ComponentPool(
+    depth=settings.GENERATIVE_POOL_DEPTH,
+    max_age_seconds=settings.GENERATIVE_POOL_MAX_AGE_SECONDS,
+    refill_concurrency=settings.GENERATIVE_POOL_REFILL_CONCURRENCY,
+    catalog_check_seconds=settings.CATALOG_CACHE_CHECK_SECONDS,
+)
+"""Process-wide pool of pre-generated components"""
@@ -0,0 +1,115 @@
+import structlog
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.repositories.generated_component_repository import GeneratedComponentRepository
+from app.services.llm.embeddings import Embedder, get_embedder
+from app.types.generative import GeneratedComponentBase, SimilarComponentDetail
+from app.utils.string import normalize_whitespace
+
+logger = structlog.stdlib.get_logger(__name__)
+
+MAX_EMBEDDED_CHARS = 8000
+"""Component text beyond this is not embedded, keeping within the embedding model's input limit"""
+
+
+class ComponentSearch:
+    """
+    Finds stored components similar to a component or to a free-text query.
+
+    Components are embedded from their preferences and code, and searched
+    through the HNSW index on ``generated_components.embedding``.
+
+    Args:
+        db_session (AsyncSession): SQLAlchemy async database session
+        embedder (Embedder | None): Embedder to use, defaults to the configured one
+    """
+
+    def __init__(self, db_session: AsyncSession, embedder: Embedder | None = None):
+        self.repository = GeneratedComponentRepository(db_session)
+        self.embedder = embedder or get_embedder()
+
+    async def index(self, component_id: int, component: GeneratedComponentBase) -> list[float] | None:
+        """Embed a stored component so that it can be found by similarity.
+
+        An embedding failure is logged and leaves the component unindexed
+        rather than failing the request that stored it; the embedding is then
+        computed the first time the component is used as a search query.
+
+        Args:
+            component_id (int): The id the component is stored under
+            component (GeneratedComponentBase): The component
+
+        Returns:
+            list[float] | None: The embedding, or None if it could not be computed
+        """
+        try:
+            embedding = await self.embedder.embed(component_text(component))
+        except Exception as exc:
+            logger.warning(
+                "Component embedding failed",
+                component_id=component_id,
+                exception_type=exc.__class__.__name__,
+                exception_detail=str(exc),
+            )
+            return None
+
+        await self.repository.set_embedding(component_id, embedding)
+        return embedding
+
+    async def similar(
+        self,
+        component_id: int | None = None,
+        query: str | None = None,
+        limit: int = 10,
+        ef_search: int = settings.COMPONENT_SEARCH_EF_SEARCH,
+    ) -> list[SimilarComponentDetail]:
+        """Find the components most similar to a component or to a text.
+
+        Args:
+            component_id (int | None): A stored component, left out of the results
+            query (str | None): A free-text description
+            limit (int): Number of components to return
+            ef_search (int): HNSW candidate list size, trading latency for recall
+
+        Returns:
+            list[SimilarComponentDetail]: The components, most similar first
+
+        Raises:
+            HTTPException: 422 unless exactly one of component_id and query is given
+            ObjectNotFoundError: If no component has ``component_id``
+        """
+        if (component_id is None) == (not query):
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Provide either componentId or q",
+            )
+
+        if component_id is not None:
+            embedding = await self.repository.get_embedding(component_id)
+            if embedding is None:
+                embedding = await self.index(component_id, await self.repository.get_by_id(component_id))
+            if embedding is None:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="The component could not be embedded",
+                )
+        else:
+            embedding = await self.embedder.embed(normalize_whitespace(query))
+
+        return await self.repository.find_similar(embedding, limit, ef_search, exclude_id=component_id)
+
+
+def component_text(component: GeneratedComponentBase) -> str:
+    """
+    Build the text embedded for a component.
+
+    Args:
+        component (GeneratedComponentBase): The component
+
+    Returns:
+        str: The preferences it was generated for followed by its code, truncated
+    """
+    preferences = normalize_whitespace(component.user_prefferences)
+    return f"preferences {preferences}\n{component.raw_component}"[:MAX_EMBEDDED_CHARS]
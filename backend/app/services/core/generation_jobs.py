@@ -0,0 +1,145 @@
+import asyncio
+import time
+from typing import Any
+
+import structlog
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.repositories.generation_job_repository import GenerationJobRepository
+from app.services.core.generative import GenerativeService
+from app.services.core.rate_limiter import generation_quota
+from app.types.enum.generation_job_enum import GenerationJobStatusEnum
+from app.types.generation_job import GenerationJobCreate, GenerationJobDetail
+from app.types.generative import GenerativeCreate
+
+logger = structlog.stdlib.get_logger(__name__)
+
+FINISHED_STATUSES = (GenerationJobStatusEnum.succeeded, GenerationJobStatusEnum.failed)
+
+
+class GenerationJobService:
+    """Service class for asynchronous generation jobs.
+
+    The API enqueues jobs and reads them back; ``python -m app.worker``
+    claims and runs them, so API and LLM capacity scale independently.
+    """
+
+    def __init__(self, db_session: AsyncSession):
+        """Initialize GenerationJobService with database session and required repositories.
+
+        Args:
+            db_session (AsyncSession): SQLAlchemy async database session
+        """
+        self.db_session = db_session
+        self.job_repository = GenerationJobRepository(db_session)
+
+    async def submit(self, generative_schema: GenerativeCreate, principal: str) -> GenerationJobDetail:
+        """Queue a generation.
+
+        Args:
+            generative_schema (GenerativeCreate): The generation to run
+            principal (str): Who the job's token usage is charged to
+
+        Returns:
+            GenerationJobDetail: The pending job
+
+        Raises:
+            ObjectNotFoundError: If the persona or the designer does not exist
+        """
+        # Rejected now rather than failing in the worker
+        await GenerativeService(self.db_session).resolve_catalog(generative_schema)
+
+        # fresh is excluded from dumps, but the worker needs it
+        request = {**generative_schema.model_dump(), "fresh": generative_schema.fresh}
+        job = await self.job_repository.enqueue(GenerationJobCreate(request=request, principal=principal))
+        logger.info("Queued generation job", job_id=job.id, principal=principal)
+        return job
+
+    async def get_job(self, job_id: int, wait_seconds: float = 0.0) -> GenerationJobDetail:
+        """Fetch a job, optionally waiting for it to finish.
+
+        While waiting, the job is re-read every poll interval and the
+        transaction is ended between reads, so no connection is held.
+
+        Args:
+            job_id (int): The job id
+            wait_seconds (float): Longest time to wait for the job to succeed or fail
+
+        Returns:
+            GenerationJobDetail: The job, finished or as of the end of the wait
+
+        Raises:
+            ObjectNotFoundError: If no job has this id
+        """
+        deadline = time.monotonic() + wait_seconds
+        while True:
+            job = await self.job_repository.get_current(job_id)
+            remaining = deadline - time.monotonic()
+            if job.status in FINISHED_STATUSES or remaining <= 0:
+                return job
+            await self.db_session.commit()
+            await asyncio.sleep(min(settings.GENERATION_JOB_POLL_INTERVAL_SECONDS, remaining))
+
+    async def claim(self) -> GenerationJobDetail | None:
+        """Claim the next job for this worker.
+
+        Jobs whose last allowed attempt outlived its lease are failed first,
+        so a job that keeps killing its worker is not retried forever.
+
+        Returns:
+            GenerationJobDetail | None: The claimed job, or None when the queue is empty
+        """
+        for job_id in await self.job_repository.fail_expired(settings.GENERATION_JOB_MAX_ATTEMPTS):
+            logger.warning("Generation job failed, lease expired", job_id=job_id)
+        return await self.job_repository.claim(
+            settings.GENERATION_JOB_LEASE_SECONDS, settings.GENERATION_JOB_MAX_ATTEMPTS
+        )
+
+    async def run(self, job: GenerationJobDetail) -> None:
+        """Run a claimed job and record its outcome.
+
+        The generation is cut off when the lease expires, since the job may
+        then be claimed by another worker; an outcome recorded after that is
+        discarded. Failed attempts go back to the queue until the job has
+        been claimed GENERATION_JOB_MAX_ATTEMPTS times. The caller commits.
+
+        Args:
+            job (GenerationJobDetail): The claimed job
+        """
+        started = time.perf_counter()
+        try:
+            async with asyncio.timeout(settings.GENERATION_JOB_LEASE_SECONDS):
+                async with generation_quota(job.principal).metered():
+                    detail = await GenerativeService(self.db_session).build_generative_component(job.request)
+        except Exception as exc:
+            await self.db_session.rollback()
+            retry = job.attempts < settings.GENERATION_JOB_MAX_ATTEMPTS
+            logger.warning(
+                "Generation job failed",
+                job_id=job.id,
+                attempt=job.attempts,
+                retry=retry,
+                exception_type=exc.__class__.__name__,
+                exception_detail=str(exc),
+            )
+            await self._finish(
+                job,
+                GenerationJobStatusEnum.pending if retry else GenerationJobStatusEnum.failed,
+                error=f"{exc.__class__.__name__}: {exc}",
+            )
+            return
+
+        if await self._finish(job, GenerationJobStatusEnum.succeeded, result=detail.model_dump(mode="json"), error=None):
+            logger.info(
+                "Generation job succeeded",
+                job_id=job.id,
+                attempt=job.attempts,
+                seconds=round(time.perf_counter() - started, 3),
+            )
+
+    async def _finish(self, job: GenerationJobDetail, status: GenerationJobStatusEnum, **values: Any) -> bool:
+        recorded = await self.job_repository.finish(job.id, job.attempts, status, **values)
+        if not recorded:
+            logger.warning("Generation job outcome discarded, lease lost", job_id=job.id, attempt=job.attempts)
+        return recorded
@@ -1,76 +1,79 @@
-import random
-from langchain.chat_models import init_chat_model
-from langchain_core.messages import HumanMessage, SystemMessage
-from app.types.generative import GenerativeCreate, GenerativeDetail
+import asyncio
+import hashlib
+import time
+from collections.abc import AsyncIterator
+from contextlib import aclosing
+from dataclasses import dataclass
+
+import structlog
+from fastapi import HTTPException, status
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.types.generative import (
+    GeneratedComponentCreate,
+    GeneratedComponentDetail,
+    GenerativeBatchCreate,
+    GenerativeCreate,
+    GenerativeDetail,
+    GenerativeFeedbackCreate,
+    GenerativeStreamChunk,
+    TokenUsage,
+)
 
 from app.config import settings
+from app.repositories.generated_component_repository import GeneratedComponentRepository
+from app.services.core.catalog import CatalogSnapshot, catalog_cache
+from app.services.core.component_pool import component_pool
+from app.services.core.component_search import ComponentSearch
+from app.services.core.jsx_validator import (
+    ComponentContractViolation,
+    JSXValidationResult,
+    StreamingComponentValidator,
+    component_validation_stats,
+    validate_component,
+)
+from app.services.core.prompt_bandit import prompt_bandit
+from app.services.core.prompt_registry import PromptVariant, prompt_registry
+from app.services.core.semantic_cache import SemanticCache, cache_text
+from app.services.llm.concurrency import llm_gate
+from app.services.llm.hedging import HedgeAttempt, llm_hedger
+from app.services.llm.providers import LLMBackend, provider_router
+from app.services.llm.usage import TokenUsageStats, combine_usage, metered_usage, token_usage, token_usage_stats
+from app.utils.single_flight import SingleFlight
+from app.utils.string import normalize_whitespace
+
+logger = structlog.stdlib.get_logger(__name__)
+
+generation_flights: SingleFlight[tuple[GenerativeDetail, TokenUsageStats]] = SingleFlight()
+"""Coalesces concurrent identical generations within the process, with the tokens they used"""
+
 
 class GenerativeService:
     """
     """
 
-    model = init_chat_model("gpt-4.1-nano", model_provider="openai", api_key=settings.get_openai_api_key())
+    router = provider_router
+    """Chat model backends, selected per call by the configured routing policy"""
 
-    def __init__(self):
-        self.target_audiences = [
-            {
-                "id": 1,
-                "prompt": "Event organizers looking to create a user-friendly form for event registration.",
-                "persona": "Event Organizer",
-            },
-            {
-                "id": 2,
-                "prompt": "Personal coaches building introspective intake forms for their clients.",
-                "persona": "Personal Coach",
-            },
-            {
-                "id": 3,
-                "prompt": "HR managers creating onboarding and employee insight forms with complex level of details.",
-                "persona": "HR Manager",    
-            },
+    def __init__(self, db_session: AsyncSession | None = None):
+        """Initialize GenerativeService.
 
-        ]
+        Args:
+            db_session (AsyncSession | None): SQLAlchemy async database session.
+                Layers backed by the database (the semantic cache and the
+                component store) are skipped without one, e.g. for background
+                pool refills.
+        """
+        self.db_session = db_session
+        self.component_repository = GeneratedComponentRepository(db_session) if db_session is not None else None
+        self.semantic_cache = (
+            SemanticCache(db_session) if db_session is not None and settings.SEMANTIC_CACHE_ENABLED else None
+        )
+        self.component_search = (
+            ComponentSearch(db_session) if db_session is not None and settings.COMPONENT_EMBEDDINGS_ENABLED else None
+        )
 
-        self.designers = [
-            {
-                "id": 1,
-                "prompt": """
-                    I prefer a clean, modern, minimalist design with generous white space, subtle typography, and a neutral color palette (e.g., black, white, light gray).
-                    Content should be direct, well-organized, and free of unnecessary visual embellishments or gradients.
-                    Emphasize clarity, simplicity, and hierarchy of information through typographic scale and spacing.
-                    Action buttons should be bold and high-contrast but remain minimal in styling, with flat colors and no shadows.
-                    Icons are optional; if used, they should be simple, monochromatic, and line-based to maintain minimalism.
-                    Avoid borders unless necessary for separation; rely on spacing and alignment to guide the user.
-                """,
-                "persona": "Minimalist Designer",
-            },
-            {
-                "id": 2,
-                "prompt": """
-                    I want a fun, colorful, and lively UI that feels energetic and modern—targeted for young adults or creative professionals, not for children.
-                    Use rounded corners, soft shadows, and vibrant accent colors to make the interface approachable and dynamic, while avoiding overly cartoonish or exaggerated elements.
-                    Include tasteful illustrative icons or small decorative graphics alongside feature lists to convey friendliness without being childish.
-                    Typography can be slightly expressive (e.g., a geometric or rounded sans-serif), but maintain professionalism and legibility.
-                    Buttons should use bold, saturated colors with subtle hover animations (like color shifts or scale) to add personality without being playful in a juvenile sense.
-                    Backgrounds may include soft gradients or subtle patterns for depth, but should avoid overly bright or primary color palettes typical of children's designs.
-                """,
-                "persona": "Playful & Creative Designer",
-            },
-            {
-                "id": 3,
-                "prompt": """
-                    I prefer a formal, polished, enterprise-level design with structured grid layouts, sharp lines, and a professional color palette (e.g., white, dark gray, navy, with subtle accent colors like blue or green).
-                    Icons should be minimal, monochromatic, and professional, aligning with modern business software aesthetics.
-                    Use clear, legible typography with consistent font weights (e.g., medium for body, bold for headings) to convey trust, reliability, and authority.
-                    Buttons should have clear outlines or solid fills with subtle hover states, avoiding flashy animations.
-                    Layouts should prioritize information hierarchy with strong alignment and spacing, using dividers or subtle background shades for section separation.
-                    Avoid decorative elements that don’t serve a functional or communicative purpose.
-                """,
-                "persona": "Professional & Corporate Designer",
-            }
-        ]
-    
-    def get_system_message(self, tech_requirements=None, ui_requirements=None, target_audience=None, design_guidelines=None):
+    def get_system_message(self, tech_requirements=None, ui_requirements=None, target_audience=None, design_guidelines=None, variant=None, layout=None):
         """
         Generate a system message with dynamic values for different sections.
         
@@ -79,169 +82,849 @@ class GenerativeService:
         - ui_requirements: UI Component requirements to include
         - target_audience: Target audience description to include
         - design_guidelines: Design guidelines to include
+        - variant: PromptVariant selecting the randomised sections, a random one if omitted
+        - layout: Prompt layout ("prefix" or "legacy"), PROMPT_LAYOUT if omitted
         
         Returns:
         - Formatted system message string
         """
-        # Create variations of technical requirements
-        tech_variations = [
-            """Use React and inline CSS for styling.
-            Use functional components and hooks.
-            Focus on responsive design principles.
-            Ensure compatibility with modern browsers and accessibility standards.""",
-            
-            """Use React with Material UI components.
-            Apply modern hooks pattern for state management.
-            Ensure components are accessible and follow WCAG guidelines.
-            Optimize for performance and reusability.""",
-            
-            """Use React functional components.
-            Implement clean separation of markup and logic.
-            Use CSS-in-JS for styling with MUI.
-            Ensure modularity and scalability of components."""
-        ]
-            
-        # Create variations of UI requirements
-        ui_variations = [
-            """Create a form to get to know the user.
-            The form should always include the following fields:
-            - Full Name (text input)
-            - Email Address (email input)
-            - Phone Number (tel input)
-            Add 3-5 additional fields based on the user target.
-            Include tooltips or helper text for better user guidance.""",
-            
-            """Design a user profile form that captures essential information.
-            Required fields include:
-            - Name (text input)
-            - Contact email (email input)
-            - Mobile number (tel input)
-            Include validation, helpful error messages, and a progress indicator for multi-step forms.""",
-            
-            """Build an information collection form with:
-            - User's full name (text input)
-            - Email for communications (email input)
-            - Contact number (tel input)
-            Add dynamic fields based on user preferences.
-            Ensure a clear submission flow with a confirmation message."""
-        ]
-            
-        # Create variations for design guidelines
-        design_variations = [
-            """Use a cohesive color scheme with at least 3 coordinating colors.
-            Buttons should have distinct hover states with animations.
-            Maintain consistent spacing between elements.
-            Use subtle gradients or shadows to add depth to the design.""",
-            
-            """Apply visual hierarchy through size, color, and spacing.
-            Form fields should include clear labels, helper text, and icons where appropriate.
-            Use smooth transitions and animations for interactive elements.
-            Keep the interface clean, focused, and visually appealing.""",
-            
-            """Implement thoughtful spacing for improved readability.
-            Use colors strategically to guide attention and create contrast.
-            Make sure error states are clearly visible with detailed messages.
-            Form layout should guide the user through completion steps with visual cues."""
-        ]
-        
-        default_target_audience = """some target audience examples:
-            - Event organizers looking to create a user-friendly form for event registration.
-            - Personal coaches building introspective intake forms for their clients."""
-            
-        # Choose random variations if no specific requirements are provided
-        tech_requirements = tech_requirements or random.choice(tech_variations)
-        ui_requirements = ui_requirements or random.choice(ui_variations)
-        target_audience = target_audience or default_target_audience
-        
-        # Only randomize design guidelines if not explicitly provided from a designer
-        if design_guidelines is None or design_guidelines == "":
-            design_guidelines = random.choice(design_variations)
-        
-        # Add randomization instructions to encourage variety
-        randomization_prompt = f"""
-            Make this implementation unique by:
-            - Using a {random.choice(['minimalist', 'playful', 'professional', 'modern', 'artistic'])} approach
-            - Focusing on {random.choice(['usability', 'visual appeal', 'efficiency', 'clarity', 'engagement'])}
-            - Including {random.choice(['subtle animations', 'thoughtful microcopy', 'intuitive validation', 'visual feedback', 'progressive disclosure'])}
-            - Each time you generate, create a different layout and component arrangement
-            - Incorporate advanced design elements like {random.choice(['gradient backgrounds', 'micro-interactions', 'custom icons', 'dynamic field validation', 'multi-step progress indicators'])}
+        return prompt_registry.render(
+            variant or prompt_registry.resolve(),
+            tech_requirements=tech_requirements,
+            ui_requirements=ui_requirements,
+            target_audience=target_audience,
+            design_guidelines=design_guidelines,
+            layout=layout or settings.PROMPT_LAYOUT,
+        )
+
+    async def resolve_catalog(self, generative_schema: GenerativeCreate) -> CatalogSnapshot:
         """
-        
-        return f"""
-            You are a React component generator. You will receive a user preference and generate a React component based on it.
-            Follow these instructions carefully:
-            Make sure its a valid React component.
-            Output a single, complete React component as a valid JSX expression.
-            Do not include import statements, export statements, or variable declarations.
-            Do not add code comments, backslashes, or line breaks (\\n).
-            Do not wrap the output in markdown code blocks or syntax highlighting tags.
-            Return only the JSX, written in a single line of text.
-            The code must compile without errors in React and work inside react-live.
-            Do not include const or function keywords—only output the JSX expression directly.
-            do not write inline javascript code inside the JSX.
-            Do not use any external libraries or frameworks except for MUI.
-            If needed, Use MUI components, prepend MUI.ComponentName to the component name. Example: MUI.Button, MUI.TextField.
-            Make sure not to repeat MUI.MUI.ComponentName. Example: MUI.MUI.Button, MUI.MUI.TextField.
-            If needed, use MUI icons, choose only from this list with exact same module prefix: ICONS.Home, ICONS.Add, ICONS.Delete, ICONS.Search, ICONS.Menu, ICONS.Settings, ICONS.Person, ICONS.Star, ICONS.Edit, ICONS.ArrowBack
-            Do not use styled components
-            Return only the JSX, written in a single line of text.
-            Do not include any other text or explanation.
-            Do not include any other function outside the component.
-
-            Technical requirements:
-            {tech_requirements}
-
-            UI Component requirements:
-            {ui_requirements}
-            - Add 4-10 additional fields based on the user target.
-
-            Target audience:
-            {target_audience}
-
-            Design guidelines:
-            use the following design guidelines as a base:
-            {design_guidelines}
-            
-            {randomization_prompt}
-        """
-    
-    async def build_generative_component(self, generative_schema: GenerativeCreate ) -> GenerativeDetail:
+        Check that the requested persona and designer exist.
+
+        Served from the process-wide catalog cache, so unknown ids are
+        rejected before any cache lookup or model call.
+
+        Args:
+            generative_schema (GenerativeCreate): The generation request
+
+        Returns:
+            CatalogSnapshot: The catalog the request was checked against
+
+        Raises:
+            ObjectNotFoundError: If the persona or the designer does not exist
         """
+        catalog = await catalog_cache.get(self.db_session)
+        catalog.persona(generative_schema.persona_id)
+        catalog.designer(generative_schema.designer_id)
+        return catalog
+
+    def build_messages(self, generative_schema: GenerativeCreate, catalog: CatalogSnapshot) -> "PreparedGeneration":
         """
+        Resolve the persona, designer and prompt variant and build the chat messages.
 
+        Args:
+            generative_schema (GenerativeCreate): The generation request
+            catalog (CatalogSnapshot): The personas and designers
 
-        # self.model = OllamaLLM(model="llama3.2:3b", base_url="ollama:11434")
+        Returns:
+            PreparedGeneration: Everything needed to call the model and describe the result
 
+        Raises:
+            HTTPException: If the requested variant id does not exist
+            ObjectNotFoundError: If the persona or the designer does not exist
+        """
         persona_id = generative_schema.persona_id
-        designer_id = generative_schema.designer_id if hasattr(generative_schema, 'designer_id') else persona_id
-        
-        # Get the appropriate persona prompt and designer prompt
-        persona_index = persona_id - 1 if persona_id <= len(self.target_audiences) else 0
-        designer_index = designer_id - 1 if designer_id <= len(self.designers) else 0
-        
-        user_prompt = self.designers[designer_index]["prompt"]
-        
-        # Get target audience from the selected persona
-        target_audience = self.target_audiences[persona_index]["prompt"] if persona_id <= len(self.target_audiences) else None
+        designer_id = generative_schema.designer_id
+
+        user_prompt = catalog.designer(designer_id).prompt
+        target_audience = catalog.persona(persona_id).prompt
+
+        # The designer's guidelines replace the variant's design section
+        overridden = ("design",) if user_prompt else ()
+        try:
+            if settings.PROMPT_BANDIT_ENABLED and generative_schema.seed is None and generative_schema.variant_id is None:
+                variant = prompt_bandit.choose(overridden)
+            else:
+                variant = prompt_registry.resolve(seed=generative_schema.seed, variant_id=generative_schema.variant_id)
+                variant = prompt_registry.collapse(variant, overridden)
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc))
         
         # Generate dynamic system message
         system_message = self.get_system_message(
-            target_audience=f"The target audience is: {target_audience}" if target_audience else None,
+            target_audience=f"The target audience is: {target_audience}",
             design_guidelines=user_prompt,
+            variant=variant,
         )
         
-        messages = [
+        messages: list[BaseMessage] = [
             SystemMessage(system_message),
             HumanMessage(user_prompt),
         ]
+        return PreparedGeneration(
+            persona_id=persona_id,
+            designer_id=designer_id,
+            system_message=system_message,
+            messages=messages,
+            variant=variant,
+        )
+
+    async def build_generative_component(self, generative_schema: GenerativeCreate ) -> GenerativeDetail:
+        """
+        Return a React component for the requested persona and designer and store it.
+
+        Args:
+            generative_schema (GenerativeCreate): The generation request
+
+        Returns:
+            GenerativeDetail: The generated component, its id and the prompt used
+        """
+        detail = await self.find_or_generate_component(generative_schema)
+        return await self.store_component(detail)
+
+    async def find_or_generate_component(self, generative_schema: GenerativeCreate) -> GenerativeDetail:
+        """
+        Return a React component, reusing earlier work where the request allows.
+
+        Requests without user preferences are served from the warm component
+        pool when it has a ready component, near-duplicates of earlier requests
+        are served from the semantic cache, and concurrent identical requests
+        share a single LLM call whose result is added to the cache. Requests
+        flagged ``fresh`` skip the cache and the coalescing, so they never see
+        a component another request received; pooled components are handed
+        out only once and remain eligible.
+
+        Args:
+            generative_schema (GenerativeCreate): The generation request
+
+        Returns:
+            GenerativeDetail: The generated component and the prompt used
+
+        Raises:
+            ObjectNotFoundError: If the persona or the designer does not exist
+        """
+        catalog = await self.resolve_catalog(generative_schema)
+
+        pooled = self.pop_pooled_component(generative_schema, catalog)
+        if pooled is not None:
+            return pooled
+
+        if generative_schema.fresh:
+            return await self.generate_component(generative_schema, catalog)
+
+        # A replay of a pinned seed or variant must use exactly that prompt; without
+        # preferences every request of the pair would share one entry
+        embedding = None
+        if self.semantic_cache is not None and not pins_variant(generative_schema) and cache_text(generative_schema):
+            cached, embedding = await self.semantic_cache.lookup(generative_schema)
+            if cached is not None:
+                return cached
+
+        (detail, usage), leader = await generation_flights.do(
+            flight_key(generative_schema),
+            lambda: self.generate_shared_component(generative_schema, catalog),
+        )
+
+        # Every caller is charged the shared generation, coalescing must not bypass the token quota
+        if (request_usage := metered_usage.get()) is not None:
+            request_usage.merge(usage)
+
+        # Only the caller that ran the generation stores it, followers would duplicate it
+        if leader and self.semantic_cache is not None and embedding is not None:
+            await self.semantic_cache.store(detail, embedding)
+
+        return detail.model_copy(update={"user_prefferences": generative_schema.user_prefferences})
 
-        ai_message = self.model.invoke(messages).content
-        # ai_message = model.invoke(messages)
-        cleaned_response = ai_message.replace("\\'", "'").replace('\\"', '"')
+    async def generate_shared_component(
+        self, generative_schema: GenerativeCreate, catalog: CatalogSnapshot
+    ) -> tuple[GenerativeDetail, TokenUsageStats]:
+        """
+        Generate a component on behalf of every caller of a single flight.
+
+        The flight's task inherits the context of the caller that started it,
+        so its model calls are metered in counters of their own instead of
+        that caller's; each caller then adds them to its own. It can outlive
+        that caller, so it works from the catalog resolved beforehand and
+        never touches the caller's database session.
+
+        Args:
+            generative_schema (GenerativeCreate): The generation request
+            catalog (CatalogSnapshot): The catalog the request was checked against
+
+        Returns:
+            tuple[GenerativeDetail, TokenUsageStats]: The component and the tokens spent on it
+        """
+        usage = TokenUsageStats()
+        # Set in the flight's own task context, the callers' values are untouched
+        metered_usage.set(usage)
+        return await self.generate_component(generative_schema, catalog), usage
+
+    async def store_component(self, detail: GenerativeDetail) -> GenerativeDetail:
+        """
+        Persist a component in the content-addressed store.
+
+        Components are keyed by the hash of their code, so serving the same
+        component again (from the pool or the semantic cache) returns the id
+        it was first stored under instead of adding a row. New components are
+        embedded for similarity search when COMPONENT_EMBEDDINGS_ENABLED is set.
+
+        Args:
+            detail (GenerativeDetail): The component to store
+
+        Returns:
+            GenerativeDetail: The component with its stored id, unchanged when
+            the service has no database session
+        """
+        if self.component_repository is None:
+            return detail
+
+        stored, created = await self.component_repository.create_or_get(
+            GeneratedComponentCreate(
+                content_hash=content_hash(detail.raw_component),
+                persona_id=detail.persona_id,
+                designer_id=detail.designer_id,
+                user_prefferences=detail.user_prefferences,
+                raw_component=detail.raw_component,
+                generated_prompt=detail.generated_prompt,
+                variant_id=detail.variant_id,
+                seed=detail.seed,
+            )
+        )
+        # Components served again already have their embedding
+        if created and self.component_search is not None:
+            await self.component_search.index(stored.id, stored)
+        return detail.model_copy(update={"id": stored.id})
+
+    async def get_component(self, component_id: int) -> GeneratedComponentDetail:
+        """
+        Fetch a stored component by id, without calling the LLM.
+
+        Args:
+            component_id (int): The id returned when the component was generated
+
+        Returns:
+            GeneratedComponentDetail: The stored component
+
+        Raises:
+            ObjectNotFoundError: If no component has this id
+            ValueError: If the service was created without a database session
+        """
+        if self.component_repository is None:
+            raise ValueError("GenerativeService needs a database session to fetch stored components")
+        return await self.component_repository.get_by_id(component_id)
+
+    async def record_feedback(self, component_id: int, feedback: GenerativeFeedbackCreate) -> None:
+        """
+        Record whether a stored component rendered in the client's react-live preview.
+
+        The outcome is credited to the prompt variant the component was
+        generated from, so that the bandit learns which variants compile.
+        Only the first report for a component is accepted.
+
+        Args:
+            component_id (int): The id returned when the component was generated
+            feedback (GenerativeFeedbackCreate): The client's report
+
+        Raises:
+            ObjectNotFoundError: If no component has this id
+            HTTPException: If the component's outcome was already reported
+            ValueError: If the service was created without a database session
+        """
+        if self.component_repository is None:
+            raise ValueError("GenerativeService needs a database session to record feedback")
+        component = await self.component_repository.get_by_id(component_id)
+        if not await self.component_repository.record_compiled(component_id, feedback.compiled):
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Feedback already recorded for this component")
+        if not feedback.compiled:
+            logger.info(
+                "Component failed to render",
+                component_id=component_id,
+                variant_id=component.variant_id,
+                error=(feedback.error or "")[:500],
+            )
+        if component.variant_id is not None:
+            await prompt_bandit.record_compile(component.variant_id, feedback.compiled)
+
+    def pop_pooled_component(
+        self, generative_schema: GenerativeCreate, catalog: CatalogSnapshot
+    ) -> GenerativeDetail | None:
+        """
+        Take a pre-generated component matching the request from the pool.
+
+        Pooled components are generated without user preferences from random
+        prompt variants, so only requests without preferences and without a
+        pinned seed or variant are eligible, and only components generated
+        from the catalog version the request was checked against are served.
+
+        Args:
+            generative_schema (GenerativeCreate): The generation request
+            catalog (CatalogSnapshot): The catalog the request was checked against
+
+        Returns:
+            GenerativeDetail | None: A pooled component, or None if none applies
+        """
+        if generative_schema.user_prefferences.strip() or pins_variant(generative_schema):
+            return None
+
+        pooled = component_pool.pop(generative_schema.persona_id, generative_schema.designer_id, catalog.version)
+        # The tokens were spent by the background refill, not by this request
+        return pooled.model_copy(update={"usage": None}) if pooled is not None else None
+
+    async def generate_component(
+        self, generative_schema: GenerativeCreate, catalog: CatalogSnapshot | None = None
+    ) -> GenerativeDetail:
+        """
+        Generate a React component with the LLM, bypassing every reuse layer.
+
+        The output is validated and repaired before it is returned. Output that
+        cannot be repaired is regenerated up to ``GENERATIVE_MAX_REPAIR_RETRIES``
+        times; the last attempt is returned even if it is still invalid. With
+        ``GENERATIVE_EARLY_ABORT_ENABLED``, every attempt but the last is
+        streamed and abandoned as soon as it breaks the output contract. With
+        ``HEDGING_ENABLED``, calls slower than usual are raced against a
+        second attempt.
+
+        Args:
+            generative_schema (GenerativeCreate): The generation request
+            catalog (CatalogSnapshot | None): The catalog the request was already
+                checked against, looked up (with the service's session) if omitted
+
+        Returns:
+            GenerativeDetail: The generated component and the prompt used
+        """
+        if catalog is None:
+            catalog = await self.resolve_catalog(generative_schema)
+        attempts = settings.GENERATIVE_MAX_REPAIR_RETRIES + 1
+        total_usage = None
+        for attempt in range(1, attempts + 1):
+            prepared = self.build_messages(generative_schema, catalog)
+            # The last attempt is served best effort, so it is never abandoned
+            early_abort = settings.GENERATIVE_EARLY_ABORT_ENABLED and attempt < attempts
+
+            started = time.perf_counter()
+            try:
+                if settings.HEDGING_ENABLED:
+                    # Only hedge while the gate has free slots, a saturated process must not add load
+                    reply, backend, queued_seconds = await llm_hedger.run(
+                        lambda progress: self.invoke_model(
+                            prepared, progress.number, early_abort=early_abort, progress=progress
+                        ),
+                        allow=lambda: llm_gate.stats().waiting == 0,
+                        streamed=early_abort,
+                    )
+                else:
+                    reply, backend, queued_seconds = await self.invoke_model(prepared, early_abort=early_abort)
+            except ComponentContractViolation as exc:
+                component_validation_stats.aborted += 1
+                logger.warning(
+                    "Generated component broke the output contract, restarting",
+                    attempt=attempt,
+                    violation=exc.message,
+                    received_chars=exc.received_chars,
+                    llm_seconds=round(time.perf_counter() - started, 3),
+                )
+                await prompt_bandit.record_generation(prepared.variant, "aborted")
+                continue
+            ai_message = reply.content
+            usage = record_usage(getattr(reply, "usage_metadata", None), backend)
+            total_usage = combine_usage(total_usage, usage)
+            llm_seconds = time.perf_counter() - started - queued_seconds
+
+            logger.info(
+                "Generated component",
+                persona_id=prepared.persona_id,
+                designer_id=prepared.designer_id,
+                variant_id=prepared.variant.variant_id,
+                backend=backend.name,
+                attempt=attempt,
+                queued_seconds=round(queued_seconds, 3),
+                llm_seconds=round(llm_seconds, 3),
+                **usage_log_fields(usage),
+            )
+
+            validation = repair_component(ai_message)
+            await prompt_bandit.record_generation(
+                prepared.variant, "valid" if validation.valid else "invalid", llm_seconds
+            )
+            if validation.valid:
+                break
+
+            if attempt < attempts:
+                component_validation_stats.retried += 1
+                logger.warning("Generated component is invalid, retrying", attempt=attempt, errors=validation.errors)
+            else:
+                component_validation_stats.failed += 1
+                logger.error("Generated component is invalid after retries", attempts=attempts, errors=validation.errors)
+
+        return prepared.detail(generative_schema, validation.code, total_usage)
+
+    async def invoke_model(
+        self,
+        prepared: "PreparedGeneration",
+        attempt: int = 0,
+        early_abort: bool = False,
+        progress: HedgeAttempt | None = None,
+    ) -> tuple[BaseMessage, LLMBackend, float]:
+        """
+        Make one completion call through the concurrency gate and the provider router.
+
+        Args:
+            prepared (PreparedGeneration): The messages to send
+            attempt (int): Parallel attempt number, hedges use another backend
+            early_abort (bool): Stream the completion and abandon it as soon as
+                it breaks the output contract
+            progress (HedgeAttempt | None): Told when the call leaves the gate and
+                when its first chunk arrives, for hedged calls
+
+        Returns:
+            tuple[BaseMessage, LLMBackend, float]: The model reply, the backend
+            that produced it and the seconds spent queued on the gate
+
+        Raises:
+            ComponentContractViolation: When the completion was abandoned
+        """
+        # Native async call: the event loop keeps serving other requests while the
+        # provider works, and the gate bounds how many completions run at once.
+        async with llm_gate.slot() as queued_seconds:
+            if progress is not None:
+                progress.sent()
+            if early_abort:
+                reply, backend = await self.stream_validated(prepared, attempt, progress)
+            else:
+                reply, backend = await self.router.ainvoke(prepared.messages, routing_key=prepared.routing_key, attempt=attempt)
+        return reply, backend, queued_seconds
+
+    async def stream_validated(
+        self, prepared: "PreparedGeneration", attempt: int = 0, progress: HedgeAttempt | None = None
+    ) -> tuple[BaseMessage, LLMBackend]:
+        """
+        Stream a completion, abandoning it as soon as it breaks the output contract.
+
+        Closing the stream closes the connection to the provider, so the
+        abandoned completion stops producing (and billing) tokens.
+
+        Args:
+            prepared (PreparedGeneration): The messages to send
+            attempt (int): Parallel attempt number, hedges use another backend
+            progress (HedgeAttempt | None): Told when the first chunk arrives, for hedged calls
+
+        Returns:
+            tuple[BaseMessage, LLMBackend]: The complete reply, chunks merged, and
+            the backend that produced it
+
+        Raises:
+            ComponentContractViolation: When the completion was abandoned
+        """
+        validator = StreamingComponentValidator()
+        reply = None
+        stream_backend = None
+        stream = self.router.astream(prepared.messages, routing_key=prepared.routing_key, attempt=attempt)
+        async with aclosing(stream):
+            async for chunk, backend in stream:
+                if progress is not None:
+                    progress.first_output()
+                stream_backend = backend
+                # Merges content and the usage reported on the last chunk
+                reply = chunk if reply is None else reply + chunk
+                violation = validator.feed(str(chunk.content))
+                if violation is not None:
+                    raise ComponentContractViolation(violation, validator.length)
+        if reply is None or stream_backend is None:
+            raise ComponentContractViolation("Empty completion", 0)
+        return reply, stream_backend
+
+    async def stream_generative_component(
+        self, generative_schema: GenerativeCreate
+    ) -> AsyncIterator[GenerativeStreamChunk | GenerativeDetail]:
+        """
+        Generate a React component, yielding model tokens as they arrive.
+
+        Args:
+            generative_schema (GenerativeCreate): The generation request
+
+        Yields:
+            GenerativeStreamChunk | GenerativeDetail: A chunk per model token, then
+            the complete GenerativeDetail once the completion has finished
+
+        Raises:
+            ObjectNotFoundError: If the persona or the designer does not exist
+        """
+        catalog = await self.resolve_catalog(generative_schema)
+
+        pooled = self.pop_pooled_component(generative_schema, catalog)
+        if pooled is not None:
+            yield GenerativeStreamChunk(delta=pooled.raw_component)
+            yield await self.store_component(pooled)
+            return
+
+        embedding = None
+        if (
+            self.semantic_cache is not None
+            and not generative_schema.fresh
+            and not pins_variant(generative_schema)
+            and cache_text(generative_schema)
+        ):
+            cached, embedding = await self.semantic_cache.lookup(generative_schema)
+            if cached is not None:
+                yield GenerativeStreamChunk(delta=cached.raw_component)
+                yield await self.store_component(cached)
+                return
+
+        prepared = self.build_messages(generative_schema, catalog)
+
+        parts: list[str] = []
+        validator = StreamingComponentValidator() if settings.GENERATIVE_EARLY_ABORT_ENABLED else None
+        violation = None
+        async with llm_gate.slot() as queued_seconds:
+            started = time.perf_counter()
+            first_token_seconds = None
+            stream_backend = None
+            usage_metadata = None
+            stream = self.router.astream(prepared.messages, routing_key=prepared.routing_key)
+            async with aclosing(stream):
+                async for chunk, backend in stream:
+                    stream_backend = backend
+                    # Providers report usage once, on the final chunk
+                    usage_metadata = getattr(chunk, "usage_metadata", None) or usage_metadata
+                    delta = chunk.content
+                    if not delta:
+                        continue
+                    if first_token_seconds is None:
+                        first_token_seconds = time.perf_counter() - started
+                    parts.append(delta)
+                    yield GenerativeStreamChunk(delta=delta)
+                    violation = validator.feed(delta) if validator is not None else None
+                    if violation is not None:
+                        break
+
+        if violation is not None:
+            # Closing the stream abandoned the completion, its usage is never reported
+            component_validation_stats.aborted += 1
+            logger.warning(
+                "Streamed component broke the output contract, regenerating",
+                violation=violation,
+                received_chars=validator.length,
+                llm_seconds=round(time.perf_counter() - started, 3),
+            )
+            await prompt_bandit.record_generation(prepared.variant, "aborted")
+            detail = await self.generate_component(generative_schema)
+        else:
+            usage = record_usage(usage_metadata, stream_backend)
+            logger.info(
+                "Streamed component",
+                persona_id=prepared.persona_id,
+                designer_id=prepared.designer_id,
+                variant_id=prepared.variant.variant_id,
+                backend=stream_backend.name if stream_backend else None,
+                queued_seconds=round(queued_seconds, 3),
+                first_token_seconds=round(first_token_seconds or 0.0, 3),
+                llm_seconds=round(time.perf_counter() - started, 3),
+                **usage_log_fields(usage),
+            )
+
+            validation = repair_component("".join(parts))
+            await prompt_bandit.record_generation(
+                prepared.variant, "valid" if validation.valid else "invalid", time.perf_counter() - started
+            )
+            if validation.valid:
+                detail = prepared.detail(generative_schema, validation.code, usage)
+            else:
+                # The tokens already sent cannot be taken back; the done event carries a valid component instead
+                component_validation_stats.retried += 1
+                logger.warning("Streamed component is invalid, regenerating", errors=validation.errors)
+                detail = await self.generate_component(generative_schema)
+                detail = detail.model_copy(update={"usage": combine_usage(usage, detail.usage)})
+
+        if self.semantic_cache is not None and embedding is not None:
+            await self.semantic_cache.store(detail, embedding)
+
+        yield await self.store_component(detail)
+
+    def supports_multi_completion(self) -> bool:
+        """
+        Whether the model can return several completions from a single call.
+
+        Returns:
+            bool: True when a backend exposes an ``n`` parameter (OpenAI)
+        """
+        return settings.GENERATIVE_BATCH_MULTI_COMPLETION and self.router.supports_multi_completion
+
+    async def generate_component_choices(self, generative_schema: GenerativeCreate, count: int) -> list[GenerativeDetail]:
+        """
+        Generate several components from one multi-completion call.
+
+        The prompt is sent once and the provider samples ``count`` choices from
+        it, so the prompt tokens are paid for once instead of once per variant.
+        Choices that fail validation are dropped, so fewer than ``count``
+        components may be returned.
+
+        Args:
+            generative_schema (GenerativeCreate): The generation request
+            count (int): Number of completions to request
+
+        Returns:
+            list[GenerativeDetail]: One component per valid completion
+        """
+        prepared = self.build_messages(generative_schema, await self.resolve_catalog(generative_schema))
+
+        async with llm_gate.slot() as queued_seconds:
+            started = time.perf_counter()
+            result, backend = await self.router.agenerate(prepared.messages, n=count, routing_key=prepared.routing_key)
+
+        llm_seconds = time.perf_counter() - started
+        # Every choice carries the usage of the whole call
+        choices = result.generations[0]
+        usage = record_usage(
+            getattr(getattr(choices[0], "message", None), "usage_metadata", None) if choices else None, backend
+        )
+
+        logger.info(
+            "Generated component choices",
+            persona_id=prepared.persona_id,
+            designer_id=prepared.designer_id,
+            variant_id=prepared.variant.variant_id,
+            backend=backend.name,
+            count=count,
+            queued_seconds=round(queued_seconds, 3),
+            llm_seconds=round(llm_seconds, 3),
+            **usage_log_fields(usage),
+        )
+
+        details = []
+        for generation in choices:
+            validation = repair_component(generation.text)
+            # The choices share a variant, each counts as one completion of it
+            await prompt_bandit.record_generation(
+                prepared.variant, "valid" if validation.valid else "invalid", llm_seconds
+            )
+            if validation.valid:
+                details.append(prepared.detail(generative_schema, validation.code, usage))
+            else:
+                component_validation_stats.retried += 1
+        return details
+
+    async def stream_generative_variants(self, batch_schema: GenerativeBatchCreate) -> AsyncIterator[GenerativeDetail]:
+        """
+        Produce ``count`` distinct variants, yielding each one as soon as it is ready.
+
+        Pooled components are handed out first. The remainder comes from a
+        single multi-completion call when the provider supports it, and from
+        concurrent independent generations otherwise (or to replace duplicate
+        or invalid choices). Variants never come from the semantic cache or
+        coalesced requests, since they must differ from each other.
+
+        Args:
+            batch_schema (GenerativeBatchCreate): The request and number of variants
+
+        Yields:
+            GenerativeDetail: Each stored variant, in completion order
+
+        Raises:
+            ObjectNotFoundError: If the persona or the designer does not exist
+        """
+        catalog = await self.resolve_catalog(batch_schema)
+
+        remaining = batch_schema.count
+        seen: set[str] = set()
+
+        while remaining:
+            pooled = self.pop_pooled_component(batch_schema, catalog)
+            if pooled is None:
+                break
+            seen.add(pooled.raw_component)
+            remaining -= 1
+            yield await self.store_component(pooled)
+
+        if remaining > 1 and self.supports_multi_completion():
+            for detail in await self.generate_component_choices(batch_schema, remaining):
+                if detail.raw_component in seen:
+                    continue
+                seen.add(detail.raw_component)
+                remaining -= 1
+                yield await self.store_component(detail)
+
+        tasks = [asyncio.ensure_future(self.generate_component(batch_schema)) for _ in range(remaining)]
+        try:
+            for next_variant in asyncio.as_completed(tasks):
+                yield await self.store_component(await next_variant)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def build_generative_variants(self, batch_schema: GenerativeBatchCreate) -> list[GenerativeDetail]:
+        """
+        Produce ``count`` distinct variants and return them together.
+
+        Args:
+            batch_schema (GenerativeBatchCreate): The request and number of variants
+
+        Returns:
+            list[GenerativeDetail]: The variants, in completion order
+        """
+        return [detail async for detail in self.stream_generative_variants(batch_schema)]
+
+
+@dataclass
+class PreparedGeneration:
+    """The resolved inputs of a single model call."""
+
+    persona_id: int
+    """The resolved persona"""
+
+    designer_id: int
+    """The resolved designer"""
+
+    system_message: str
+    """The rendered system prompt"""
+
+    messages: list[BaseMessage]
+    """The messages sent to the model"""
+
+    variant: PromptVariant
+    """The prompt variant the system prompt was rendered from"""
+
+    @property
+    def routing_key(self) -> str:
+        """Key pinning the persona/designer pair to a backend under the sticky policy."""
+        return f"{self.persona_id}:{self.designer_id}"
+
+    def detail(
+        self, generative_schema: GenerativeCreate, raw_component: str, usage: TokenUsage | None = None
+    ) -> GenerativeDetail:
+        """
+        Build the response for a completion of this generation.
+
+        Args:
+            generative_schema (GenerativeCreate): The generation request
+            raw_component (str): The validated component code
+            usage (TokenUsage | None): Tokens spent on the completion
+
+        Returns:
+            GenerativeDetail: The component, prompt and variant that produced it
+        """
         return GenerativeDetail(
             user_prefferences=generative_schema.user_prefferences,
-            raw_component=cleaned_response,
-            persona_id=persona_id,
-            designer_id=designer_id,
-            generated_prompt=system_message  # Include the generated prompt
-        )
\ No newline at end of file
+            raw_component=raw_component,
+            persona_id=self.persona_id,
+            designer_id=self.designer_id,
+            generated_prompt=self.system_message,  # Include the generated prompt
+            variant_id=self.variant.variant_id,
+            seed=self.variant.seed,
+            usage=usage,
+        )
+
+
+def pins_variant(generative_schema: GenerativeCreate) -> bool:
+    """
+    Whether a request asks for a specific prompt seed or variant.
+
+    Args:
+        generative_schema (GenerativeCreate): The generation request
+
+    Returns:
+        bool: True if a seed or variant id was supplied
+    """
+    return generative_schema.seed is not None or generative_schema.variant_id is not None
+
+
+def flight_key(generative_schema: GenerativeCreate) -> tuple[int, int, str, int | None, int | None]:
+    """
+    Build the single-flight key identifying equivalent generation requests.
+
+    Args:
+        generative_schema (GenerativeCreate): The generation request
+
+    Returns:
+        tuple[int, int, str, int | None, int | None]: Persona id, designer id,
+        normalized preferences, and the pinned seed and variant id if any
+    """
+    return (
+        generative_schema.persona_id,
+        generative_schema.designer_id,
+        normalize_whitespace(generative_schema.user_prefferences),
+        generative_schema.seed,
+        generative_schema.variant_id,
+    )
+
+
+def content_hash(raw_component: str) -> str:
+    """
+    Compute the content address of a component.
+
+    Args:
+        raw_component (str): The component code
+
+    Returns:
+        str: Hex SHA-256 digest of the code
+    """
+    return hashlib.sha256(raw_component.encode()).hexdigest()
+
+
+def clean_component(ai_message: str) -> str:
+    """
+    Undo the quote escaping models tend to add to single-line JSX output.
+
+    Args:
+        ai_message (str): The raw model output
+
+    Returns:
+        str: The output with escaped quotes restored
+    """
+    return ai_message.replace("\\'", "'").replace('\\"', '"')
+
+
+def repair_component(ai_message: str) -> JSXValidationResult:
+    """
+    Clean, validate and repair a raw model output.
+
+    Args:
+        ai_message (str): The raw model output
+
+    Returns:
+        JSXValidationResult: The repaired component and any remaining errors
+    """
+    validation = validate_component(clean_component(ai_message))
+    if validation.repairs:
+        component_validation_stats.repaired += 1
+        logger.info("Repaired generated component", repairs=validation.repairs)
+    return validation
+
+
+def record_usage(usage_metadata: dict | None, backend: LLMBackend | None = None) -> TokenUsage | None:
+    """
+    Convert a model call's usage metadata and add it to the process counters.
+
+    Args:
+        usage_metadata (dict | None): LangChain ``usage_metadata`` of the reply
+        backend (LLMBackend | None): The backend that made the call, for the per-model metrics
+
+    Returns:
+        TokenUsage | None: The usage, or None when the provider reported none
+    """
+    usage = token_usage(usage_metadata)
+    if usage is not None:
+        token_usage_stats.record(usage)
+        if (request_usage := metered_usage.get()) is not None:
+            request_usage.record(usage)
+        if backend is not None:
+            backend.record_tokens(usage)
+    return usage
+
+
+def usage_log_fields(usage: TokenUsage | None) -> dict[str, int]:
+    """
+    Flatten token usage into structured log fields.
+
+    Args:
+        usage (TokenUsage | None): The usage of a model call
+
+    Returns:
+        dict[str, int]: Prompt, cached prompt and completion token counts, empty when unknown
+    """
+    if usage is None:
+        return {}
+    return {
+        "prompt_tokens": usage.prompt_tokens,
+        "cached_prompt_tokens": usage.cached_prompt_tokens,
+        "completion_tokens": usage.completion_tokens,
+    }
@@ -0,0 +1,160 @@
+import asyncio
+
+import structlog
+
+from app.config import settings
+from app.database import sessionmanager
+from app.services.core.generative import GenerativeService
+from app.services.core.rate_limiter import GenerationQuota
+from app.services.llm.concurrency import llm_gate
+from app.types.generative import GenerativeCreate, GenerativeDetail
+from app.utils.metrics import metrics
+
+logger = structlog.stdlib.get_logger(__name__)
+
+prefetch_outcomes = metrics.counter(
+    "generative_prefetch_total",
+    "Regenerate requests of WebSocket sessions and speculative generations, by outcome",
+    ("outcome",),
+)
+
+
+class GenerativeSession:
+    """
+    State of one generative page session, speculatively generating the next variant.
+
+    After every component sent, another variant of the same request is
+    generated in the background, so the next "regenerate" can be answered
+    at once (or after the remainder of the generation, if it is still
+    running). At most ``prefetch_budget`` speculative generations run per
+    session, one at a time, and none while LLM calls are queueing at the
+    gate, so speculation never delays real requests. Starting over with a
+    different request discards the pending speculation.
+
+    Speculative components are stored only once they are served, and their
+    tokens are charged to the session's principal like any generation.
+
+    Args:
+        quota (GenerationQuota): Admission and token accounting of the session's principal
+        prefetch_budget (int): Speculative generations allowed in the session
+    """
+
+    def __init__(self, quota: GenerationQuota, prefetch_budget: int = settings.GENERATIVE_PREFETCH_BUDGET):
+        self.quota = quota
+        self.prefetch_budget = prefetch_budget
+        self._request: GenerativeCreate | None = None
+        self._prefetch: asyncio.Task[GenerativeDetail | None] | None = None
+
+    async def generate(self, generative_schema: GenerativeCreate) -> GenerativeDetail:
+        """
+        Serve a component for a new request, like ``POST /generative/react``.
+
+        Args:
+            generative_schema (GenerativeCreate): The generation request
+
+        Returns:
+            GenerativeDetail: The stored component
+
+        Raises:
+            RateLimitExceededError: When the principal's quota is exhausted
+        """
+        await self.quota.admit()
+        self._discard_prefetch()
+        self._request = generative_schema
+
+        async with sessionmanager.session() as db_session:
+            async with self.quota.metered():
+                detail = await GenerativeService(db_session).build_generative_component(generative_schema)
+            await db_session.commit()
+
+        self._start_prefetch()
+        return detail
+
+    async def regenerate(self) -> tuple[GenerativeDetail, bool]:
+        """
+        Serve another variant of the last request, prefetched when possible.
+
+        Returns:
+            tuple[GenerativeDetail, bool]: The stored component and whether it was prefetched
+
+        Raises:
+            ValueError: If no request has been made in the session yet
+            RateLimitExceededError: When the principal's quota is exhausted
+        """
+        if self._request is None:
+            raise ValueError("Send a generate message before regenerating")
+        await self.quota.admit()
+
+        detail = None
+        prefetch, self._prefetch = self._prefetch, None
+        if prefetch is not None:
+            prefetch_outcomes.inc(outcome="hit" if prefetch.done() else "wait")
+            detail = await prefetch
+        else:
+            prefetch_outcomes.inc(outcome="miss")
+        prefetched = detail is not None
+
+        async with sessionmanager.session() as db_session:
+            service = GenerativeService(db_session)
+            if detail is None:
+                async with self.quota.metered():
+                    detail = await service.find_or_generate_component(next_variant(self._request))
+            detail = await service.store_component(detail)
+            await db_session.commit()
+
+        self._start_prefetch()
+        return detail, prefetched
+
+    async def close(self) -> None:
+        """Cancel the pending speculation, e.g. when the client disconnects."""
+        self._discard_prefetch()
+
+    def _start_prefetch(self) -> None:
+        if self._request is None or self._prefetch is not None:
+            return
+        if self.prefetch_budget <= 0:
+            prefetch_outcomes.inc(outcome="budget_exhausted")
+            return
+        if llm_gate.stats().waiting:
+            prefetch_outcomes.inc(outcome="skipped_busy")
+            return
+
+        self.prefetch_budget -= 1
+        self._prefetch = asyncio.create_task(self._speculate(next_variant(self._request)))
+
+    async def _speculate(self, generative_schema: GenerativeCreate) -> GenerativeDetail | None:
+        try:
+            async with self.quota.metered():
+                return await GenerativeService().find_or_generate_component(generative_schema)
+        except Exception as exc:
+            # The regenerate request falls back to generating on demand
+            logger.warning(
+                "Prefetched generation failed",
+                exception_type=exc.__class__.__name__,
+                exception_detail=str(exc),
+            )
+            return None
+
+    def _discard_prefetch(self) -> None:
+        if self._prefetch is None:
+            return
+        prefetch_outcomes.inc(outcome="wasted")
+        self._prefetch.cancel()
+        self._prefetch = None
+
+
+def next_variant(generative_schema: GenerativeCreate) -> GenerativeCreate:
+    """
+    Derive the request for another variant of a request.
+
+    The seed and variant are dropped so that a new prompt variant is drawn,
+    and the request is flagged fresh so that neither the semantic cache nor
+    request coalescing hands back a component the user has already seen.
+
+    Args:
+        generative_schema (GenerativeCreate): The request of the current variant
+
+    Returns:
+        GenerativeCreate: The request for the next variant
+    """
+    return generative_schema.model_copy(update={"seed": None, "variant_id": None, "fresh": True})
@@ -0,0 +1,502 @@
+import re
+from dataclasses import dataclass, field
+
+from app.services.core.prompt_registry import ALLOWED_ICONS
+
+# Characters after which a "<" starts a JSX element rather than a comparison
+_JSX_PRECEDERS = set("(,=:?[{!&|>;") | {""}
+_NAME_CHARS = re.compile(r"[A-Za-z0-9_$.:\-]")
+_FENCE = re.compile(r"```[A-Za-z]*[ \t]*\n?(.*?)\n?[ \t]*```", re.DOTALL)
+_IMPORT = re.compile(r"^[ \t]*import\s[^;\n]*;?[ \t]*\n?", re.MULTILINE)
+_EXPORT_DEFAULT_NAME = re.compile(r"\n?[ \t]*export\s+default\s+[A-Za-z_$][\w$]*\s*;?\s*$")
+_RENDER_CALL = re.compile(r"\n?[ \t]*render\(\s*<[A-Za-z_$][\w$.]*\s*/>\s*\)\s*;?\s*$")
+_DECLARATION = re.compile(r"^\s*(?:export\s+(?:default\s+)?)?(?:const|let|var)\s+[A-Za-z_$][\w$]*\s*=\s*")
+_ICON = re.compile(r"\bICONS\.([A-Za-z_$][\w$]*)")
+_ICON_SUFFIXES = ("Icon", "Outlined", "Rounded", "Sharp", "TwoTone", "Filled")
+_SELF_CLOSING_ICON = re.compile(r"<ICONS\.([A-Za-z_$][\w$]*)\b[^<>]*?/>")
+_OPENING_FENCE = re.compile(r"^```[A-Za-z]*[ \t]*\n?")
+# Syntax errors this far from the end of a partial completion cannot be undone by more tokens
+_SETTLED_CHARS = 32
+
+
+class JSXSyntaxError(Exception):
+    """Raised by the JSX scanner when the code is not a well-formed expression.
+
+    Args:
+        message (str): Description of the problem
+        position (int): Offset in the code where the problem was detected
+    """
+
+    def __init__(self, message: str, position: int):
+        self.position = position
+        self.message = f"{message} at offset {position}"
+        super().__init__(self.message)
+
+
+class ComponentContractViolation(Exception):
+    """Raised when a completion is abandoned mid-stream for breaking the output contract.
+
+    Args:
+        message (str): The rule that was broken
+        received_chars (int): Length of the completion when it was abandoned
+    """
+
+    def __init__(self, message: str, received_chars: int):
+        self.message = message
+        self.received_chars = received_chars
+        super().__init__(message)
+
+
+@dataclass
+class JSXScan:
+    """What the scanner learned about a JSX expression."""
+
+    end: int = 0
+    """Offset where the top-level expression ends"""
+
+    element_names: list[str] = field(default_factory=list)
+    """Names of every JSX element, in document order"""
+
+    comments: list[tuple[int, int]] = field(default_factory=list)
+    """Spans of JavaScript comments, JSX ``{/* */}`` comments included"""
+
+
+@dataclass
+class JSXValidationResult:
+    """Outcome of validating and repairing a generated component."""
+
+    code: str
+    """The component after deterministic repairs"""
+
+    repairs: list[str] = field(default_factory=list)
+    """Repairs that were applied"""
+
+    errors: list[str] = field(default_factory=list)
+    """Rule violations that could not be repaired"""
+
+    @property
+    def valid(self) -> bool:
+        """Whether the repaired code satisfies every rule."""
+        return not self.errors
+
+
+@dataclass
+class ComponentValidationStats:
+    """Process-wide counters for generated component validation."""
+
+    repaired: int = 0
+    """Completions that needed at least one deterministic repair"""
+
+    retried: int = 0
+    """Completions that could not be repaired and triggered a new generation"""
+
+    failed: int = 0
+    """Generations still invalid after the last retry, served best effort"""
+
+    aborted: int = 0
+    """Streamed completions cut off as soon as they broke the output contract"""
+
+
+component_validation_stats = ComponentValidationStats()
+"""Counters shared by every generation in the process"""
+
+
+class _Scanner:
+    """
+    Minimal JavaScript + JSX scanner, sufficient to check single-expression components.
+
+    It understands strings, template literals, comments, bracket nesting and
+    JSX elements (attributes, children, fragments and closing tag matching).
+    It does not build a syntax tree and does not validate JavaScript
+    expressions beyond their bracket structure.
+    """
+
+    def __init__(self, code: str):
+        self.code = code
+        self.pos = 0
+        self.scan = JSXScan()
+
+    def peek(self, offset: int = 0) -> str:
+        index = self.pos + offset
+        return self.code[index] if index < len(self.code) else ""
+
+    def error(self, message: str) -> JSXSyntaxError:
+        return JSXSyntaxError(message, self.pos)
+
+    def run(self) -> JSXScan:
+        self.skip_space()
+        if self.peek() == "<":
+            self.element()
+        elif self.peek() == "(":
+            self.pos += 1
+            self.expression(")")
+            # "(props) => ..." continues after the parameter list
+            if self.code[self.pos:].lstrip().startswith("=>"):
+                self.expression("", top_level=True)
+        else:
+            self.expression("", top_level=True)
+        self.scan.end = self.pos
+        return self.scan
+
+    def expression(self, closer: str, top_level: bool = False) -> None:
+        """Scan JavaScript until ``closer`` (consumed) or, at top level, the end."""
+        previous = ""
+        while True:
+            char = self.peek()
+            if not char:
+                if closer:
+                    raise self.error(f"Unclosed bracket, expected '{closer}'")
+                return
+
+            if char == closer:
+                self.pos += 1
+                return
+            if char in ")]}":
+                raise self.error(f"Unexpected '{char}'")
+            if top_level and char == ";":
+                rest = self.code[self.pos + 1:].strip()
+                if rest:
+                    raise self.error("Multiple statements")
+                return
+
+            if char in "'\"":
+                self.string(char)
+            elif char == "`":
+                self.template()
+            elif char == "/" and self.peek(1) in "/*":
+                self.comment()
+                continue
+            elif char in "([{":
+                self.pos += 1
+                self.expression({"(": ")", "[": "]", "{": "}"}[char])
+            elif char == "<" and previous in _JSX_PRECEDERS and (self.peek(1).isalpha() or self.peek(1) == ">"):
+                self.element()
+            else:
+                self.pos += 1
+
+            if not char.isspace():
+                previous = self.code[self.pos - 1]
+                # "=>" and "return" both allow an element to follow
+                if previous == ">" and self.code[self.pos - 2:self.pos] == "=>":
+                    previous = "="
+                elif self.code[max(0, self.pos - 6):self.pos] == "return":
+                    previous = "("
+
+    def string(self, quote: str) -> None:
+        self.pos += 1
+        while True:
+            char = self.peek()
+            if not char or char == "\n":
+                raise self.error("Unterminated string")
+            self.pos += 2 if char == "\\" else 1
+            if char == quote:
+                return
+
+    def template(self) -> None:
+        self.pos += 1
+        while True:
+            char = self.peek()
+            if not char:
+                raise self.error("Unterminated template literal")
+            if char == "\\":
+                self.pos += 2
+            elif char == "`":
+                self.pos += 1
+                return
+            elif char == "$" and self.peek(1) == "{":
+                self.pos += 2
+                self.expression("}")
+            else:
+                self.pos += 1
+
+    def comment(self) -> None:
+        start = self.pos
+        if self.peek(1) == "/":
+            end = self.code.find("\n", self.pos)
+            self.pos = len(self.code) if end == -1 else end
+        else:
+            end = self.code.find("*/", self.pos + 2)
+            if end == -1:
+                # Reported where the input ends, so a partial completion is not judged settled
+                self.pos = len(self.code)
+                raise self.error("Unterminated comment")
+            self.pos = end + 2
+        self.scan.comments.append((start, self.pos))
+
+    def name(self) -> str:
+        start = self.pos
+        while self.peek() and _NAME_CHARS.match(self.peek()):
+            self.pos += 1
+        return self.code[start:self.pos]
+
+    def skip_space(self) -> None:
+        while self.peek().isspace():
+            self.pos += 1
+
+    def element(self) -> None:
+        self.pos += 1  # "<"
+        name = self.name()
+        self.scan.element_names.append(name or "<>")
+
+        while True:
+            self.skip_space()
+            char = self.peek()
+            if not char:
+                raise self.error(f"Unterminated tag <{name}>")
+            if char == "/" and self.peek(1) == ">":
+                self.pos += 2
+                return
+            if char == ">":
+                self.pos += 1
+                break
+            if char == "{":
+                self.pos += 1
+                self.expression("}")
+            elif _NAME_CHARS.match(char):
+                self.name()
+                self.skip_space()
+                if self.peek() == "=":
+                    self.pos += 1
+                    self.skip_space()
+                    value = self.peek()
+                    if value in "'\"":
+                        self.jsx_attribute_string(value)
+                    elif value == "{":
+                        self.pos += 1
+                        self.expression("}")
+                    elif value == "<":
+                        self.element()
+                    else:
+                        raise self.error(f"Invalid attribute value in <{name}>")
+            else:
+                raise self.error(f"Unexpected '{char}' in <{name}>")
+
+        self.children(name)
+
+    def jsx_attribute_string(self, quote: str) -> None:
+        # JSX attribute strings have no escapes and may span lines
+        end = self.code.find(quote, self.pos + 1)
+        if end == -1:
+            self.pos = len(self.code)
+            raise self.error("Unterminated attribute string")
+        self.pos = end + 1
+
+    def children(self, name: str) -> None:
+        while True:
+            char = self.peek()
+            if not char:
+                raise self.error(f"Unclosed element <{name or ''}>")
+            if char == "<" and self.peek(1) == "/":
+                self.pos += 2
+                self.skip_space()
+                closing = self.name()
+                self.skip_space()
+                if self.peek() != ">":
+                    raise self.error(f"Malformed closing tag </{closing}>")
+                self.pos += 1
+                if closing != name:
+                    raise self.error(f"Closing tag </{closing}> does not match <{name or ''}>")
+                return
+            if char == "<":
+                self.element()
+            elif char == "{":
+                start = self.pos
+                self.pos += 1
+                comments_before = len(self.scan.comments)
+                self.expression("}")
+                # A child expression holding only a comment is a JSX comment: drop it whole
+                inner = self.code[start + 1:self.pos - 1].strip()
+                if len(self.scan.comments) > comments_before and inner.startswith("/*") and inner.endswith("*/"):
+                    self.scan.comments[comments_before:] = [(start, self.pos)]
+            else:
+                self.pos += 1
+
+
+def scan_jsx(code: str) -> JSXScan:
+    """
+    Scan a JavaScript expression containing JSX.
+
+    Args:
+        code (str): The code to scan
+
+    Returns:
+        JSXScan: Element names, comment spans and where the expression ends
+
+    Raises:
+        JSXSyntaxError: If strings, brackets or JSX elements are malformed
+    """
+    return _Scanner(code).run()
+
+
+def validate_component(raw: str) -> JSXValidationResult:
+    """
+    Validate a generated component against the prompt's output contract,
+    applying deterministic repairs where possible.
+
+    Repaired: markdown fences, leading prose, import/export statements,
+    ``const X =`` declarations, ``render(<X />)`` calls, code comments,
+    escaped line breaks, ``MUI.MUI.`` prefixes, icon names with a known
+    suffix (``ICONS.HomeIcon``) and self-closing unknown icons (dropped).
+    Reported as errors: malformed JSX, multiple statements and any other
+    icon outside the allowed list.
+
+    Args:
+        raw (str): The model output
+
+    Returns:
+        JSXValidationResult: The repaired code with the repairs and remaining errors
+    """
+    code = raw.strip()
+    repairs: list[str] = []
+
+    def repair(description: str, new_code: str) -> None:
+        nonlocal code
+        if new_code != code:
+            repairs.append(description)
+            code = new_code
+
+    fence = _FENCE.search(code)
+    if fence:
+        repair("removed markdown fences", fence.group(1).strip())
+
+    repair("removed import statements", _IMPORT.sub("", code).strip())
+    repair("removed render call", _RENDER_CALL.sub("", code).strip())
+    repair("removed default export", _EXPORT_DEFAULT_NAME.sub("", code).strip())
+    repair("removed variable declaration", _DECLARATION.sub("", code, count=1).strip())
+    if not code.startswith(("<", "(", "function")):
+        first_tag = code.find("<")
+        if first_tag > 0 and "=>" not in code[:first_tag]:
+            repair("removed leading text", code[first_tag:])
+    repair("removed escaped line breaks", code.replace("\\n", " "))
+    repair("removed duplicate MUI prefix", re.sub(r"\bMUI\.(?:MUI\.)+", "MUI.", code))
+    repair("normalized icon names", _ICON.sub(_normalize_icon, code))
+    repair(
+        "removed unknown icons",
+        _SELF_CLOSING_ICON.sub(lambda match: match.group(0) if match.group(1) in ALLOWED_ICONS else "<></>", code),
+    )
+
+    try:
+        scan = scan_jsx(code)
+        if scan.comments:
+            stripped = code
+            for start, end in reversed(scan.comments):
+                stripped = stripped[:start] + stripped[end:]
+            repair("removed comments", stripped.strip())
+            scan = scan_jsx(code)
+    except JSXSyntaxError as exc:
+        return JSXValidationResult(code=code, repairs=repairs, errors=[exc.message])
+
+    trailing = code[scan.end:].strip()
+    if trailing and trailing != ";":
+        repair("removed trailing text", code[:scan.end].strip())
+    repair("removed trailing semicolon", code.rstrip(";").strip())
+
+    errors: list[str] = []
+    if not code:
+        errors.append("Empty component")
+    elif not scan.element_names:
+        errors.append("No JSX element found")
+
+    unknown_icons = sorted({name for name in _ICON.findall(code) if name not in ALLOWED_ICONS})
+    if unknown_icons:
+        errors.append(f"Icons outside the allowed list: {', '.join(unknown_icons)}")
+
+    return JSXValidationResult(code=code, repairs=repairs, errors=errors)
+
+
+class StreamingComponentValidator:
+    """
+    Checks a completion while it streams, so that a broken one can be abandoned early.
+
+    Only violations that ``validate_component`` would report as errors, and
+    that no further tokens can fix, are flagged: malformed JSX (an error well
+    before the end of the text received so far) and icons outside the allowed
+    list that are not dropped as self-closing tags. Markdown fences, imports,
+    declarations and comments are left alone: they are repaired once the
+    completion is complete, which is cheaper than generating it again.
+
+    The text is re-scanned whenever it has grown by ``check_interval``
+    characters or a quarter of its length, whichever is more, so the scanning
+    cost stays proportional to the completion.
+
+    Args:
+        check_interval (int): Fewest new characters between two checks
+    """
+
+    def __init__(self, check_interval: int = 256):
+        self.check_interval = check_interval
+        self.parts: list[str] = []
+        self.length = 0
+        self._checked_length = 0
+
+    def feed(self, delta: str) -> str | None:
+        """
+        Add a chunk of the completion.
+
+        Args:
+            delta (str): The chunk
+
+        Returns:
+            str | None: The broken rule, or None while the completion may still be valid
+        """
+        self.parts.append(delta)
+        self.length += len(delta)
+        if self.length - self._checked_length < max(self.check_interval, self._checked_length // 4):
+            return None
+        self._checked_length = self.length
+        return self.check()
+
+    def check(self) -> str | None:
+        """
+        Check the completion received so far.
+
+        Returns:
+            str | None: The broken rule, or None while the completion may still be valid
+        """
+        text = "".join(self.parts)
+        code = _OPENING_FENCE.sub("", text.lstrip(), count=1).split("```")[0]
+        code = _IMPORT.sub("", code).lstrip()
+        code = _DECLARATION.sub("", code, count=1)
+        if not code.startswith(("<", "(", "function")):
+            first_tag = code.find("<")
+            if first_tag == -1 or "=>" in code[:first_tag]:
+                # Still leading prose (repaired), or code the final validation has to judge
+                return None
+            code = code[first_tag:]
+        code = code.replace("\\n", " ")
+
+        try:
+            scan_jsx(code)
+        except JSXSyntaxError as exc:
+            # A statement after the expression may still turn out to be a repairable render call
+            if len(code) - exc.position > _SETTLED_CHARS and not exc.message.startswith("Multiple statements"):
+                return exc.message
+
+        return _unrepairable_icon(code)
+
+
+def _unrepairable_icon(code: str) -> str | None:
+    for match in _ICON.finditer(code):
+        if match.end() == len(code) or _normalize_icon(match) != match.group(0) or match.group(1) in ALLOWED_ICONS:
+            continue
+        if code[match.start() - 1:match.start()] == "<":
+            # Unknown icons in self-closing tags are dropped, wait until the tag ends
+            rest = code[match.end():]
+            tag_end = min((index for index in (rest.find("<"), rest.find(">")) if index != -1), default=-1)
+            if tag_end == -1 or (rest[tag_end] == ">" and rest[tag_end - 1:tag_end] == "/"):
+                continue
+        return f"Icon outside the allowed list: {match.group(1)}"
+    return None
+
+
+def _normalize_icon(match: re.Match[str]) -> str:
+    name = match.group(1)
+    base = name
+    stripped = True
+    while base not in ALLOWED_ICONS and stripped:
+        stripped = False
+        for suffix in _ICON_SUFFIXES:
+            if base.endswith(suffix) and len(base) > len(suffix):
+                base = base[: -len(suffix)]
+                stripped = True
+    return f"ICONS.{base}" if base in ALLOWED_ICONS else match.group(0)
@@ -0,0 +1,315 @@
+import asyncio
+import random
+import time
+from collections.abc import Collection
+from dataclasses import dataclass
+
+import structlog
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import sessionmanager
+from app.repositories.prompt_variant_stats_repository import PromptVariantStatsRepository
+from app.services.core.prompt_registry import PromptRegistry, PromptVariant, prompt_registry
+from app.types.prompt_variant import (
+    PromptBanditReport,
+    PromptDimensionStats,
+    PromptOptionStats,
+    PromptVariantStatsBase,
+)
+
+logger = structlog.stdlib.get_logger(__name__)
+
+GENERATION_OUTCOMES = ("valid", "invalid", "aborted")
+"""Outcomes of a completion, as recorded by ``record_generation``"""
+
+
+@dataclass
+class OptionStats:
+    """Outcomes of every variant using one option of a prompt dimension."""
+
+    attempts: int = 0
+    valid: int = 0
+    compile_failed: int = 0
+    reward: float = 0.0
+    llm_seconds: float = 0.0
+
+    def add(self, stats: PromptVariantStatsBase) -> None:
+        """Add the outcomes of a variant using this option."""
+        self.attempts += stats.attempts
+        self.valid += stats.valid
+        self.compile_failed += stats.compile_failed
+        self.reward += stats.reward
+        self.llm_seconds += stats.llm_seconds
+
+    @property
+    def alpha(self) -> float:
+        """Successes of the Beta posterior, uniform prior included."""
+        return 1.0 + self.reward
+
+    @property
+    def beta(self) -> float:
+        """Failures of the Beta posterior: lost rewards and components that did not render."""
+        return 1.0 + max(self.attempts - self.reward, 0.0) + self.compile_failed
+
+    @property
+    def expected_reward(self) -> float:
+        """Posterior mean of the reward."""
+        return self.alpha / (self.alpha + self.beta)
+
+
+class PromptBandit:
+    """
+    Selects prompt variants by Thompson sampling on their generation outcomes.
+
+    The variant space is the product of every prompt dimension's options,
+    far too many combinations to learn one by one, so rewards are credited
+    to each option a variant uses and every dimension is sampled
+    independently: options that often lead to invalid, broken or slow
+    components are drawn less, while uncertain ones keep being explored.
+
+    Outcomes are written to ``prompt_variant_stats`` so that every worker
+    learns from all of them; each process applies its own outcomes at once,
+    buffers them and, every ``refresh_seconds``, writes the buffer in one
+    transaction and reloads the shared totals in a background task, off the
+    request that reported the outcome. Outcomes not written yet are applied
+    again on top of every reload. Nothing is recorded while
+    PROMPT_BANDIT_ENABLED is off.
+
+    Args:
+        registry (PromptRegistry): The variant space
+        refresh_seconds (float): Longest time between reloads of the shared outcomes
+    """
+
+    def __init__(
+        self, registry: PromptRegistry = prompt_registry, refresh_seconds: float = settings.PROMPT_BANDIT_REFRESH_SECONDS
+    ):
+        self.registry = registry
+        self.refresh_seconds = refresh_seconds
+        self._options = self._empty_options()
+        self._refreshed_at = float("-inf")
+        self._pending: dict[int, dict[str, float]] = {}
+        self._sync_task: asyncio.Task[None] | None = None
+
+    def choose(self, overridden: Collection[str] = ()) -> PromptVariant:
+        """
+        Draw a variant, one Thompson sample per option.
+
+        Args:
+            overridden (Collection[str]): Dimensions the prompt does not use, e.g.
+                "design" when a designer supplies the guidelines; they are not
+                sampled and keep their first option
+
+        Returns:
+            PromptVariant: The selected variant, with no seed
+        """
+        choices = tuple(
+            0
+            if name in overridden
+            else max(range(len(options)), key=lambda index: random.betavariate(options[index].alpha, options[index].beta))
+            for (name, _), options in zip(self.registry.dimensions, self._options)
+        )
+        return self.registry.variant(self.registry.variant_id(choices))
+
+    async def record_generation(self, variant: PromptVariant, outcome: str, llm_seconds: float | None = None) -> None:
+        """
+        Record the outcome of a completion.
+
+        Args:
+            variant (PromptVariant): The variant the prompt was rendered from
+            outcome (str): One of GENERATION_OUTCOMES
+            llm_seconds (float | None): Model time of the completion, for valid ones
+
+        Raises:
+            ValueError: If the outcome is unknown
+        """
+        if outcome not in GENERATION_OUTCOMES:
+            raise ValueError(f"Unknown generation outcome {outcome!r}")
+
+        increments = {"attempts": 1, outcome: 1}
+        if outcome == "valid":
+            increments["reward"] = generation_reward(llm_seconds)
+            increments["llm_seconds"] = llm_seconds or 0.0
+        self._record(variant.variant_id, increments)
+
+    async def record_compile(self, variant_id: int, compiled: bool) -> None:
+        """
+        Record whether a component of the variant rendered in react-live.
+
+        Args:
+            variant_id (int): The variant the component was generated from
+            compiled (bool): Whether it rendered
+        """
+        self._record(variant_id, {"compiled" if compiled else "compile_failed": 1})
+
+    async def refresh(self, db_session: AsyncSession | None = None) -> list[PromptVariantStatsBase]:
+        """
+        Reload the outcomes recorded by every worker.
+
+        The buffered outcomes of this process, not in the database yet, are
+        applied on top, including those recorded while the reload ran.
+
+        Args:
+            db_session (AsyncSession | None): Session to read with, a new one if omitted
+
+        Returns:
+            list[PromptVariantStatsBase]: Every variant's outcomes, most attempted first
+        """
+        self._refreshed_at = time.monotonic()
+        if db_session is None:
+            async with sessionmanager.session() as session:
+                rows = await PromptVariantStatsRepository(session).get_all()
+        else:
+            rows = await PromptVariantStatsRepository(db_session).get_all()
+
+        options = self._empty_options()
+        for row in rows:
+            try:
+                choices = self.registry.variant(row.variant_id).choices
+            except ValueError:
+                # Recorded before the prompt dimensions changed
+                continue
+            for dimension, choice in zip(options, choices):
+                dimension[choice].add(row)
+        for variant_id, increments in self._pending.items():
+            self._apply(options, variant_id, increments)
+        self._options = options
+        return rows
+
+    async def report(self, db_session: AsyncSession, limit: int = 100) -> PromptBanditReport:
+        """
+        Describe the current beliefs and the most attempted variants.
+
+        Args:
+            db_session (AsyncSession): SQLAlchemy async database session
+            limit (int): Number of variants to include
+
+        Returns:
+            PromptBanditReport: Per-option aggregates and per-variant outcomes
+        """
+        rows = await self.refresh(db_session)
+        dimensions = [
+            PromptDimensionStats(
+                name=name,
+                options=[
+                    PromptOptionStats(
+                        index=index,
+                        label=option_label(values[index]),
+                        attempts=stats.attempts,
+                        valid=stats.valid,
+                        compile_failed=stats.compile_failed,
+                        mean_llm_seconds=stats.llm_seconds / stats.valid if stats.valid else None,
+                        expected_reward=stats.expected_reward,
+                    )
+                    for index, stats in enumerate(options)
+                ],
+            )
+            for (name, values), options in zip(self.registry.dimensions, self._options)
+        ]
+        return PromptBanditReport(enabled=settings.PROMPT_BANDIT_ENABLED, dimensions=dimensions, variants=rows[:limit])
+
+    async def flush(self) -> None:
+        """Write the buffered outcomes, e.g. before the process exits."""
+        if self._sync_task is not None:
+            await self._sync_task
+        await self._write()
+
+    async def _write(self) -> None:
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        # Learning is best effort, a database hiccup must not fail the generation
+        try:
+            async with sessionmanager.session() as session:
+                repository = PromptVariantStatsRepository(session)
+                # Rows locked in the same order by every worker, so concurrent flushes cannot deadlock
+                for variant_id, increments in sorted(pending.items()):
+                    await repository.record(variant_id, **increments)
+                await session.commit()
+        except Exception as exc:
+            # Kept for the next flush
+            for variant_id, increments in pending.items():
+                self._buffer(variant_id, increments)
+            logger.warning(
+                "Recording prompt variant outcomes failed",
+                variants=len(pending),
+                exception_type=exc.__class__.__name__,
+                exception_detail=str(exc),
+            )
+
+    def _record(self, variant_id: int, increments: dict[str, float]) -> None:
+        if not settings.PROMPT_BANDIT_ENABLED:
+            return
+        if not self._apply(self._options, variant_id, increments):
+            return
+        self._buffer(variant_id, increments)
+
+        if self._sync_task is not None or time.monotonic() - self._refreshed_at < self.refresh_seconds:
+            return
+        self._sync_task = asyncio.ensure_future(self._sync())
+
+    async def _sync(self) -> None:
+        try:
+            await self._write()
+            await self.refresh()
+        except Exception as exc:
+            logger.warning(
+                "Reloading prompt variant outcomes failed",
+                exception_type=exc.__class__.__name__,
+                exception_detail=str(exc),
+            )
+        finally:
+            self._sync_task = None
+
+    def _apply(self, options: list[list[OptionStats]], variant_id: int, increments: dict[str, float]) -> bool:
+        try:
+            choices = self.registry.variant(variant_id).choices
+        except ValueError:
+            # A component generated before the prompt dimensions changed
+            return False
+        stats = PromptVariantStatsBase(variant_id=variant_id, **increments)
+        for dimension, choice in zip(options, choices):
+            dimension[choice].add(stats)
+        return True
+
+    def _buffer(self, variant_id: int, increments: dict[str, float]) -> None:
+        pending = self._pending.setdefault(variant_id, {})
+        for name, amount in increments.items():
+            pending[name] = pending.get(name, 0.0) + amount
+
+    def _empty_options(self) -> list[list[OptionStats]]:
+        return [[OptionStats() for _ in values] for _, values in self.registry.dimensions]
+
+
+def generation_reward(llm_seconds: float | None) -> float:
+    """
+    Reward of a valid completion, lower the longer the model took.
+
+    Args:
+        llm_seconds (float | None): Model time of the completion
+
+    Returns:
+        float: Between ``1 - PROMPT_BANDIT_LATENCY_WEIGHT`` and 1
+    """
+    weight = settings.PROMPT_BANDIT_LATENCY_WEIGHT
+    speed = max(1.0 - (llm_seconds or 0.0) / settings.PROMPT_BANDIT_LATENCY_TARGET_SECONDS, 0.0)
+    return (1.0 - weight) + weight * speed
+
+
+def option_label(option: str, length: int = 60) -> str:
+    """
+    Shorten a prompt option to its first line.
+
+    Args:
+        option (str): The option text
+        length (int): Longest label
+
+    Returns:
+        str: The label
+    """
+    first_line = option.strip().splitlines()[0].strip()
+    return first_line if len(first_line) <= length else first_line[: length - 1] + "…"
+
+
+prompt_bandit = PromptBandit()
+"""Process-wide bandit, fed by every generation"""
@@ -0,0 +1,426 @@
+import random
+import textwrap
+from collections.abc import Collection, Iterator
+from dataclasses import dataclass
+from math import prod
+from string import Formatter
+
+TECH_VARIATIONS = (
+    """Use React and inline CSS for styling.
+    Use functional components and hooks.
+    Focus on responsive design principles.
+    Ensure compatibility with modern browsers and accessibility standards.""",
+
+    """Use React with Material UI components.
+    Apply modern hooks pattern for state management.
+    Ensure components are accessible and follow WCAG guidelines.
+    Optimize for performance and reusability.""",
+
+    """Use React functional components.
+    Implement clean separation of markup and logic.
+    Use CSS-in-JS for styling with MUI.
+    Ensure modularity and scalability of components.""",
+)
+
+UI_VARIATIONS = (
+    """Create a form to get to know the user.
+    The form should always include the following fields:
+    - Full Name (text input)
+    - Email Address (email input)
+    - Phone Number (tel input)
+    Add 3-5 additional fields based on the user target.
+    Include tooltips or helper text for better user guidance.""",
+
+    """Design a user profile form that captures essential information.
+    Required fields include:
+    - Name (text input)
+    - Contact email (email input)
+    - Mobile number (tel input)
+    Include validation, helpful error messages, and a progress indicator for multi-step forms.""",
+
+    """Build an information collection form with:
+    - User's full name (text input)
+    - Email for communications (email input)
+    - Contact number (tel input)
+    Add dynamic fields based on user preferences.
+    Ensure a clear submission flow with a confirmation message.""",
+)
+
+DESIGN_VARIATIONS = (
+    """Use a cohesive color scheme with at least 3 coordinating colors.
+    Buttons should have distinct hover states with animations.
+    Maintain consistent spacing between elements.
+    Use subtle gradients or shadows to add depth to the design.""",
+
+    """Apply visual hierarchy through size, color, and spacing.
+    Form fields should include clear labels, helper text, and icons where appropriate.
+    Use smooth transitions and animations for interactive elements.
+    Keep the interface clean, focused, and visually appealing.""",
+
+    """Implement thoughtful spacing for improved readability.
+    Use colors strategically to guide attention and create contrast.
+    Make sure error states are clearly visible with detailed messages.
+    Form layout should guide the user through completion steps with visual cues.""",
+)
+
+APPROACHES = ("minimalist", "playful", "professional", "modern", "artistic")
+FOCUSES = ("usability", "visual appeal", "efficiency", "clarity", "engagement")
+INCLUSIONS = ("subtle animations", "thoughtful microcopy", "intuitive validation", "visual feedback", "progressive disclosure")
+ADVANCED_ELEMENTS = ("gradient backgrounds", "micro-interactions", "custom icons", "dynamic field validation", "multi-step progress indicators")
+
+ALLOWED_ICONS = ("Home", "Add", "Delete", "Search", "Menu", "Settings", "Person", "Star", "Edit", "ArrowBack")
+"""The only icon names the prompt allows after the ``ICONS.`` prefix"""
+
+DEFAULT_TARGET_AUDIENCE = """some target audience examples:
+    - Event organizers looking to create a user-friendly form for event registration.
+    - Personal coaches building introspective intake forms for their clients."""
+
+DIMENSIONS: tuple[tuple[str, tuple[str, ...]], ...] = (
+    ("tech", TECH_VARIATIONS),
+    ("ui", UI_VARIATIONS),
+    ("design", DESIGN_VARIATIONS),
+    ("approach", APPROACHES),
+    ("focus", FOCUSES),
+    ("including", INCLUSIONS),
+    ("element", ADVANCED_ELEMENTS),
+)
+"""Every randomised prompt section and its options, in variant-id digit order"""
+
+RANDOMIZATION_TEMPLATE = """
+            Make this implementation unique by:
+            - Using a {approach} approach
+            - Focusing on {focus}
+            - Including {including}
+            - Each time you generate, create a different layout and component arrangement
+            - Incorporate advanced design elements like {element}
+        """
+
+SYSTEM_TEMPLATE = """
+            You are a React component generator. You will receive a user preference and generate a React component based on it.
+            Follow these instructions carefully:
+            Make sure its a valid React component.
+            Output a single, complete React component as a valid JSX expression.
+            Do not include import statements, export statements, or variable declarations.
+            Do not add code comments, backslashes, or line breaks (\\n).
+            Do not wrap the output in markdown code blocks or syntax highlighting tags.
+            Return only the JSX, written in a single line of text.
+            The code must compile without errors in React and work inside react-live.
+            Do not include const or function keywords—only output the JSX expression directly.
+            do not write inline javascript code inside the JSX.
+            Do not use any external libraries or frameworks except for MUI.
+            If needed, Use MUI components, prepend MUI.ComponentName to the component name. Example: MUI.Button, MUI.TextField.
+            Make sure not to repeat MUI.MUI.ComponentName. Example: MUI.MUI.Button, MUI.MUI.TextField.
+            If needed, use MUI icons, choose only from this list with exact same module prefix: {allowed_icons}
+            Do not use styled components
+            Return only the JSX, written in a single line of text.
+            Do not include any other text or explanation.
+            Do not include any other function outside the component.
+
+            Technical requirements:
+            {tech_requirements}
+
+            UI Component requirements:
+            {ui_requirements}
+            - Add 4-10 additional fields based on the user target.
+
+            Target audience:
+            {target_audience}
+
+            Design guidelines:
+            use the following design guidelines as a base:
+            {design_guidelines}
+
+            {randomization_prompt}
+        """
+
+# The static instructions of SYSTEM_TEMPLATE, shared by every request
+STATIC_INSTRUCTIONS_TEMPLATE = SYSTEM_TEMPLATE.split("Technical requirements:")[0]
+
+# The sections of SYSTEM_TEMPLATE that vary per request, ordered from the most
+# to the least stable: persona and designer repeat often, the variant rarely
+VARYING_SECTIONS_TEMPLATE = """
+Target audience:
+{target_audience}
+
+Design guidelines:
+use the following design guidelines as a base:
+{design_guidelines}
+
+Technical requirements:
+{tech_requirements}
+
+UI Component requirements:
+{ui_requirements}
+- Add 4-10 additional fields based on the user target.
+
+{randomization_prompt}
+"""
+
+PROMPT_LAYOUTS = ("prefix", "legacy")
+"""``prefix``: static instructions first, compact whitespace; ``legacy``: SYSTEM_TEMPLATE as written"""
+
+
+def compact(text: str) -> str:
+    """
+    Normalise prompt whitespace without changing its wording.
+
+    Strips the indentation and trailing spaces of every line and collapses
+    runs of blank lines, so no tokens are spent on layout.
+
+    Args:
+        text (str): The text to compact
+
+    Returns:
+        str: The compacted text
+    """
+    lines = [line.strip() for line in textwrap.dedent(text).strip().splitlines()]
+    compacted: list[str] = []
+    for line in lines:
+        if line or (compacted and compacted[-1]):
+            compacted.append(line)
+    return "\n".join(compacted)
+
+
+class CompiledTemplate:
+    """
+    A ``str.format``-style template parsed once into literal and field segments.
+
+    Rendering only concatenates the precomputed segments, so building a prompt
+    does not re-parse the template on every request.
+
+    Args:
+        template (str): Template text with ``{field}`` placeholders
+    """
+
+    def __init__(self, template: str):
+        self._segments = [(literal, field) for literal, field, _, _ in Formatter().parse(template)]
+        self.fields = frozenset(field for _, field in self._segments if field)
+
+    def render(self, **values: str) -> str:
+        """
+        Render the template.
+
+        Args:
+            **values: A value for every placeholder in the template
+
+        Returns:
+            str: The rendered text
+        """
+        return "".join(literal + (values[field] if field else "") for literal, field in self._segments)
+
+
+@dataclass(frozen=True)
+class PromptVariant:
+    """A fully resolved choice of option for every randomised prompt section."""
+
+    variant_id: int
+    """Stable identifier of the option combination"""
+
+    seed: int | None
+    """Seed the combination was drawn from, None when selected by id"""
+
+    choices: tuple[int, ...]
+    """Selected option index per dimension, in DIMENSIONS order"""
+
+    def choice(self, dimension: str) -> int:
+        """
+        Return the selected option index for a dimension.
+
+        Args:
+            dimension (str): A dimension name from DIMENSIONS
+
+        Returns:
+            int: The selected option index
+        """
+        return self.choices[[name for name, _ in DIMENSIONS].index(dimension)]
+
+
+class PromptRegistry:
+    """
+    Compiled system prompt templates and the enumerable space of their variants.
+
+    Every combination of options across DIMENSIONS has a stable integer id
+    (a mixed-radix number, one digit per dimension). A request either names a
+    variant id directly or supplies a seed, which deterministically selects
+    one, so identical ids always produce identical prompts and a generation
+    can be replayed or used as a cache key.
+    """
+
+    def __init__(self) -> None:
+        self.dimensions = DIMENSIONS
+        self.variant_count = prod(len(options) for _, options in DIMENSIONS)
+        self._system = CompiledTemplate(SYSTEM_TEMPLATE)
+        self._randomization = CompiledTemplate(RANDOMIZATION_TEMPLATE)
+        self._varying_sections = CompiledTemplate(VARYING_SECTIONS_TEMPLATE)
+        self._compact_randomization = CompiledTemplate(compact(RANDOMIZATION_TEMPLATE))
+        self.static_prefix = compact(CompiledTemplate(STATIC_INSTRUCTIONS_TEMPLATE).render(allowed_icons=allowed_icons()))
+        """Byte-identical start of every ``prefix`` layout prompt"""
+
+    def variant(self, variant_id: int, seed: int | None = None) -> PromptVariant:
+        """
+        Decode a variant id into its per-dimension choices.
+
+        Args:
+            variant_id (int): The variant id
+            seed (int | None): Seed the id was drawn from, if any
+
+        Returns:
+            PromptVariant: The decoded variant
+
+        Raises:
+            ValueError: If the id is outside the variant space
+        """
+        if not 0 <= variant_id < self.variant_count:
+            raise ValueError(f"variant_id must be between 0 and {self.variant_count - 1}")
+
+        choices = []
+        remainder = variant_id
+        for _, options in reversed(self.dimensions):
+            remainder, choice = divmod(remainder, len(options))
+            choices.append(choice)
+        return PromptVariant(variant_id=variant_id, seed=seed, choices=tuple(reversed(choices)))
+
+    def variant_id(self, choices: tuple[int, ...]) -> int:
+        """
+        Encode per-dimension choices into their variant id, the inverse of ``variant``.
+
+        Args:
+            choices (tuple[int, ...]): Selected option index per dimension, in DIMENSIONS order
+
+        Returns:
+            int: The variant id
+
+        Raises:
+            ValueError: If a choice is outside its dimension's options
+        """
+        variant_id = 0
+        for (name, options), choice in zip(self.dimensions, choices, strict=True):
+            if not 0 <= choice < len(options):
+                raise ValueError(f"Choice {choice} is outside the {len(options)} options of {name}")
+            variant_id = variant_id * len(options) + choice
+        return variant_id
+
+    def collapse(self, variant: PromptVariant, overridden: Collection[str]) -> PromptVariant:
+        """
+        Reset the choice of overridden dimensions to their first option.
+
+        A dimension whose section is passed explicitly to ``render`` (e.g.
+        "design" when a designer supplies the guidelines) does not change
+        the prompt, so variants differing only in it are one and the same.
+
+        Args:
+            variant (PromptVariant): The selected variant
+            overridden (Collection[str]): Names of the dimensions ``render`` will not use
+
+        Returns:
+            PromptVariant: The variant with one id per distinct prompt, seed unchanged
+        """
+        choices = tuple(
+            0 if name in overridden else choice for (name, _), choice in zip(self.dimensions, variant.choices)
+        )
+        if choices == variant.choices:
+            return variant
+        return PromptVariant(variant_id=self.variant_id(choices), seed=variant.seed, choices=choices)
+
+    def resolve(self, seed: int | None = None, variant_id: int | None = None) -> PromptVariant:
+        """
+        Select a variant explicitly, from a seed, or from a newly drawn seed.
+
+        Args:
+            seed (int | None): Seed selecting the variant deterministically
+            variant_id (int | None): Explicit variant id, takes precedence over the seed
+
+        Returns:
+            PromptVariant: The selected variant
+
+        Raises:
+            ValueError: If the variant id is outside the variant space
+        """
+        if variant_id is not None:
+            return self.variant(variant_id, seed)
+
+        if seed is None:
+            seed = random.randrange(2**31)
+        return self.variant(random.Random(seed).randrange(self.variant_count), seed)
+
+    def variants(self) -> Iterator[PromptVariant]:
+        """
+        Enumerate every variant in id order.
+
+        Yields:
+            PromptVariant: Each variant of the registry
+        """
+        for variant_id in range(self.variant_count):
+            yield self.variant(variant_id)
+
+    def render(
+        self,
+        variant: PromptVariant,
+        tech_requirements: str | None = None,
+        ui_requirements: str | None = None,
+        target_audience: str | None = None,
+        design_guidelines: str | None = None,
+        layout: str = "prefix",
+    ) -> str:
+        """
+        Render the system prompt for a variant.
+
+        Sections passed explicitly override the variant's choice for them.
+
+        The ``prefix`` layout starts every prompt with the same compacted
+        static instructions and appends the varying sections after them, so
+        providers' prompt prefix caching can reuse the shared part across
+        requests. The ``legacy`` layout renders SYSTEM_TEMPLATE unchanged.
+
+        Args:
+            variant (PromptVariant): The selected variant
+            tech_requirements (str | None): Technical requirements override
+            ui_requirements (str | None): UI component requirements override
+            target_audience (str | None): Target audience description
+            design_guidelines (str | None): Design guidelines, e.g. from a designer
+            layout (str): One of PROMPT_LAYOUTS
+
+        Returns:
+            str: The system prompt
+
+        Raises:
+            ValueError: If the layout is unknown
+        """
+        if layout not in PROMPT_LAYOUTS:
+            raise ValueError(f"Unknown prompt layout {layout!r}, expected one of {', '.join(PROMPT_LAYOUTS)}")
+
+        options = {name: values[index] for (name, values), index in zip(self.dimensions, variant.choices)}
+        sections = {
+            "tech_requirements": tech_requirements or options["tech"],
+            "ui_requirements": ui_requirements or options["ui"],
+            "target_audience": target_audience or DEFAULT_TARGET_AUDIENCE,
+            "design_guidelines": design_guidelines or options["design"],
+        }
+        randomization = {name: options[name] for name in ("approach", "focus", "including", "element")}
+
+        if layout == "legacy":
+            return self._system.render(
+                allowed_icons=allowed_icons(),
+                randomization_prompt=self._randomization.render(**randomization),
+                **sections,
+            )
+
+        varying = self._varying_sections.render(
+            randomization_prompt=self._compact_randomization.render(**randomization),
+            **{name: compact(value) for name, value in sections.items()},
+        )
+        return f"{self.static_prefix}\n\n{compact(varying)}"
+
+
+def allowed_icons() -> str:
+    """
+    Render the allowed icon list as it appears in the prompt.
+
+    Returns:
+        str: Comma-separated ``ICONS.Name`` references
+    """
+    return ", ".join(f"ICONS.{icon}" for icon in ALLOWED_ICONS)
+
+
+prompt_registry = PromptRegistry()
+"""Process-wide registry, compiled once at import time"""
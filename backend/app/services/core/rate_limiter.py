@@ -0,0 +1,236 @@
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+import structlog
+
+from app.config import settings
+from app.database import sessionmanager
+from app.errors import RateLimitExceededError
+from app.repositories.rate_limit_bucket_repository import RateLimitBucketRepository
+from app.services.llm.usage import TokenUsageStats, metered_usage
+from app.utils.metrics import metrics
+
+logger = structlog.stdlib.get_logger(__name__)
+
+RATE_LIMIT_BACKENDS = ("memory", "postgres")
+
+rate_limit_rejections = metrics.counter(
+    "rate_limit_rejections_total", "Generation requests rejected with a 429, by exhausted limit", ("limit",)
+)
+
+
+@dataclass
+class BucketLimit:
+    """Shape of a token bucket."""
+
+    capacity: float
+    """Maximum level, i.e. the burst size"""
+
+    refill_per_second: float
+    """Tokens added per second, i.e. the sustained rate"""
+
+    def retry_after(self, level: float, required: float) -> float:
+        """
+        Seconds until a bucket at ``level`` holds ``required`` tokens.
+
+        Args:
+            level (float): The current level
+            required (float): The level needed
+
+        Returns:
+            float: Seconds
+        """
+        return max(required - level, 0.0) / max(self.refill_per_second, 1e-9)
+
+
+class TokenBuckets(ABC):
+    """
+    Storage for token buckets, keyed by principal and limit.
+
+    ``level_before_take`` refills a bucket for the time elapsed since its last use, then
+    deducts ``amount`` if the bucket holds at least ``required``. Splitting the
+    two lets the same operation admit a request (take 1, require 1), check a
+    budget without spending it (take 0, require 1) and charge usage after the
+    fact (require nothing, possibly leaving the bucket in debt).
+    """
+
+    @abstractmethod
+    async def level_before_take(self, key: str, amount: float, required: float, limit: BucketLimit) -> float:
+        """
+        Refill a bucket and take ``amount`` tokens if it holds at least ``required``.
+
+        Args:
+            key (str): The bucket key
+            amount (float): Tokens to take when the check passes
+            required (float): Minimum level for the check to pass
+            limit (BucketLimit): Capacity and refill rate of the bucket
+
+        Returns:
+            float: The level after the refill and before the deduction
+        """
+
+
+class InMemoryTokenBuckets(TokenBuckets):
+    """
+    Token buckets kept in the process, for single-worker deployments.
+
+    Only the ``max_keys`` most recently used buckets are kept; an evicted
+    principal starts again from a full bucket.
+
+    Args:
+        max_keys (int): Number of buckets kept
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def level_before_take(self, key: str, amount: float, required: float, limit: BucketLimit) -> float:
+        now = time.monotonic()
+        level, refilled_at = self._buckets.pop(key, (limit.capacity, now))
+        level = min(limit.capacity, level + (now - refilled_at) * limit.refill_per_second)
+
+        self._buckets[key] = (level - amount if level >= required else level, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return level
+
+
+class PostgresTokenBuckets(TokenBuckets):
+    """
+    Token buckets stored in Postgres, shared by every uvicorn worker.
+
+    Each operation is one short transaction on its own session, independent
+    of the request's session, so a quota is spent even when the request
+    fails and no row lock is held while the LLM is called.
+    """
+
+    async def level_before_take(self, key: str, amount: float, required: float, limit: BucketLimit) -> float:
+        async with sessionmanager.session() as session:
+            level = await RateLimitBucketRepository(session).take(
+                key, amount, required, limit.capacity, limit.refill_per_second
+            )
+            await session.commit()
+        return level
+
+
+class GenerationQuota:
+    """
+    Request and LLM token quotas of one principal.
+
+    ``admit`` is called before any work is done and rejects with
+    RateLimitExceededError, without touching the LLM, when either bucket is
+    empty. The token cost of a generation is only known afterwards, so it is
+    charged by ``metered`` once the generation finishes; a large generation
+    may leave the token bucket in debt, which delays the next admission.
+
+    Args:
+        buckets (TokenBuckets | None): Bucket storage, None when rate limiting is disabled
+        principal (str): The principal, e.g. "user:alice@example.com" or "ip:10.0.0.1"
+        requests (BucketLimit): Limit on generation requests
+        tokens (BucketLimit): Limit on LLM tokens
+    """
+
+    def __init__(self, buckets: TokenBuckets | None, principal: str, requests: BucketLimit, tokens: BucketLimit):
+        self.buckets = buckets
+        self.principal = principal
+        self.requests = requests
+        self.tokens = tokens
+
+    async def admit(self, cost: int = 1) -> None:
+        """
+        Spend ``cost`` requests, provided the token budget is not exhausted.
+
+        Args:
+            cost (int): Number of generations requested, e.g. the variant count of a batch
+
+        Raises:
+            RateLimitExceededError: When either quota is exhausted
+        """
+        if self.buckets is None:
+            return
+
+        # Checked first and not spent, so a rejection here costs no request
+        level = await self.buckets.level_before_take(f"{self.principal}:tokens", 0, 1, self.tokens)
+        if level < 1:
+            self._reject("tokens", self.tokens.retry_after(level, 1))
+
+        # A batch larger than the burst would never fit, admit it on a full bucket instead
+        required = min(cost, self.requests.capacity)
+        level = await self.buckets.level_before_take(f"{self.principal}:requests", cost, required, self.requests)
+        if level < required:
+            self._reject("requests", self.requests.retry_after(level, required))
+
+    async def charge(self, tokens: int) -> None:
+        """
+        Charge LLM tokens used by the principal.
+
+        Args:
+            tokens (int): Prompt and completion tokens used
+        """
+        if self.buckets is None or tokens <= 0:
+            return
+        await self.buckets.level_before_take(f"{self.principal}:tokens", tokens, -math.inf, self.tokens)
+
+    @asynccontextmanager
+    async def metered(self) -> AsyncIterator[None]:
+        """Charge the tokens of every LLM call made inside the context to the principal."""
+        usage = TokenUsageStats()
+        token = metered_usage.set(usage)
+        try:
+            yield
+        finally:
+            metered_usage.reset(token)
+            await self.charge(usage.prompt_tokens + usage.completion_tokens)
+
+    def _reject(self, limit: str, retry_after: float) -> None:
+        rate_limit_rejections.inc(limit=limit)
+        logger.info(
+            "Generation rate limited", principal=self.principal, limit=limit, retry_after_seconds=round(retry_after, 1)
+        )
+        raise RateLimitExceededError(limit, retry_after)
+
+
+def build_token_buckets() -> TokenBuckets | None:
+    """
+    Create the bucket storage described by the ``RATE_LIMIT_*`` settings.
+
+    Returns:
+        TokenBuckets | None: The storage, None when rate limiting is disabled
+    """
+    if not settings.RATE_LIMIT_ENABLED:
+        return None
+    if settings.RATE_LIMIT_BACKEND not in RATE_LIMIT_BACKENDS:
+        raise ValueError(
+            f"Unknown rate limit backend {settings.RATE_LIMIT_BACKEND!r}, expected one of {', '.join(RATE_LIMIT_BACKENDS)}"
+        )
+    if settings.RATE_LIMIT_BACKEND == "postgres":
+        return PostgresTokenBuckets()
+    return InMemoryTokenBuckets()
+
+
+token_buckets = build_token_buckets()
+"""Process-wide bucket storage, None when rate limiting is disabled"""
+
+
+def generation_quota(principal: str) -> GenerationQuota:
+    """
+    Build the generation quota of a principal from the settings.
+
+    Args:
+        principal (str): The principal
+
+    Returns:
+        GenerationQuota: The principal's quota
+    """
+    return GenerationQuota(
+        token_buckets,
+        principal,
+        requests=BucketLimit(settings.RATE_LIMIT_REQUEST_BURST, settings.RATE_LIMIT_REQUESTS_PER_MINUTE / 60),
+        tokens=BucketLimit(settings.RATE_LIMIT_TOKEN_BURST, settings.RATE_LIMIT_TOKENS_PER_MINUTE / 60),
+    )
@@ -0,0 +1,120 @@
+from collections.abc import Iterable
+
+from app.services.core.component_pool import component_pool
+from app.services.core.generative import generation_flights
+from app.services.core.jsx_validator import component_validation_stats
+from app.services.core.semantic_cache import semantic_cache_stats
+from app.services.llm.concurrency import llm_gate
+from app.services.llm.hedging import llm_hedger
+from app.services.llm.providers import provider_router
+from app.utils.metrics import MetricFamily, counter_family, gauge_family, metrics
+
+
+def collect_runtime_metrics() -> Iterable[MetricFamily]:
+    """
+    Turn the in-process ``stats()`` snapshots into metric families at scrape time.
+
+    Covers the caching layers in front of the LLM (warm pool, semantic cache,
+    request coalescing), the concurrency gate, hedging, validation and the
+    provider router's view of each backend and its micro-batching.
+
+    Returns:
+        Iterable[MetricFamily]: The metric families
+    """
+    pool = component_pool.stats()
+    flights = generation_flights.stats()
+    # Coalesced followers are served by another request's call, the cache "hit" of single-flight
+    caches = {
+        "component_pool": (pool.hits, pool.misses),
+        "semantic_cache": (semantic_cache_stats.hits, semantic_cache_stats.misses),
+        "single_flight": (flights.followers, flights.leaders),
+    }
+    yield counter_family(
+        "cache_requests_total",
+        "Lookups per caching layer, by result",
+        [
+            ({"cache": cache, "result": result}, value)
+            for cache, (hits, misses) in caches.items()
+            for result, value in (("hit", hits), ("miss", misses))
+        ],
+    )
+    yield gauge_family(
+        "cache_hit_ratio",
+        "Share of lookups answered by each caching layer since startup",
+        [({"cache": cache}, hits / (hits + misses)) for cache, (hits, misses) in caches.items() if hits + misses],
+    )
+    yield gauge_family(
+        "component_pool_size",
+        "Ready components per persona/designer pair",
+        [({"pair": pair}, size) for pair, size in pool.sizes.items()],
+    )
+    yield counter_family(
+        "component_pool_discarded_total",
+        "Pooled components discarded, by reason",
+        [
+            ({"reason": "expired"}, pool.expired),
+            ({"reason": "rejected"}, pool.rejected),
+            ({"reason": "invalidated"}, pool.invalidated),
+        ],
+    )
+    yield counter_family(
+        "semantic_cache_stores_total", "Components written to the semantic cache", [({}, semantic_cache_stats.stores)]
+    )
+
+    gate = llm_gate.stats()
+    yield gauge_family("llm_gate_limit", "Maximum concurrent LLM calls", [({}, gate.limit)])
+    yield gauge_family("llm_gate_in_flight", "LLM calls holding a slot", [({}, gate.in_flight)])
+    yield gauge_family("llm_gate_waiting", "LLM calls queued for a slot", [({}, gate.waiting)])
+    yield counter_family(
+        "llm_gate_wait_seconds_total", "Time LLM calls spent queued for a slot", [({}, gate.wait_seconds_total)]
+    )
+
+    hedger = llm_hedger.stats()
+    yield counter_family(
+        "llm_hedge_total",
+        "Hedged LLM calls, by outcome",
+        [
+            ({"outcome": "hedged"}, hedger.hedged),
+            ({"outcome": "hedge_won"}, hedger.hedge_wins),
+            ({"outcome": "budget_denied"}, hedger.budget_denied),
+        ],
+    )
+
+    yield counter_family(
+        "component_validation_total",
+        "Generated components needing attention, by outcome",
+        [
+            ({"outcome": "repaired"}, component_validation_stats.repaired),
+            ({"outcome": "retried"}, component_validation_stats.retried),
+            ({"outcome": "failed"}, component_validation_stats.failed),
+            ({"outcome": "aborted"}, component_validation_stats.aborted),
+        ],
+    )
+
+    backends = [(backend.model_name, backend.stats()) for backend in provider_router.backends]
+    yield gauge_family(
+        "llm_backend_healthy",
+        "Whether the router sends requests to the backend",
+        [({"backend": stats.name, "model": model}, int(stats.healthy)) for model, stats in backends],
+    )
+    yield gauge_family(
+        "llm_backend_error_rate",
+        "Share of failed calls in the backend's rolling window",
+        [({"backend": stats.name, "model": model}, stats.error_rate) for model, stats in backends],
+    )
+
+    batchers = [(backend.name, backend.batcher.stats()) for backend in provider_router.backends if backend.batcher]
+    if batchers:
+        yield gauge_family(
+            "llm_batch_pending",
+            "Calls waiting for their micro-batch to be sent",
+            [({"backend": name}, stats.pending) for name, stats in batchers],
+        )
+        yield gauge_family(
+            "llm_batch_in_flight",
+            "Micro-batches sent and not answered yet",
+            [({"backend": name}, stats.in_flight) for name, stats in batchers],
+        )
+
+
+metrics.register_collector(collect_runtime_metrics)
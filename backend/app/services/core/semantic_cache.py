@@ -0,0 +1,123 @@
+from dataclasses import dataclass
+
+import structlog
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.repositories.generation_cache_repository import GenerationCacheRepository
+from app.services.llm.embeddings import Embedder, get_embedder
+from app.types.generative import GenerationCacheEntryCreate, GenerativeCreate, GenerativeDetail
+from app.utils.string import normalize_whitespace
+
+logger = structlog.stdlib.get_logger(__name__)
+
+
+@dataclass
+class SemanticCacheStats:
+    """Process-wide counters for the semantic cache."""
+
+    hits: int = 0
+    """Lookups answered from the cache"""
+
+    misses: int = 0
+    """Lookups that fell through to the LLM"""
+
+    stores: int = 0
+    """Generated components written to the cache"""
+
+
+semantic_cache_stats = SemanticCacheStats()
+"""Counters shared by every SemanticCache instance in the process"""
+
+
+class SemanticCache:
+    """
+    Returns previously generated components for near-duplicate requests.
+
+    Each request is embedded from its user preferences alone, the lookup
+    already filters on the persona/designer pair; the closest stored entry for
+    that pair is served when its cosine similarity reaches
+    ``SEMANTIC_CACHE_SIMILARITY_THRESHOLD``. Requests without preferences have
+    nothing to compare and skip the cache (see ``cache_text``).
+
+    Args:
+        db_session (AsyncSession): SQLAlchemy async database session
+        embedder (Embedder | None): Embedder to use, defaults to the configured one
+    """
+
+    def __init__(self, db_session: AsyncSession, embedder: Embedder | None = None):
+        self.repository = GenerationCacheRepository(db_session)
+        self.embedder = embedder or get_embedder()
+        self.threshold = settings.SEMANTIC_CACHE_SIMILARITY_THRESHOLD
+
+    async def lookup(self, generative_schema: GenerativeCreate) -> tuple[GenerativeDetail | None, list[float]]:
+        """Look up a cached component for a request.
+
+        Args:
+            generative_schema (GenerativeCreate): The generation request
+
+        Returns:
+            tuple[GenerativeDetail | None, list[float]]: The cached component, or
+            None on a miss, and the request embedding so a miss can be stored
+            without embedding the request twice
+        """
+        embedding = await self.embedder.embed(cache_text(generative_schema))
+        nearest = await self.repository.find_nearest(
+            embedding, generative_schema.persona_id, generative_schema.designer_id
+        )
+
+        if nearest is None or nearest[1] < self.threshold:
+            semantic_cache_stats.misses += 1
+            return None, embedding
+
+        entry, similarity = nearest
+        semantic_cache_stats.hits += 1
+        logger.info("Semantic cache hit", entry_id=entry.id, similarity=round(similarity, 4))
+        return GenerativeDetail(
+            user_prefferences=generative_schema.user_prefferences,
+            raw_component=entry.raw_component,
+            persona_id=entry.persona_id,
+            designer_id=entry.designer_id,
+            generated_prompt=entry.generated_prompt,
+            variant_id=entry.variant_id,
+            seed=entry.seed,
+        ), embedding
+
+    async def store(self, detail: GenerativeDetail, embedding: list[float]) -> None:
+        """Store a generated component under the embedding of its request.
+
+        Args:
+            detail (GenerativeDetail): The generated component
+            embedding (list[float]): The request embedding returned by lookup
+        """
+        await self.repository.create(
+            GenerationCacheEntryCreate(
+                persona_id=detail.persona_id,
+                designer_id=detail.designer_id,
+                user_prefferences=detail.user_prefferences,
+                raw_component=detail.raw_component,
+                generated_prompt=detail.generated_prompt,
+                variant_id=detail.variant_id,
+                seed=detail.seed,
+                embedding=embedding,
+            )
+        )
+        semantic_cache_stats.stores += 1
+
+
+def cache_text(generative_schema: GenerativeCreate) -> str:
+    """
+    Build the text embedded for a request.
+
+    The persona and designer are left out: the lookup filters on them, and a
+    prefix shared by every request of a pair would dominate the vectors of
+    short preferences.
+
+    Args:
+        generative_schema (GenerativeCreate): The generation request
+
+    Returns:
+        str: The whitespace-normalised, lower-cased preferences, empty when
+        there are none and the request should not use the cache
+    """
+    return normalize_whitespace(generative_schema.user_prefferences)
@@ -0,0 +1,341 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import structlog
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from openai import AsyncOpenAI
+
+from app.utils.metrics import metrics
+
+logger = structlog.stdlib.get_logger(__name__)
+
+BATCH_SIZE_BUCKETS = (1, 2, 3, 4, 6, 8, 12, 16, 24, 32, 64)
+"""Buckets for the number of calls per batch"""
+
+PROMPT_FORMATS: dict[str, tuple[str, str, str]] = {
+    "chatml": ("<|im_start|>{role}\n{content}<|im_end|>\n", "<|im_start|>assistant\n", "<|im_end|>"),
+    "llama3": (
+        "<|start_header_id|>{role}<|end_header_id|>\n\n{content}<|eot_id|>",
+        "<|start_header_id|>assistant<|end_header_id|>\n\n",
+        "<|eot_id|>",
+    ),
+}
+"""Chat templates by name: message format, assistant turn opener and stop sequence"""
+
+COMPLETION_OPTIONS = ("temperature", "top_p", "max_tokens", "seed")
+"""Backend options forwarded to the completions endpoint"""
+
+DEFAULT_MAX_TOKENS = 4096
+"""Completion budget of batched prompts when the backend options set no ``max_tokens``.
+vLLM defaults to 16 tokens on ``/v1/completions``, which truncates every component"""
+
+ROLES = {"system": "system", "human": "user", "ai": "assistant"}
+"""OpenAI roles by LangChain message type"""
+
+llm_batch_size = metrics.histogram(
+    "llm_batch_size", "Calls sent to a backend in one micro-batch", ("backend",), buckets=BATCH_SIZE_BUCKETS
+)
+llm_batch_occupancy = metrics.histogram(
+    "llm_batch_occupancy_ratio",
+    "Share of the maximum batch size filled when a micro-batch was sent",
+    ("backend",),
+    buckets=(0.1, 0.25, 0.5, 0.75, 0.9, 1.0),
+)
+llm_batch_wait_seconds = metrics.histogram(
+    "llm_batch_wait_seconds",
+    "Time the first call of a micro-batch waited for the batch to fill",
+    ("backend",),
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+llm_batch_seconds = metrics.histogram(
+    "llm_batch_duration_seconds", "Time for a backend to answer a whole micro-batch", ("backend",)
+)
+
+
+@dataclass
+class MicroBatcherStats:
+    """Point-in-time snapshot of a MicroBatcher."""
+
+    max_size: int
+    """Largest batch sent to the backend"""
+
+    pending: int
+    """Calls waiting for the current batch to be sent"""
+
+    in_flight: int
+    """Batches sent and not answered yet"""
+
+    batches: int
+    """Batches sent since startup"""
+
+    calls: int
+    """Calls sent in those batches"""
+
+
+class BatchClient(ABC):
+    """Sends a micro-batch of conversations to a backend."""
+
+    @abstractmethod
+    async def abatch(self, batch: Sequence[Sequence[BaseMessage]]) -> list[BaseMessage | Exception]:
+        """
+        Complete every conversation of the batch.
+
+        Args:
+            batch (Sequence[Sequence[BaseMessage]]): The conversations
+
+        Returns:
+            list[BaseMessage | Exception]: The reply or error of each conversation, in batch order
+
+        Raises:
+            Exception: An error failing the whole batch
+        """
+
+
+class ConcurrentBatchClient(BatchClient):
+    """
+    Sends a micro-batch to Ollama as concurrent chat requests.
+
+    Ollama's OpenAI-compatible ``/v1/completions`` takes a single prompt, so
+    there is no request carrying a batch. Its scheduler instead decodes up to
+    ``OLLAMA_NUM_PARALLEL`` concurrent requests of a loaded model together,
+    and sending a micro-batch at once fills those slots in the same step.
+
+    Args:
+        model (BaseChatModel): The Ollama chat model
+    """
+
+    def __init__(self, model: BaseChatModel):
+        self.model = model
+
+    async def abatch(self, batch: Sequence[Sequence[BaseMessage]]) -> list[BaseMessage | Exception]:
+        return await self.model.abatch(
+            [list(messages) for messages in batch],
+            config={"max_concurrency": len(batch)},
+            return_exceptions=True,
+        )
+
+
+class CompletionsBatchClient(BatchClient):
+    """
+    Sends several chat prompts in one request to an OpenAI-compatible completions endpoint.
+
+    Chat completion APIs take one conversation per request, so batching them
+    only fans out concurrent requests. The legacy ``/v1/completions`` endpoint
+    of self-hosted servers such as vLLM and the llama.cpp server takes a list
+    of prompts instead, which the server schedules into the same decoding
+    steps. Each conversation is rendered with the model's chat template
+    (``prompt_format``), since that endpoint does not apply one.
+
+    The server reports the usage of the whole request; it is split across
+    the prompts in proportion to their length and to that of their completions.
+    ``max_tokens`` defaults to DEFAULT_MAX_TOKENS rather than the server's own
+    default.
+
+    Args:
+        base_url (str): The server's OpenAI API root, e.g. ``http://vllm:8000/v1``
+        model (str): Model name at the server
+        api_key (str): Key sent to the server
+        prompt_format (str): One of PROMPT_FORMATS
+        options (dict[str, Any] | None): Backend options, those in COMPLETION_OPTIONS are forwarded
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        model: str,
+        api_key: str = "EMPTY",
+        prompt_format: str = "chatml",
+        options: dict[str, Any] | None = None,
+    ):
+        if prompt_format not in PROMPT_FORMATS:
+            raise ValueError(f"Unknown prompt format {prompt_format!r}, expected one of {', '.join(PROMPT_FORMATS)}")
+
+        self.model = model
+        self.prompt_format = prompt_format
+        self.options = {key: value for key, value in (options or {}).items() if key in COMPLETION_OPTIONS}
+        self.options.setdefault("max_tokens", DEFAULT_MAX_TOKENS)
+        self.client = AsyncOpenAI(base_url=base_url, api_key=api_key)
+
+    def render(self, messages: Sequence[BaseMessage]) -> str:
+        """
+        Render a conversation as a completion prompt.
+
+        Args:
+            messages (Sequence[BaseMessage]): The chat messages
+
+        Returns:
+            str: The prompt, ending where the assistant's reply starts
+        """
+        message_format, reply, _ = PROMPT_FORMATS[self.prompt_format]
+        turns = [
+            message_format.format(role=ROLES.get(message.type, message.type), content=message.content)
+            for message in messages
+        ]
+        return "".join(turns) + reply
+
+    async def abatch(self, batch: Sequence[Sequence[BaseMessage]]) -> list[BaseMessage | Exception]:
+        prompts = [self.render(messages) for messages in batch]
+        response = await self.client.completions.create(
+            model=self.model, prompt=prompts, stop=[PROMPT_FORMATS[self.prompt_format][2]], **self.options
+        )
+
+        texts = [""] * len(prompts)
+        for choice in response.choices:
+            texts[choice.index] = choice.text
+        if response.usage is None:
+            return [AIMessage(content=text) for text in texts]
+
+        prompt_tokens = _split(response.usage.prompt_tokens, [len(prompt) for prompt in prompts])
+        completion_tokens = _split(response.usage.completion_tokens, [len(text) for text in texts])
+        return [
+            AIMessage(
+                content=text,
+                usage_metadata={
+                    "input_tokens": prompt_tokens[index],
+                    "output_tokens": completion_tokens[index],
+                    "total_tokens": prompt_tokens[index] + completion_tokens[index],
+                },
+            )
+            for index, text in enumerate(texts)
+        ]
+
+
+class MicroBatcher:
+    """
+    Groups concurrent calls to a self-hosted model into batches.
+
+    A call waits until ``max_size`` calls are pending or ``max_wait_seconds``
+    have passed since the first of them, and the pending calls are then sent
+    together through the backend's BatchClient. Requests arriving a few
+    milliseconds apart then share decoding steps on the server instead of
+    trickling in behind each other.
+
+    A call cancelled while pending is left out of its batch; once the batch
+    is sent it runs to completion and the result is discarded.
+
+    Args:
+        name (str): Backend name, used in logs and metrics
+        client (BatchClient): Sends the batches to the server
+        max_size (int): Most calls per batch, e.g. the server's parallel slots
+        max_wait_seconds (float): Longest a call waits for its batch to fill
+    """
+
+    def __init__(self, name: str, client: BatchClient, max_size: int, max_wait_seconds: float):
+        if max_size < 1:
+            raise ValueError("MicroBatcher max_size must be at least 1")
+
+        self.name = name
+        self.client = client
+        self.max_size = max_size
+        self.max_wait_seconds = max_wait_seconds
+
+        self._pending: list[tuple[Sequence[BaseMessage], asyncio.Future[BaseMessage]]] = []
+        self._first_pending_at = 0.0
+        self._timer: asyncio.TimerHandle | None = None
+        self._batches: set[asyncio.Task[None]] = set()
+        self._batch_count = 0
+        self._call_count = 0
+
+    async def ainvoke(self, messages: Sequence[BaseMessage]) -> BaseMessage:
+        """
+        Invoke the model as part of the next batch.
+
+        Args:
+            messages (Sequence[BaseMessage]): The chat messages
+
+        Returns:
+            BaseMessage: The model reply
+
+        Raises:
+            Exception: The model's error for this call
+        """
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[BaseMessage] = loop.create_future()
+        if not self._pending:
+            self._first_pending_at = time.perf_counter()
+        self._pending.append((messages, future))
+
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_seconds, self._flush)
+
+        try:
+            return await future
+        except asyncio.CancelledError:
+            self._pending = [(pending, waiter) for pending, waiter in self._pending if waiter is not future]
+            raise
+
+    def stats(self) -> MicroBatcherStats:
+        """
+        Return a snapshot of the batcher's counters.
+
+        Returns:
+            MicroBatcherStats: The current statistics
+        """
+        return MicroBatcherStats(
+            max_size=self.max_size,
+            pending=len(self._pending),
+            in_flight=len(self._batches),
+            batches=self._batch_count,
+            calls=self._call_count,
+        )
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch = [(messages, future) for messages, future in self._pending if not future.done()]
+        self._pending = []
+        if not batch:
+            return
+
+        llm_batch_wait_seconds.observe(time.perf_counter() - self._first_pending_at, backend=self.name)
+        task = asyncio.ensure_future(self._send(batch))
+        # Keep a reference, the event loop only holds weak ones
+        self._batches.add(task)
+        task.add_done_callback(self._batches.discard)
+
+    async def _send(self, batch: list[tuple[Sequence[BaseMessage], asyncio.Future[BaseMessage]]]) -> None:
+        self._batch_count += 1
+        self._call_count += len(batch)
+        llm_batch_size.observe(len(batch), backend=self.name)
+        llm_batch_occupancy.observe(len(batch) / self.max_size, backend=self.name)
+
+        started = time.perf_counter()
+        try:
+            results: list[BaseMessage | Exception] = await self.client.abatch([messages for messages, _ in batch])
+        except Exception as exc:
+            results = [exc] * len(batch)
+        duration = time.perf_counter() - started
+        llm_batch_seconds.observe(duration, backend=self.name)
+        logger.debug("LLM batch answered", backend=self.name, size=len(batch), seconds=round(duration, 3))
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                # The caller was cancelled while the batch ran
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+def _split(total: int, weights: list[int]) -> list[int]:
+    # Largest remainder, so the parts add up to the total
+    if not weights:
+        return []
+    if not any(weights):
+        weights = [1] * len(weights)
+    shares = [total * weight / sum(weights) for weight in weights]
+    parts = [int(share) for share in shares]
+    by_remainder = sorted(range(len(shares)), key=lambda index: shares[index] - parts[index], reverse=True)
+    for index in by_remainder[: total - sum(parts)]:
+        parts[index] += 1
+    return parts
@@ -0,0 +1,114 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+import structlog
+
+from app.config import settings
+
+logger = structlog.stdlib.get_logger(__name__)
+
+
+@dataclass
+class ConcurrencyGateStats:
+    """Point-in-time snapshot of a ConcurrencyGate."""
+
+    limit: int
+    """Maximum number of calls allowed in flight"""
+
+    in_flight: int
+    """Calls currently holding a slot"""
+
+    waiting: int
+    """Calls currently queued for a slot"""
+
+    acquired_total: int
+    """Number of slots handed out since startup"""
+
+    wait_seconds_total: float
+    """Accumulated time callers spent queued"""
+
+    wait_seconds_max: float
+    """Longest time a single caller spent queued"""
+
+
+class ConcurrencyGate:
+    """
+    Bounds the number of concurrent LLM calls made by a single process.
+
+    Callers that find the gate full are queued on an asyncio semaphore instead
+    of blocking the event loop, and the time they spend queued is recorded so
+    that queueing delay can be told apart from provider latency.
+
+    Args:
+        limit (int): Maximum number of calls allowed in flight at once
+    """
+
+    def __init__(self, limit: int):
+        if limit < 1:
+            raise ValueError("ConcurrencyGate limit must be at least 1")
+
+        self.limit = limit
+        self._semaphore = asyncio.Semaphore(limit)
+        self._in_flight = 0
+        self._waiting = 0
+        self._acquired_total = 0
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[float]:
+        """
+        Acquire a slot for the duration of the context.
+
+        Yields:
+            float: Seconds spent queued before the slot was granted
+        """
+        started = time.perf_counter()
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+
+        waited = time.perf_counter() - started
+        self._in_flight += 1
+        self._acquired_total += 1
+        self._wait_seconds_total += waited
+        self._wait_seconds_max = max(self._wait_seconds_max, waited)
+
+        if waited >= settings.LLM_QUEUE_WAIT_WARNING_SECONDS:
+            logger.warning(
+                "LLM call queued behind concurrency gate",
+                waited_seconds=round(waited, 3),
+                limit=self.limit,
+                waiting=self._waiting,
+            )
+
+        try:
+            yield waited
+        finally:
+            self._in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> ConcurrencyGateStats:
+        """
+        Return a snapshot of the gate's current state and counters.
+
+        Returns:
+            ConcurrencyGateStats: The current gate statistics
+        """
+        return ConcurrencyGateStats(
+            limit=self.limit,
+            in_flight=self._in_flight,
+            waiting=self._waiting,
+            acquired_total=self._acquired_total,
+            wait_seconds_total=self._wait_seconds_total,
+            wait_seconds_max=self._wait_seconds_max,
+        )
+
+
+llm_gate = ConcurrencyGate(settings.LLM_MAX_CONCURRENCY)
+"""Process-wide gate shared by every LLM call"""
@@ -0,0 +1,99 @@
+import hashlib
+import math
+import re
+from functools import lru_cache
+from typing import Protocol
+
+from langchain_openai import OpenAIEmbeddings
+
+from app.config import settings
+
+
+class Embedder(Protocol):
+    """Turns text into a fixed-size vector suitable for pgvector columns."""
+
+    dimensions: int
+    """Length of the vectors produced by the embedder"""
+
+    async def embed(self, text: str) -> list[float]:
+        """
+        Embed a single text.
+
+        Args:
+            text (str): The text to embed
+
+        Returns:
+            list[float]: An L2-normalised vector of ``dimensions`` floats
+        """
+        ...
+
+
+class HashingEmbedder:
+    """
+    Deterministic, dependency-free embedder based on the hashing trick.
+
+    Word unigrams and bigrams are hashed into ``dimensions`` buckets with a
+    signed count, and the result is L2-normalised, so near-duplicate texts end
+    up with a high cosine similarity. It needs no network access and returns
+    identical vectors across processes, which makes it suitable for tests and
+    local development.
+
+    Args:
+        dimensions (int): Length of the produced vectors
+    """
+
+    def __init__(self, dimensions: int):
+        self.dimensions = dimensions
+
+    async def embed(self, text: str) -> list[float]:
+        words = re.findall(r"\w+", text.lower())
+        features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+        vector = [0.0] * self.dimensions
+        for feature in features:
+            digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+            value = int.from_bytes(digest, "big")
+            vector[value % self.dimensions] += 1.0 if value >> 63 else -1.0
+
+        norm = math.sqrt(sum(component * component for component in vector))
+        if norm == 0:
+            return vector
+        return [component / norm for component in vector]
+
+
+class OpenAIEmbedder:
+    """
+    Embedder backed by the OpenAI embeddings API.
+
+    Args:
+        model (str): The embedding model name
+        dimensions (int): Length of the produced vectors
+    """
+
+    def __init__(self, model: str, dimensions: int):
+        self.dimensions = dimensions
+        self._client = OpenAIEmbeddings(
+            model=model, dimensions=dimensions, api_key=settings.get_openai_api_key()
+        )
+
+    async def embed(self, text: str) -> list[float]:
+        return await self._client.aembed_query(text)
+
+
+@lru_cache
+def get_embedder() -> Embedder:
+    """
+    Return the process-wide embedder selected by ``EMBEDDING_PROVIDER``.
+
+    Returns:
+        Embedder: The configured embedder
+
+    Raises:
+        ValueError: If the configured provider is unknown
+    """
+    if settings.EMBEDDING_PROVIDER == "hashing":
+        return HashingEmbedder(settings.EMBEDDING_DIMENSIONS)
+    if settings.EMBEDDING_PROVIDER == "openai":
+        return OpenAIEmbedder(settings.EMBEDDING_MODEL, settings.EMBEDDING_DIMENSIONS)
+
+    raise ValueError(f"Unknown EMBEDDING_PROVIDER: {settings.EMBEDDING_PROVIDER}")
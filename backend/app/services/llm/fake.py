@@ -0,0 +1,207 @@
+import asyncio
+import math
+import random
+import re
+import time
+from collections.abc import AsyncIterator, Iterator
+from typing import Any
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+FAKE_COMPONENT_TEMPLATE = (
+    '<MUI.Box sx={{ p: 3, display: "flex", flexDirection: "column", gap: 2 }}>'
+    '<MUI.Typography variant="h5">{title}</MUI.Typography>'
+    '<MUI.TextField label="Full Name" />'
+    '<MUI.TextField label="Email Address" type="email" />'
+    '<MUI.TextField label="Phone Number" type="tel" />'
+    '<MUI.TextField label="{field}" helperText="Tell us a bit more" />'
+    '<MUI.Button variant="contained" startIcon={<ICONS.Person />}>Submit</MUI.Button>'
+    "</MUI.Box>"
+)
+FAKE_TITLES = ("Tell us about you", "Registration", "Welcome aboard", "Your profile", "Getting started")
+FAKE_FIELDS = ("Company", "Role", "Goals", "How did you hear about us?", "Availability")
+
+
+class FakeLLMError(RuntimeError):
+    """Failure injected by FakeChatModel."""
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Stand-in chat model for load tests and local development, no network or cost.
+
+    Replies with a valid component after a log-normally distributed delay
+    (``latency_seconds`` median, ``latency_sigma`` spread), streams it at
+    ``tokens_per_second`` and fails with probability ``failure_rate``. Usage
+    metadata is estimated at four characters per token.
+
+    Select it with a backend whose provider is ``fake``, e.g.
+    ``LLM_BACKENDS='[{"name": "fake", "provider": "fake", "model": "fake", "options": {"latency_seconds": 0.8}}]'``.
+    """
+
+    model: str = "fake"
+    """Model name reported in logs"""
+
+    latency_seconds: float = 1.0
+    """Median time to first token"""
+
+    latency_sigma: float = 0.5
+    """Log-normal sigma of the time to first token, 0 for a constant latency"""
+
+    tokens_per_second: float = 200.0
+    """Output speed once the first token has been produced, 0 for instant"""
+
+    failure_rate: float = 0.0
+    """Probability that a call raises FakeLLMError"""
+
+    n: int = 1
+    """Completions per call, mirrors the OpenAI ``n`` parameter"""
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat-model"
+
+    def sample_latency(self) -> float:
+        """
+        Draw a time to first token.
+
+        Returns:
+            float: Seconds
+        """
+        if self.latency_sigma <= 0:
+            return self.latency_seconds
+        return random.lognormvariate(math.log(max(self.latency_seconds, 1e-6)), self.latency_sigma)
+
+    def token_delay(self) -> float:
+        """
+        Return the delay between two streamed tokens.
+
+        Returns:
+            float: Seconds
+        """
+        return 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def maybe_fail(self) -> None:
+        """
+        Raise FakeLLMError with probability ``failure_rate``.
+
+        Raises:
+            FakeLLMError: When the injected failure triggers
+        """
+        if random.random() < self.failure_rate:
+            raise FakeLLMError("Injected fake LLM failure")
+
+    def completion_text(self) -> str:
+        """
+        Produce a valid, randomly varied component.
+
+        Returns:
+            str: Single-line JSX
+        """
+        return FAKE_COMPONENT_TEMPLATE.replace("{title}", random.choice(FAKE_TITLES)).replace(
+            "{field}", f"{random.choice(FAKE_FIELDS)} #{random.randrange(10_000)}"
+        )
+
+    def usage_metadata(self, messages: list[BaseMessage], completion: str) -> dict[str, int]:
+        """
+        Estimate token usage for a call.
+
+        Args:
+            messages (list[BaseMessage]): The prompt messages
+            completion (str): The generated text
+
+        Returns:
+            dict[str, int]: LangChain ``usage_metadata``
+        """
+        prompt_tokens = sum(len(str(message.content)) for message in messages) // 4
+        completion_tokens = len(completion) // 4
+        return {
+            "input_tokens": prompt_tokens,
+            "output_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+    def _completion_seconds(self, completion: str) -> float:
+        return self.sample_latency() + len(tokenize(completion)) * self.token_delay()
+
+    def _result(self, messages: list[BaseMessage], n: int) -> ChatResult:
+        generations = []
+        for _ in range(n):
+            completion = self.completion_text()
+            message = AIMessage(content=completion, usage_metadata=self.usage_metadata(messages, completion))
+            generations.append(ChatGeneration(message=message))
+        return ChatResult(generations=generations)
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        self.maybe_fail()
+        result = self._result(messages, kwargs.get("n", self.n))
+        time.sleep(max(self._completion_seconds(generation.text) for generation in result.generations))
+        return result
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        self.maybe_fail()
+        result = self._result(messages, kwargs.get("n", self.n))
+        await asyncio.sleep(max(self._completion_seconds(generation.text) for generation in result.generations))
+        return result
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        self.maybe_fail()
+        completion = self.completion_text()
+        time.sleep(self.sample_latency())
+        for token in tokenize(completion):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+            time.sleep(self.token_delay())
+        yield ChatGenerationChunk(
+            message=AIMessageChunk(content="", usage_metadata=self.usage_metadata(messages, completion))
+        )
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        self.maybe_fail()
+        completion = self.completion_text()
+        await asyncio.sleep(self.sample_latency())
+        for token in tokenize(completion):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+            await asyncio.sleep(self.token_delay())
+        yield ChatGenerationChunk(
+            message=AIMessageChunk(content="", usage_metadata=self.usage_metadata(messages, completion))
+        )
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Split text into roughly token-sized pieces for streaming.
+
+    Args:
+        text (str): The text to split
+
+    Returns:
+        list[str]: Pieces of at most four characters that join back into ``text``
+    """
+    return re.findall(r".{1,4}", text, re.DOTALL)
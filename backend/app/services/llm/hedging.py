@@ -0,0 +1,256 @@
+import asyncio
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any, Generic, TypeVar
+
+import structlog
+
+from app.config import settings
+
+logger = structlog.stdlib.get_logger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class HedgerStats:
+    """Point-in-time snapshot of a Hedger."""
+
+    calls: int
+    """Calls made through the hedger"""
+
+    hedged: int
+    """Calls for which a second attempt was started"""
+
+    hedge_wins: int
+    """Hedged calls answered by the second attempt"""
+
+    budget_denied: int
+    """Calls that reached the delay but were not hedged because of the cap"""
+
+    delay_seconds: float | None
+    """Current hedging delay of complete calls, None until enough latencies have been observed"""
+
+    first_output_delay_seconds: float | None
+    """Current hedging delay of streamed calls, None until enough times to first output have been observed"""
+
+
+class HedgeAttempt:
+    """
+    Progress of one attempt of a hedged call, reported by the attempt itself.
+
+    An attempt must call ``sent`` once it is through any local queue (at once
+    if it has none): the hedging delay and the measured latency start there,
+    so that queueing is not mistaken for a slow provider. A streamed attempt
+    also calls ``first_output`` when its first chunk arrives.
+
+    Args:
+        number (int): 0 for the primary attempt, 1 for the hedge
+    """
+
+    def __init__(self, number: int):
+        self.number = number
+        self.created_at = time.perf_counter()
+        self.sent_at: float | None = None
+        self.first_output_at: float | None = None
+        self.finished_at: float | None = None
+        self._sent = asyncio.Event()
+        self._first_output = asyncio.Event()
+
+    def sent(self) -> None:
+        """Mark the moment the call left the local queue for the provider."""
+        if self.sent_at is None:
+            self.sent_at = time.perf_counter()
+            self._sent.set()
+
+    def first_output(self) -> None:
+        """Mark the arrival of the first streamed output."""
+        if self.first_output_at is None:
+            self.first_output_at = time.perf_counter()
+            self._first_output.set()
+
+
+class Hedger(Generic[T]):
+    """
+    Hedged requests: when a call is slower than usual, race a second attempt.
+
+    The primary attempt starts immediately. If, once it has been sent to the
+    provider, it has not finished (or, for a streamed call, produced its first
+    output) after the hedging delay, a second attempt starts in parallel; the
+    first to succeed wins and the other is cancelled. The delay is the
+    ``percentile`` of the recent latencies of primary attempts, queueing
+    excluded, or ``fixed_delay_seconds`` when set. Complete and streamed calls
+    keep separate latencies: the time to the whole reply and the time to the
+    first output.
+
+    Hedges are capped at ``max_extra_ratio`` of the calls in the recent
+    window so that a slow provider is not answered with twice the load.
+
+    Args:
+        percentile (float): Latency percentile used as the delay, e.g. 0.9
+        fixed_delay_seconds (float | None): Fixed delay overriding the percentile
+        min_samples (int): Latencies needed before the percentile is trusted
+        max_extra_ratio (float): Maximum share of calls that may be hedged
+        window (int): Number of recent calls used for latencies and the cap
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.9,
+        fixed_delay_seconds: float | None = None,
+        min_samples: int = 20,
+        max_extra_ratio: float = 0.1,
+        window: int = 200,
+    ):
+        self.percentile = percentile
+        self.fixed_delay_seconds = fixed_delay_seconds
+        self.min_samples = min_samples
+        self.max_extra_ratio = max_extra_ratio
+
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._first_output_latencies: deque[float] = deque(maxlen=window)
+        self._recent_hedges: deque[bool] = deque(maxlen=window)
+        self._calls = 0
+        self._hedged = 0
+        self._hedge_wins = 0
+        self._budget_denied = 0
+
+    def delay(self, streamed: bool = False) -> float | None:
+        """
+        Return how long the primary attempt may run before it is hedged.
+
+        Args:
+            streamed (bool): Whether the delay applies to the time to first output
+
+        Returns:
+            float | None: Seconds, or None while there are too few samples
+        """
+        if self.fixed_delay_seconds is not None:
+            return self.fixed_delay_seconds
+        latencies = self._first_output_latencies if streamed else self._latencies
+        if len(latencies) < self.min_samples:
+            return None
+
+        ordered = sorted(latencies)
+        return ordered[min(int(len(ordered) * self.percentile), len(ordered) - 1)]
+
+    def _within_budget(self) -> bool:
+        hedges = sum(self._recent_hedges)
+        return hedges + 1 <= self.max_extra_ratio * (len(self._recent_hedges) + 1)
+
+    async def run(
+        self,
+        attempt: Callable[[HedgeAttempt], Awaitable[T]],
+        allow: Callable[[], bool] | None = None,
+        streamed: bool = False,
+    ) -> T:
+        """
+        Run a call, hedging it if it is slow.
+
+        Args:
+            attempt: Coroutine function performing the call, given its
+                HedgeAttempt, whose ``number`` is 0 for the primary and 1 for
+                the hedge so it can e.g. pick another backend
+            allow: Optional predicate checked before hedging, e.g. to skip
+                hedging while the process is saturated
+            streamed: Whether the attempts report ``first_output``, hedging
+                on the time to first output rather than to the whole reply
+
+        Returns:
+            T: The result of the first attempt to succeed
+
+        Raises:
+            Exception: The primary attempt's error when every attempt failed
+        """
+        self._calls += 1
+        progress = HedgeAttempt(0)
+        primary = asyncio.ensure_future(attempt(progress))
+        primary.add_done_callback(lambda _: setattr(progress, "finished_at", time.perf_counter()))
+        tasks = [primary]
+        hedged = False
+
+        try:
+            delay = self.delay(streamed)
+            if delay is not None and await self._slow(primary, progress, delay, streamed):
+                if self._within_budget() and (allow is None or allow()):
+                    hedged = True
+                    self._hedged += 1
+                    tasks.append(asyncio.ensure_future(attempt(HedgeAttempt(1))))
+                    logger.info("Hedging slow LLM call", delay_seconds=round(delay, 3), streamed=streamed)
+                else:
+                    self._budget_denied += 1
+
+            pending = set(tasks)
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((task for task in done if task.exception() is None), None)
+                if winner is not None:
+                    break
+                if not pending:
+                    # Every attempt failed: surface the primary's error
+                    return primary.result()
+
+            if winner is not primary:
+                self._hedge_wins += 1
+            return winner.result()
+        finally:
+            self._recent_hedges.append(hedged)
+            self._record(primary, progress, streamed)
+            for task in tasks:
+                task.cancel()
+
+    async def _slow(self, primary: "asyncio.Future[T]", progress: HedgeAttempt, delay: float, streamed: bool) -> bool:
+        # Queueing says nothing about the provider, the delay runs from the moment the call is sent
+        if not await _until(progress._sent, primary, None):
+            return False
+        elapsed = time.perf_counter() - (progress.sent_at or progress.created_at)
+        if streamed:
+            return not await _until(progress._first_output, primary, max(delay - elapsed, 0.0))
+        done, _ = await asyncio.wait([primary], timeout=max(delay - elapsed, 0.0))
+        return not done
+
+    def _record(self, primary: "asyncio.Future[T]", progress: HedgeAttempt, streamed: bool) -> None:
+        # Only the primary's own latency: hedge wins and queueing would skew the delay
+        sent_at = progress.sent_at or progress.created_at
+        if streamed:
+            if progress.first_output_at is not None:
+                self._first_output_latencies.append(progress.first_output_at - sent_at)
+        elif progress.finished_at is not None and not primary.cancelled() and primary.exception() is None:
+            self._latencies.append(progress.finished_at - sent_at)
+
+    def stats(self) -> HedgerStats:
+        """
+        Return a snapshot of the hedger's counters.
+
+        Returns:
+            HedgerStats: The current hedging statistics
+        """
+        return HedgerStats(
+            calls=self._calls,
+            hedged=self._hedged,
+            hedge_wins=self._hedge_wins,
+            budget_denied=self._budget_denied,
+            delay_seconds=self.delay(),
+            first_output_delay_seconds=self.delay(streamed=True),
+        )
+
+
+async def _until(event: asyncio.Event, task: "asyncio.Future[Any]", timeout: float | None) -> bool:
+    """Wait for ``event`` unless ``task`` finishes first; whether the event was set in time."""
+    waiter = asyncio.ensure_future(event.wait())
+    try:
+        await asyncio.wait([waiter, task], timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        waiter.cancel()
+    return event.is_set()
+
+
+llm_hedger: Hedger = Hedger(
+    percentile=settings.HEDGING_PERCENTILE,
+    fixed_delay_seconds=settings.HEDGING_DELAY_SECONDS,
+    min_samples=settings.HEDGING_MIN_SAMPLES,
+    max_extra_ratio=settings.HEDGING_MAX_EXTRA_RATIO,
+)
+"""Process-wide hedger for single-completion LLM calls"""
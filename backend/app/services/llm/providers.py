@@ -0,0 +1,585 @@
+import asyncio
+import hashlib
+import math
+import random
+import statistics
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Sequence
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+import structlog
+from langchain.chat_models import init_chat_model
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage, BaseMessageChunk
+from langchain_core.outputs import LLMResult
+
+from app.config import LLMBackendSettings, settings
+from app.services.llm.batching import BatchClient, CompletionsBatchClient, ConcurrentBatchClient, MicroBatcher
+from app.services.llm.fake import FakeChatModel
+from app.services.llm.usage import estimate_tokens
+from app.types.generative import TokenUsage
+from app.utils.metrics import metrics
+
+logger = structlog.stdlib.get_logger(__name__)
+
+ROUTING_POLICIES = ("latency", "weighted", "sticky")
+
+llm_call_seconds = metrics.histogram(
+    "llm_call_duration_seconds", "Duration of chat model calls", ("backend", "model", "outcome")
+)
+llm_call_errors = metrics.counter("llm_call_errors_total", "Failed chat model calls", ("backend", "model"))
+llm_tokens = metrics.counter(
+    "llm_tokens_total", "Tokens reported by the providers, by type", ("backend", "model", "type")
+)
+llm_abandoned_calls = metrics.counter(
+    "llm_abandoned_calls_total", "Chat model calls cancelled before they finished", ("backend", "model")
+)
+llm_abandoned_seconds = metrics.counter(
+    "llm_abandoned_seconds_total", "Time spent in chat model calls that were then cancelled", ("backend", "model")
+)
+llm_abandoned_tokens = metrics.counter(
+    "llm_abandoned_tokens_total",
+    "Estimated tokens of cancelled chat model calls: the prompt and the output received before cancelling",
+    ("backend", "model", "type"),
+)
+
+
+@dataclass
+class LLMCall:
+    """Progress of a call made inside LLMBackend.track."""
+
+    messages: Sequence[BaseMessage] = ()
+    """The prompt"""
+
+    output: list[str] = field(default_factory=list)
+    """Streamed output received so far"""
+
+
+@dataclass
+class LLMBackendStats:
+    """Point-in-time snapshot of a backend's rolling statistics."""
+
+    name: str
+    """The backend name"""
+
+    healthy: bool
+    """Whether the router currently sends requests to the backend"""
+
+    calls: int
+    """Calls in the rolling window"""
+
+    error_rate: float
+    """Share of failed calls in the rolling window"""
+
+    latency_seconds_avg: float | None
+    """Mean duration of successful calls in the rolling window"""
+
+    consecutive_failures: int
+    """Failures since the last successful call"""
+
+
+class LLMBackend:
+    """
+    A chat model together with the rolling statistics used to route to it.
+
+    The last ``window`` calls are kept as (duration, success) samples. After
+    ``max_consecutive_failures`` failures in a row the backend is taken out of
+    rotation for ``cooldown_seconds``; the first call after the cooldown acts
+    as a probe that either restores it or starts a new cooldown.
+
+    Args:
+        name (str): Unique name used in logs and statistics
+        model (BaseChatModel): The chat model
+        model_name (str | None): Model identifier used in metrics, defaults to ``name``
+        weight (float): Share of traffic under the weighted policy
+        window (int): Number of recent calls kept for the statistics
+        max_consecutive_failures (int): Failures that trigger a cooldown
+        cooldown_seconds (float): How long a failing backend is skipped
+        batcher (MicroBatcher | None): Groups unstreamed calls into batched requests, None to disable
+    """
+
+    def __init__(
+        self,
+        name: str,
+        model: BaseChatModel,
+        model_name: str | None = None,
+        weight: float = 1.0,
+        window: int = 50,
+        max_consecutive_failures: int = 3,
+        cooldown_seconds: float = 30.0,
+        batcher: MicroBatcher | None = None,
+    ):
+        self.name = name
+        self.model = model
+        self.model_name = model_name or name
+        self.weight = weight
+        self.max_consecutive_failures = max_consecutive_failures
+        self.cooldown_seconds = cooldown_seconds
+        self.batcher = batcher
+
+        self._samples: deque[tuple[float, bool]] = deque(maxlen=window)
+        self._consecutive_failures = 0
+        self._cooldown_until = 0.0
+
+    @property
+    def healthy(self) -> bool:
+        """Whether the backend is outside its failure cooldown."""
+        return time.monotonic() >= self._cooldown_until
+
+    @property
+    def supports_multi_completion(self) -> bool:
+        """Whether the model can return several completions from one call (``n``)."""
+        return "n" in getattr(type(self.model), "model_fields", {})
+
+    async def ainvoke(self, messages: Sequence[BaseMessage]) -> BaseMessage:
+        """
+        Invoke the model, as part of a micro-batch when batching is enabled.
+
+        Args:
+            messages (Sequence[BaseMessage]): The chat messages
+
+        Returns:
+            BaseMessage: The model reply
+        """
+        if self.batcher is not None:
+            return await self.batcher.ainvoke(messages)
+        return await self.model.ainvoke(list(messages))
+
+    def latency(self) -> float | None:
+        """
+        Mean duration of the successful calls in the rolling window.
+
+        Returns:
+            float | None: Seconds, or None before the first successful call
+        """
+        durations = [duration for duration, success in self._samples if success]
+        return sum(durations) / len(durations) if durations else None
+
+    def error_rate(self) -> float:
+        """
+        Share of failed calls in the rolling window.
+
+        Returns:
+            float: A value between 0 and 1, 0 without samples
+        """
+        if not self._samples:
+            return 0.0
+        return sum(1 for _, success in self._samples if not success) / len(self._samples)
+
+    def record(self, duration: float, success: bool) -> None:
+        """
+        Record the outcome of a call.
+
+        Args:
+            duration (float): Seconds the call took
+            success (bool): Whether the call succeeded
+        """
+        self._samples.append((duration, success))
+        llm_call_seconds.observe(
+            duration, backend=self.name, model=self.model_name, outcome="success" if success else "error"
+        )
+
+        if success:
+            self._consecutive_failures = 0
+            return
+
+        llm_call_errors.inc(backend=self.name, model=self.model_name)
+        self._consecutive_failures += 1
+        if self._consecutive_failures >= self.max_consecutive_failures:
+            self._cooldown_until = time.monotonic() + self.cooldown_seconds
+            logger.warning(
+                "LLM backend taken out of rotation",
+                backend=self.name,
+                consecutive_failures=self._consecutive_failures,
+                cooldown_seconds=self.cooldown_seconds,
+            )
+
+    def record_tokens(self, usage: TokenUsage) -> None:
+        """
+        Add the token usage reported for a call to the metrics.
+
+        Args:
+            usage (TokenUsage): The usage reported for the call
+        """
+        labels = {"backend": self.name, "model": self.model_name}
+        llm_tokens.inc(usage.prompt_tokens, type="prompt", **labels)
+        llm_tokens.inc(usage.cached_prompt_tokens, type="cached_prompt", **labels)
+        llm_tokens.inc(usage.completion_tokens, type="completion", **labels)
+
+    @asynccontextmanager
+    async def track(self, messages: Sequence[BaseMessage] = ()) -> AsyncIterator[LLMCall]:
+        """
+        Record the duration and outcome of the call made inside the context.
+
+        A cancelled call (client gone, deadline passed, hedge lost) says
+        nothing about the backend's health; only the time and the estimated
+        tokens it abandoned are recorded.
+
+        Args:
+            messages (Sequence[BaseMessage]): The prompt, to estimate abandoned tokens
+
+        Yields:
+            LLMCall: Collects streamed output, to estimate abandoned tokens
+        """
+        call = LLMCall(messages=messages)
+        started = time.perf_counter()
+        try:
+            yield call
+        except (asyncio.CancelledError, GeneratorExit):
+            # GeneratorExit: the consumer of a stream stopped iterating
+            self.record_abandoned(time.perf_counter() - started, call)
+            raise
+        except Exception:
+            self.record(time.perf_counter() - started, success=False)
+            raise
+        self.record(time.perf_counter() - started, success=True)
+
+    def record_abandoned(self, duration: float, call: LLMCall) -> None:
+        """
+        Record a call cancelled before it finished.
+
+        Args:
+            duration (float): Seconds the call ran before it was cancelled
+            call (LLMCall): The prompt and the output received
+        """
+        labels = {"backend": self.name, "model": self.model_name}
+        prompt_tokens = estimate_tokens("".join(str(message.content) for message in call.messages))
+        completion_tokens = estimate_tokens("".join(call.output))
+        llm_abandoned_calls.inc(**labels)
+        llm_abandoned_seconds.inc(duration, **labels)
+        llm_abandoned_tokens.inc(prompt_tokens, type="prompt", **labels)
+        llm_abandoned_tokens.inc(completion_tokens, type="completion", **labels)
+        logger.info(
+            "LLM call abandoned",
+            backend=self.name,
+            seconds=round(duration, 3),
+            estimated_prompt_tokens=prompt_tokens,
+            estimated_completion_tokens=completion_tokens,
+        )
+
+    def stats(self) -> LLMBackendStats:
+        """
+        Return a snapshot of the backend's rolling statistics.
+
+        Returns:
+            LLMBackendStats: The current backend statistics
+        """
+        return LLMBackendStats(
+            name=self.name,
+            healthy=self.healthy,
+            calls=len(self._samples),
+            error_rate=self.error_rate(),
+            latency_seconds_avg=self.latency(),
+            consecutive_failures=self._consecutive_failures,
+        )
+
+
+class ProviderRouter:
+    """
+    Routes chat model calls across several backends.
+
+    Policies:
+
+    - ``latency``: the healthy backend with the lowest rolling mean latency,
+      weighted by its error rate. A backend without a successful call is
+      assumed to be as fast as the median of the others, so one that only
+      failed ranks last; ``exploration_rate`` of the calls put a random other
+      backend first, so that every backend keeps being measured.
+    - ``weighted``: a random healthy backend, proportionally to its weight.
+    - ``sticky``: rendezvous hashing of a routing key over the healthy
+      backends, so the same persona/designer pair keeps hitting the same
+      backend (and its prompt cache) while the set of backends is stable.
+
+    Calls that fail before producing output are retried once on each other
+    backend, in preference order. When every backend is cooling down, all of
+    them are considered again rather than failing outright.
+
+    Args:
+        backends (Sequence[LLMBackend]): The backends, at least one
+        policy (str): One of ROUTING_POLICIES
+        default_latency_seconds (float): Latency assumed when no backend has a successful call
+        exploration_rate (float): Share of calls sent to a random other backend under the latency policy
+    """
+
+    def __init__(
+        self,
+        backends: Sequence[LLMBackend],
+        policy: str = "latency",
+        default_latency_seconds: float = 5.0,
+        exploration_rate: float = 0.0,
+    ):
+        if not backends:
+            raise ValueError("ProviderRouter needs at least one backend")
+        if policy not in ROUTING_POLICIES:
+            raise ValueError(f"Unknown routing policy {policy!r}, expected one of {', '.join(ROUTING_POLICIES)}")
+
+        self.backends = list(backends)
+        self.policy = policy
+        self.default_latency_seconds = default_latency_seconds
+        self.exploration_rate = exploration_rate
+
+    @classmethod
+    def from_settings(cls) -> "ProviderRouter":
+        """
+        Build the router described by the ``LLM_*`` settings.
+
+        Returns:
+            ProviderRouter: The configured router
+        """
+        return cls(
+            [
+                LLMBackend(
+                    name=backend.name,
+                    model=build_chat_model(backend),
+                    model_name=backend.model,
+                    weight=backend.weight,
+                    window=settings.LLM_ROUTING_WINDOW,
+                    max_consecutive_failures=settings.LLM_ROUTING_MAX_CONSECUTIVE_FAILURES,
+                    cooldown_seconds=settings.LLM_ROUTING_COOLDOWN_SECONDS,
+                    batcher=build_batcher(backend),
+                )
+                for backend in settings.LLM_BACKENDS
+            ],
+            policy=settings.LLM_ROUTING_POLICY,
+            default_latency_seconds=settings.LLM_ROUTING_DEFAULT_LATENCY_SECONDS,
+            exploration_rate=settings.LLM_ROUTING_EXPLORATION_RATE,
+        )
+
+    @property
+    def supports_multi_completion(self) -> bool:
+        """Whether any backend can return several completions from one call."""
+        return any(backend.supports_multi_completion for backend in self.backends)
+
+    def candidates(self, routing_key: str | None = None) -> list[LLMBackend]:
+        """
+        Order the backends by preference for a call.
+
+        Args:
+            routing_key (str | None): Key for the sticky policy, e.g. "persona:designer"
+
+        Returns:
+            list[LLMBackend]: Healthy backends first, in policy order
+        """
+        healthy = [backend for backend in self.backends if backend.healthy]
+        pool = healthy or list(self.backends)
+        rest = [backend for backend in self.backends if backend not in pool]
+
+        if self.policy == "sticky" and routing_key is not None:
+            ordered = sorted(pool, key=lambda backend: _rendezvous_score(routing_key, backend), reverse=True)
+        elif self.policy == "weighted":
+            ordered = _weighted_shuffle(pool)
+        else:
+            ordered = self._by_expected_latency(pool)
+
+        return ordered + rest
+
+    def _by_expected_latency(self, pool: list[LLMBackend]) -> list[LLMBackend]:
+        latencies = [latency for latency in (backend.latency() for backend in pool) if latency is not None]
+        prior = statistics.median(latencies) if latencies else self.default_latency_seconds
+        ordered = sorted(pool, key=lambda backend: _expected_latency(backend, prior))
+        if len(ordered) > 1 and random.random() < self.exploration_rate:
+            explored = random.choice(ordered[1:])
+            ordered.remove(explored)
+            ordered.insert(0, explored)
+        return ordered
+
+    async def ainvoke(
+        self, messages: list[BaseMessage], routing_key: str | None = None, attempt: int = 0
+    ) -> tuple[BaseMessage, LLMBackend]:
+        """
+        Invoke the preferred backend, failing over to the others on errors.
+
+        Args:
+            messages (list[BaseMessage]): The chat messages
+            routing_key (str | None): Key for the sticky policy
+            attempt (int): Parallel attempt number; attempt ``k`` starts at the
+                ``k``-th preferred backend, so a hedged call runs elsewhere
+
+        Returns:
+            tuple[BaseMessage, LLMBackend]: The model reply and the backend that produced it
+
+        Raises:
+            Exception: The last backend's error when every backend failed
+        """
+        candidates = self.candidates(routing_key)
+        shift = attempt % len(candidates)
+        candidates = candidates[shift:] + candidates[:shift]
+        for index, backend in enumerate(candidates):
+            try:
+                async with backend.track(messages):
+                    return await backend.ainvoke(messages), backend
+            except Exception as exc:
+                if index == len(candidates) - 1:
+                    raise
+                _log_failover(backend, exc)
+        raise AssertionError("unreachable")
+
+    async def astream(
+        self, messages: list[BaseMessage], routing_key: str | None = None, attempt: int = 0
+    ) -> AsyncIterator[tuple[BaseMessageChunk, LLMBackend]]:
+        """
+        Stream from the preferred backend, failing over only before the first chunk.
+
+        Once a chunk has been yielded the caller has already used it, so a
+        later failure is raised instead of restarting on another backend.
+
+        Args:
+            messages (list[BaseMessage]): The chat messages
+            routing_key (str | None): Key for the sticky policy
+            attempt (int): Parallel attempt number, as for ``ainvoke``
+
+        Yields:
+            tuple[BaseMessageChunk, LLMBackend]: Each chunk and the backend producing it
+        """
+        candidates = self.candidates(routing_key)
+        shift = attempt % len(candidates)
+        candidates = candidates[shift:] + candidates[:shift]
+        for index, backend in enumerate(candidates):
+            started = False
+            try:
+                async with backend.track(messages) as call:
+                    async for chunk in backend.model.astream(messages):
+                        started = True
+                        call.output.append(str(chunk.content))
+                        yield chunk, backend
+                return
+            except Exception as exc:
+                if started or index == len(candidates) - 1:
+                    raise
+                _log_failover(backend, exc)
+
+    async def agenerate(
+        self, messages: list[BaseMessage], n: int, routing_key: str | None = None
+    ) -> tuple[LLMResult, LLMBackend]:
+        """
+        Request ``n`` completions from one call on a backend supporting it.
+
+        Args:
+            messages (list[BaseMessage]): The chat messages
+            n (int): Number of completions
+            routing_key (str | None): Key for the sticky policy
+
+        Returns:
+            tuple[LLMResult, LLMBackend]: The completions and the backend that produced them
+
+        Raises:
+            ValueError: If no backend supports multiple completions
+            Exception: The last backend's error when every eligible backend failed
+        """
+        candidates = [backend for backend in self.candidates(routing_key) if backend.supports_multi_completion]
+        if not candidates:
+            raise ValueError("No backend supports multiple completions")
+
+        for index, backend in enumerate(candidates):
+            try:
+                async with backend.track(messages):
+                    return await backend.model.agenerate([messages], n=n), backend
+            except Exception as exc:
+                if index == len(candidates) - 1:
+                    raise
+                _log_failover(backend, exc)
+        raise AssertionError("unreachable")
+
+    def stats(self) -> list[LLMBackendStats]:
+        """
+        Return a snapshot of every backend's statistics.
+
+        Returns:
+            list[LLMBackendStats]: One entry per backend, in configuration order
+        """
+        return [backend.stats() for backend in self.backends]
+
+
+def build_chat_model(backend: LLMBackendSettings) -> BaseChatModel:
+    """
+    Instantiate the chat model for a configured backend.
+
+    Args:
+        backend (LLMBackendSettings): The backend configuration
+
+    Returns:
+        BaseChatModel: The LangChain chat model
+    """
+    if backend.provider == "fake":
+        return FakeChatModel(model=backend.model, **backend.options)
+
+    kwargs: dict[str, Any] = dict(backend.options)
+    if backend.base_url:
+        kwargs["base_url"] = backend.base_url
+    if backend.provider == "openai":
+        kwargs["api_key"] = settings.get_openai_api_key()
+        # Report token usage on the last chunk of streamed completions too
+        kwargs.setdefault("stream_usage", True)
+    return init_chat_model(backend.model, model_provider=backend.provider, **kwargs)
+
+
+def build_batcher(backend: LLMBackendSettings) -> MicroBatcher | None:
+    """
+    Instantiate the micro-batcher of a configured backend.
+
+    Ollama backends send each batch as concurrent requests, which the server
+    decodes together up to its OLLAMA_NUM_PARALLEL; other backends send it as
+    one multi-prompt request to the ``/completions`` endpoint of ``base_url``.
+
+    Args:
+        backend (LLMBackendSettings): The backend configuration
+
+    Returns:
+        MicroBatcher | None: The batcher, None when batching is disabled
+
+    Raises:
+        ValueError: If a backend other than Ollama enables batching without a ``base_url``
+    """
+    if backend.batch_max_size <= 1:
+        return None
+
+    client: BatchClient
+    if backend.provider == "ollama":
+        client = ConcurrentBatchClient(build_chat_model(backend))
+    elif not backend.base_url:
+        raise ValueError(f"LLM backend {backend.name!r} sets batch_max_size but has no base_url")
+    else:
+        client = CompletionsBatchClient(
+            base_url=backend.base_url,
+            model=backend.model,
+            api_key=settings.get_openai_api_key() if backend.provider == "openai" else "EMPTY",
+            prompt_format=backend.batch_prompt_format,
+            options=backend.options,
+        )
+    return MicroBatcher(backend.name, client, backend.batch_max_size, backend.batch_max_wait_seconds)
+
+
+def _expected_latency(backend: LLMBackend, prior: float) -> float:
+    latency = backend.latency()
+    if latency is None:
+        latency = prior
+    # A call failing with probability p costs a retry elsewhere on top of its latency
+    return latency / max(1.0 - backend.error_rate(), 0.05)
+
+
+def _rendezvous_score(routing_key: str, backend: LLMBackend) -> float:
+    digest = hashlib.blake2b(f"{routing_key}:{backend.name}".encode(), digest_size=8).digest()
+    # Weighted rendezvous hashing: -w / ln(u) with u uniform in (0, 1)
+    uniform = (int.from_bytes(digest, "big") + 1) / (2**64 + 1)
+    return -backend.weight / math.log(uniform)
+
+
+def _weighted_shuffle(backends: list[LLMBackend]) -> list[LLMBackend]:
+    # Efraimidis-Spirakis: sorting by u^(1/w) samples without replacement proportionally to weight
+    return sorted(backends, key=lambda backend: random.random() ** (1.0 / max(backend.weight, 1e-9)), reverse=True)
+
+
+def _log_failover(backend: LLMBackend, exc: Exception) -> None:
+    logger.warning(
+        "LLM backend call failed, failing over",
+        backend=backend.name,
+        exception_type=exc.__class__.__name__,
+        exception_detail=str(exc),
+    )
+
+
+provider_router = ProviderRouter.from_settings()
+"""Process-wide router over the configured chat model backends"""
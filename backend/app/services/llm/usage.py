@@ -0,0 +1,111 @@
+from collections.abc import Mapping
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from app.types.generative import TokenUsage
+
+
+@dataclass
+class TokenUsageStats:
+    """Process-wide token counters, as reported by the providers."""
+
+    calls: int = 0
+    """Model calls that reported usage"""
+
+    prompt_tokens: int = 0
+    """Input tokens billed"""
+
+    cached_prompt_tokens: int = 0
+    """Input tokens served from the provider's prompt prefix cache"""
+
+    completion_tokens: int = 0
+    """Output tokens billed"""
+
+    def record(self, usage: TokenUsage) -> None:
+        """
+        Add the usage of one model call.
+
+        Args:
+            usage (TokenUsage): The usage reported for the call
+        """
+        self.calls += 1
+        self.prompt_tokens += usage.prompt_tokens
+        self.cached_prompt_tokens += usage.cached_prompt_tokens
+        self.completion_tokens += usage.completion_tokens
+
+    def merge(self, other: "TokenUsageStats") -> None:
+        """
+        Add the counters of several model calls, e.g. a generation shared with other requests.
+
+        Args:
+            other (TokenUsageStats): The counters to add
+        """
+        self.calls += other.calls
+        self.prompt_tokens += other.prompt_tokens
+        self.cached_prompt_tokens += other.cached_prompt_tokens
+        self.completion_tokens += other.completion_tokens
+
+
+token_usage_stats = TokenUsageStats()
+"""Token counters shared by every model call in the process"""
+
+metered_usage: ContextVar[TokenUsageStats | None] = ContextVar("metered_usage", default=None)
+"""Token counters of the request being metered, set by GenerationQuota.metered"""
+
+
+def token_usage(usage_metadata: Mapping[str, Any] | None) -> TokenUsage | None:
+    """
+    Convert LangChain ``usage_metadata`` into a TokenUsage.
+
+    Args:
+        usage_metadata: The ``usage_metadata`` of an AIMessage or of the sum
+            of a stream's chunks, None when the provider reported nothing
+
+    Returns:
+        TokenUsage | None: The usage, or None when it was not reported
+    """
+    if not usage_metadata:
+        return None
+
+    details = usage_metadata.get("input_token_details") or {}
+    return TokenUsage(
+        prompt_tokens=usage_metadata.get("input_tokens", 0),
+        cached_prompt_tokens=details.get("cache_read", 0) or 0,
+        completion_tokens=usage_metadata.get("output_tokens", 0),
+    )
+
+
+def combine_usage(*usages: TokenUsage | None) -> TokenUsage | None:
+    """
+    Add up the usage of several model calls serving one response.
+
+    Args:
+        *usages: The usage of each call, None where it was not reported
+
+    Returns:
+        TokenUsage | None: The total, or None when no call reported usage
+    """
+    reported = [usage for usage in usages if usage is not None]
+    if not reported:
+        return None
+    return TokenUsage(
+        prompt_tokens=sum(usage.prompt_tokens for usage in reported),
+        cached_prompt_tokens=sum(usage.cached_prompt_tokens for usage in reported),
+        completion_tokens=sum(usage.completion_tokens for usage in reported),
+    )
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the token count of text, at about four characters per token.
+
+    Used where the provider reports nothing, e.g. for calls abandoned midway.
+
+    Args:
+        text (str): The text
+
+    Returns:
+        int: The estimated number of tokens
+    """
+    return len(text) // 4
@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from pydantic import Field
+
+from app.types.base import BaseAPISchema
+
+
+class CatalogEntryOptional(BaseAPISchema):
+    name: str | None = Field(default=None, min_length=1, max_length=100)
+    """Display name, e.g. "HR Manager" """
+    prompt: str | None = Field(default=None, min_length=1, max_length=8000)
+    """Text inserted into the generation prompt"""
+
+
+class CatalogEntryBase(CatalogEntryOptional):
+    name: str = Field(min_length=1, max_length=100)
+    prompt: str = Field(min_length=1, max_length=8000)
+
+
+class CatalogEntryCreate(CatalogEntryBase):
+    pass
+
+
+class CatalogEntryUpdate(CatalogEntryOptional):
+    pass
+
+
+class CatalogEntryDetail(CatalogEntryBase):
+    id: int
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+
+
+class CatalogVersionBase(BaseAPISchema):
+    name: str
+    """The catalog, e.g. "personas" """
+    version: int = 0
+    """Bumped by every write to the catalog"""
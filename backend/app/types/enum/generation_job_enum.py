@@ -0,0 +1,7 @@
+from enum import Enum
+
+class GenerationJobStatusEnum(str, Enum):
+    pending = "pending"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
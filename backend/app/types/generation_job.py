@@ -0,0 +1,28 @@
+from datetime import datetime
+from typing import Any
+
+from pydantic import Field
+
+from app.types.base import BaseAPISchema
+from app.types.enum.generation_job_enum import GenerationJobStatusEnum
+from app.types.generative import GenerativeCreate, GenerativeDetail
+
+class GenerationJobCreate(BaseAPISchema):
+    request: dict[str, Any]
+    """The GenerativeCreate to run, as stored in the queue"""
+    principal: str
+    """Who the job's token usage is charged to"""
+
+class GenerationJobDetail(BaseAPISchema):
+    id: int
+    status: GenerationJobStatusEnum
+    request: GenerativeCreate
+    attempts: int = 0
+    """Times a worker claimed the job"""
+    result: GenerativeDetail | None = None
+    """The generated component, once the job succeeded"""
+    error: str | None = None
+    """Why the last attempt failed"""
+    principal: str = Field(default="", exclude=True)
+    created_at: datetime | None = None
+    finished_at: datetime | None = None
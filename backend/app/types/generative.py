@@ -1,9 +1,28 @@
+from typing import Literal
+
+from pydantic import Field
+
+from app.config import settings
 from app.types.base import BaseAPISchema
 
 class GenerativeCreate(BaseAPISchema):
     user_prefferences: str = ""
     persona_id: int = 1
     designer_id: int = 1
+    fresh: bool = Field(default=False, exclude=True)
+    """Never reuse a component served to another request (semantic cache, request coalescing)"""
+    seed: int | None = Field(default=None, ge=0)
+    """Seed selecting the prompt variant; returned by every generation so it can be replayed"""
+    variant_id: int | None = Field(default=None, ge=0)
+    """Explicit prompt variant id, takes precedence over the seed"""
+
+class TokenUsage(BaseAPISchema):
+    prompt_tokens: int = 0
+    """Input tokens of the model call"""
+    cached_prompt_tokens: int = 0
+    """Input tokens served from the provider's prompt prefix cache"""
+    completion_tokens: int = 0
+    """Output tokens of the model call"""
 
 class GenerativeDetail(GenerativeCreate):
     user_prefferences: str
@@ -11,4 +30,72 @@ class GenerativeDetail(GenerativeCreate):
     persona_id: int = 1
     designer_id: int = 1
     generated_prompt: str = ""  # New field to store the generated prompt
+    id: int | None = None
+    """Id of the stored component, fetchable from ``GET /generative/{id}``"""
+    usage: TokenUsage | None = None
+    """Tokens spent generating this response, None when it was served without a model call.
+    Variants from one multi-completion call all report that call's usage."""
+
+class GenerativeBatchCreate(GenerativeCreate):
+    count: int = Field(default=3, ge=1, le=settings.GENERATIVE_BATCH_MAX_COUNT)
+    """Number of distinct variants to generate"""
+
+class GenerativeBatchDetail(BaseAPISchema):
+    items: list[GenerativeDetail]
+
+class GenerativeStreamChunk(BaseAPISchema):
+    delta: str
+    """Text produced by the model since the previous chunk"""
+
+class GenerativeSessionMessage(BaseAPISchema):
+    type: Literal["generate", "regenerate"]
+    """generate starts over with ``request``, regenerate asks for another variant of the last request"""
+    request: GenerativeCreate | None = None
+
+class GenerativeSessionEvent(BaseAPISchema):
+    type: Literal["component", "error"]
+    component: GenerativeDetail | None = None
+    prefetched: bool = False
+    """Whether the component was generated ahead of the request"""
+    message: str | None = None
+    """What went wrong, for error events"""
+    retry_after_seconds: float | None = None
+    """Set when the request was rejected by the rate limiter"""
+
+class StoredComponentBase(BaseAPISchema):
+    persona_id: int
+    designer_id: int
+    user_prefferences: str = ""
+    raw_component: str
+    generated_prompt: str = ""
+    variant_id: int | None = None
+    seed: int | None = None
+
+class GenerationCacheEntryBase(StoredComponentBase):
+    pass
+
+class GenerationCacheEntryCreate(GenerationCacheEntryBase):
+    embedding: list[float]
+
+class GenerationCacheEntryDetail(GenerationCacheEntryBase):
+    id: int
+
+class GeneratedComponentBase(StoredComponentBase):
+    pass
+
+class GeneratedComponentCreate(GeneratedComponentBase):
+    content_hash: str
+    """SHA-256 of the component code, identical components share one row"""
+
+class GeneratedComponentDetail(GeneratedComponentCreate):
+    id: int
+
+class SimilarComponentDetail(GeneratedComponentDetail):
+    similarity: float
+    """Cosine similarity to the query, 1.0 for an identical embedding"""
 
+class GenerativeFeedbackCreate(BaseAPISchema):
+    compiled: bool
+    """Whether the component rendered in react-live"""
+    error: str | None = Field(default=None, max_length=2000)
+    """The react-live error, when it did not"""
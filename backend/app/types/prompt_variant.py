@@ -0,0 +1,50 @@
+from app.types.base import BaseAPISchema
+
+
+class PromptVariantStatsBase(BaseAPISchema):
+    variant_id: int
+    """The prompt variant the outcomes belong to"""
+    attempts: int = 0
+    """Completions generated from the variant"""
+    valid: int = 0
+    """Completions that passed validation, possibly after repairs"""
+    invalid: int = 0
+    """Completions that failed validation"""
+    aborted: int = 0
+    """Completions abandoned mid-stream for breaking the output contract"""
+    compiled: int = 0
+    """Components reported as rendering in react-live"""
+    compile_failed: int = 0
+    """Components reported as failing in react-live"""
+    reward: float = 0.0
+    """Sum of the bandit rewards of the attempts"""
+    llm_seconds: float = 0.0
+    """Total model time of the valid completions"""
+
+class PromptVariantStatsDetail(PromptVariantStatsBase):
+    id: int
+
+class PromptOptionStats(BaseAPISchema):
+    index: int
+    """Option index within the dimension"""
+    label: str
+    """Start of the option text"""
+    attempts: int
+    valid: int
+    compile_failed: int
+    mean_llm_seconds: float | None
+    """Average model time of the valid completions"""
+    expected_reward: float
+    """Posterior mean of the option's reward, what the bandit currently believes"""
+
+class PromptDimensionStats(BaseAPISchema):
+    name: str
+    options: list[PromptOptionStats]
+
+class PromptBanditReport(BaseAPISchema):
+    enabled: bool
+    """Whether variants are currently selected by the bandit rather than uniformly"""
+    dimensions: list[PromptDimensionStats]
+    """Aggregated outcomes and beliefs per option of every prompt dimension"""
+    variants: list[PromptVariantStatsDetail]
+    """Per-variant outcomes, most attempted first"""
@@ -0,0 +1,11 @@
+from app.types.base import BaseAPISchema
+
+
+class RateLimitBucketBase(BaseAPISchema):
+    key: str
+    """Principal and limit the bucket belongs to, e.g. user:alice@example.com:tokens"""
+    level: float
+    """Tokens left at the last refill, negative while usage is being paid back"""
+
+class RateLimitBucketDetail(RateLimitBucketBase):
+    id: int
@@ -0,0 +1,111 @@
+import asyncio
+import contextlib
+import time
+from collections.abc import AsyncIterator, Awaitable
+from typing import TypeVar
+
+import structlog
+from starlette.requests import Request
+
+from app.errors import RequestCancelledError
+from app.utils.metrics import metrics
+
+logger = structlog.stdlib.get_logger(__name__)
+
+T = TypeVar("T")
+
+request_cancellations = metrics.counter(
+    "http_request_cancellations_total", "Requests whose work was cancelled before it finished, by reason", ("reason",)
+)
+
+
+class CancellationScope:
+    """
+    Ties a request's work to the client connection and an optional deadline.
+
+    The work is aborted through asyncio cancellation, which reaches the
+    awaited model call and closes its HTTP connection to the provider, so an
+    abandoned request stops consuming tokens and capacity.
+
+    Args:
+        request (Request): The request whose client is watched
+        timeout_seconds (float | None): Time budget from now, None for no deadline
+    """
+
+    def __init__(self, request: Request, timeout_seconds: float | None = None):
+        self.request = request
+        self.deadline = time.monotonic() + timeout_seconds if timeout_seconds is not None else None
+
+    def remaining(self) -> float | None:
+        """
+        Seconds left before the deadline.
+
+        Returns:
+            float | None: Seconds, at least 0, or None without a deadline
+        """
+        return max(self.deadline - time.monotonic(), 0.0) if self.deadline is not None else None
+
+    async def run(self, work: Awaitable[T]) -> T:
+        """
+        Await ``work`` unless the client disconnects or the deadline passes first.
+
+        Args:
+            work (Awaitable[T]): The request's work, e.g. a generation
+
+        Returns:
+            T: The result of the work
+
+        Raises:
+            RequestCancelledError: When the work was cancelled
+        """
+        task = asyncio.ensure_future(work)
+        watcher = asyncio.ensure_future(self._wait_for_disconnect())
+        try:
+            done, _ = await asyncio.wait({task, watcher}, timeout=self.remaining(), return_when=asyncio.FIRST_COMPLETED)
+            if task in done:
+                return task.result()
+
+            reason = "client_disconnect" if watcher in done else "deadline"
+            task.cancel()
+            # Let the cancelled work record what it abandoned before answering
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+            self._cancelled(reason)
+        finally:
+            watcher.cancel()
+            task.cancel()
+
+    async def iterate(self, items: AsyncIterator[T]) -> AsyncIterator[T]:
+        """
+        Iterate ``items`` until the deadline, aborting the pending step when it passes.
+
+        Client disconnects are not watched here: streaming responses already
+        cancel their body iterator when the client goes away.
+
+        Args:
+            items (AsyncIterator[T]): E.g. a generation stream
+
+        Yields:
+            T: The items produced before the deadline
+
+        Raises:
+            RequestCancelledError: When the deadline passed
+        """
+        while True:
+            try:
+                item = await asyncio.wait_for(items.__anext__(), timeout=self.remaining())
+            except StopAsyncIteration:
+                return
+            except asyncio.TimeoutError:
+                self._cancelled("deadline")
+            yield item
+
+    def _cancelled(self, reason: str) -> None:
+        request_cancellations.inc(reason=reason)
+        logger.info("Request cancelled", reason=reason, path=self.request.url.path)
+        raise RequestCancelledError(reason)
+
+    async def _wait_for_disconnect(self) -> None:
+        # The body has been read already, so the next message is the disconnect
+        while (await self.request.receive())["type"] != "http.disconnect":
+            pass
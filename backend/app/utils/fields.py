@@ -0,0 +1,92 @@
+from collections.abc import Sequence
+from typing import Any
+
+from fastapi import HTTPException, status
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+class FieldSelection:
+    """
+    Sparse fieldset requested with ``?fields=``, e.g. ``?fields=rawComponent,personaId``.
+
+    Without a selection, responses are returned unchanged and serialized by
+    FastAPI as usual; with one, only the selected fields are serialized.
+
+    Args:
+        names (set[str] | None): Selected attribute names, None for every field
+    """
+
+    def __init__(self, names: set[str] | None = None):
+        self.names = names
+
+    @classmethod
+    def parse(cls, fields: str | None, schema: type[BaseModel]) -> "FieldSelection":
+        """
+        Parse a comma-separated list of field names for a schema.
+
+        Both the camelCase aliases used in the API and the attribute names are
+        accepted. Fields excluded from serialization cannot be selected.
+
+        Args:
+            fields (str | None): The ``fields`` query parameter
+            schema (type[BaseModel]): The response schema the fields belong to
+
+        Returns:
+            FieldSelection: The selection, empty when ``fields`` is missing or blank
+
+        Raises:
+            HTTPException: 422 when a field does not exist in the schema
+        """
+        requested = [name.strip() for name in (fields or "").split(",") if name.strip()]
+        if not requested:
+            return cls()
+
+        selectable = {}
+        for name, info in schema.model_fields.items():
+            if info.exclude:
+                continue
+            selectable[name] = name
+            if info.alias:
+                selectable[info.alias] = name
+
+        unknown = [name for name in requested if name not in selectable]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(sorted(selectable))}",
+            )
+        return cls({selectable[name] for name in requested})
+
+    def dump(self, content: BaseModel | Sequence[BaseModel]) -> Any:
+        """
+        Serialize the selected fields of a model, or of every model in a list.
+
+        Args:
+            content (BaseModel | Sequence[BaseModel]): The response content
+
+        Returns:
+            Any: JSON-compatible data using the API aliases
+        """
+        if isinstance(content, BaseModel):
+            return content.model_dump(mode="json", by_alias=True, include=self.names)
+        return [self.dump(item) for item in content]
+
+    def respond(
+        self, content: Any, status_code: int = status.HTTP_200_OK, headers: dict[str, str] | None = None
+    ) -> Any:
+        """
+        Build the response for a route.
+
+        Args:
+            content: The model, or list of models, the route would return
+            status_code (int): Status code of the route
+            headers (dict[str, str] | None): Extra headers, needed because a returned
+                response bypasses the headers set on the injected Response
+
+        Returns:
+            Any: ``content`` itself without a selection, otherwise a JSONResponse
+        """
+        if self.names is None:
+            return content
+        return JSONResponse(self.dump(content), status_code=status_code, headers=headers)
@@ -0,0 +1,280 @@
+import bisect
+import math
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass, field
+from typing import TypeVar
+
+LabelValues = tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+"""Latency buckets in seconds, from sub-millisecond database calls to slow LLM completions"""
+
+
+@dataclass
+class MetricFamily:
+    """A metric and its samples, ready to be rendered."""
+
+    name: str
+    """Metric name"""
+
+    type: str
+    """Prometheus metric type: counter, gauge or histogram"""
+
+    help: str
+    """Human readable description"""
+
+    samples: list[tuple[str, dict[str, str], float]] = field(default_factory=list)
+    """(sample name suffix, labels, value) triples"""
+
+
+class _Metric(ABC):
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: LabelValues) -> dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    @abstractmethod
+    def collect(self) -> MetricFamily:
+        """Return the metric and its current samples."""
+
+
+class Counter(_Metric):
+    """
+    A monotonically increasing value per label combination.
+
+    Args:
+        name (str): Metric name, conventionally ending in ``_total``
+        help (str): Human readable description
+        labelnames (Sequence[str]): Names of the labels every sample carries
+    """
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """
+        Increase the counter.
+
+        Args:
+            amount (float): Non-negative increment
+            **labels: A value for every label name
+        """
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def collect(self) -> MetricFamily:
+        return MetricFamily(
+            self.name, self.type, self.help, [("", self._labels(key), value) for key, value in self._values.items()]
+        )
+
+
+class Histogram(_Metric):
+    """
+    Observations counted into cumulative buckets per label combination.
+
+    Args:
+        name (str): Metric name
+        help (str): Human readable description
+        labelnames (Sequence[str]): Names of the labels every sample carries
+        buckets (Sequence[float]): Upper bounds of the buckets, ascending
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._counts: dict[LabelValues, list[int]] = {}
+        self._sums: dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """
+        Record an observation.
+
+        Args:
+            value (float): The observed value, e.g. seconds
+            **labels: A value for every label name
+        """
+        key = self._key(labels)
+        counts = self._counts.setdefault(key, [0] * (len(self.buckets) + 1))
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self._sums[key] = self._sums.get(key, 0.0) + value
+
+    def collect(self) -> MetricFamily:
+        family = MetricFamily(self.name, self.type, self.help)
+        for key, counts in self._counts.items():
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                family.samples.append(("_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            family.samples.append(("_sum", labels, self._sums[key]))
+            family.samples.append(("_count", labels, cumulative))
+        return family
+
+
+_MetricT = TypeVar("_MetricT", bound=_Metric)
+
+Collector = Callable[[], Iterable[MetricFamily]]
+"""Callable producing metric families at scrape time, e.g. from a stats() snapshot"""
+
+
+class MetricsRegistry:
+    """
+    A minimal Prometheus-compatible metrics registry.
+
+    Holds counters and histograms updated on the hot paths, plus collectors
+    that turn existing ``stats()`` snapshots into metrics when scraped, and
+    renders everything in the Prometheus text exposition format.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[Collector] = []
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        """
+        Create and register a counter.
+
+        Args:
+            name (str): Metric name
+            help (str): Human readable description
+            labelnames (Sequence[str]): Label names
+
+        Returns:
+            Counter: The registered counter
+        """
+        return self._register(Counter(name, help, labelnames))
+
+    def histogram(
+        self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """
+        Create and register a histogram.
+
+        Args:
+            name (str): Metric name
+            help (str): Human readable description
+            labelnames (Sequence[str]): Label names
+            buckets (Sequence[float]): Bucket upper bounds
+
+        Returns:
+            Histogram: The registered histogram
+        """
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def register_collector(self, collector: Collector) -> None:
+        """
+        Register a callable producing metric families at scrape time.
+
+        Args:
+            collector (Collector): The collector
+        """
+        self._collectors.append(collector)
+
+    def _register(self, metric: _MetricT) -> _MetricT:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def collect(self) -> list[MetricFamily]:
+        """
+        Snapshot every registered metric and collector.
+
+        Returns:
+            list[MetricFamily]: The metric families
+        """
+        families = [metric.collect() for metric in self._metrics.values()]
+        for collector in self._collectors:
+            families.extend(collector())
+        return families
+
+    def render(self) -> str:
+        """
+        Render the registry in the Prometheus text exposition format (0.0.4).
+
+        Returns:
+            str: The exposition text
+        """
+        lines: list[str] = []
+        for family in self.collect():
+            lines.append(f"# HELP {family.name} {_escape_help(family.help)}")
+            lines.append(f"# TYPE {family.name} {family.type}")
+            for suffix, labels, value in family.samples:
+                lines.append(f"{family.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def gauge_family(name: str, help: str, samples: Iterable[tuple[dict[str, str], float]]) -> MetricFamily:
+    """
+    Build a gauge family for a collector.
+
+    Args:
+        name (str): Metric name
+        help (str): Human readable description
+        samples: (labels, value) pairs
+
+    Returns:
+        MetricFamily: The gauge family
+    """
+    return MetricFamily(name, "gauge", help, [("", labels, value) for labels, value in samples])
+
+
+def counter_family(name: str, help: str, samples: Iterable[tuple[dict[str, str], float]]) -> MetricFamily:
+    """
+    Build a counter family for a collector, from counters kept elsewhere.
+
+    Args:
+        name (str): Metric name, conventionally ending in ``_total``
+        help (str): Human readable description
+        samples: (labels, value) pairs
+
+    Returns:
+        MetricFamily: The counter family
+    """
+    return MetricFamily(name, "counter", help, [("", labels, value) for labels, value in samples])
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+metrics = MetricsRegistry()
+"""Process-wide metrics registry, served by ``GET /metrics``"""
@@ -0,0 +1,89 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class SingleFlightStats:
+    """Point-in-time counters of a SingleFlight group."""
+
+    leaders: int
+    """Calls that started a new upstream operation"""
+
+    followers: int
+    """Calls that joined an operation already in flight"""
+
+    in_flight: int
+    """Operations currently running"""
+
+
+class _Call(Generic[T]):
+    def __init__(self, task: "asyncio.Task[T]"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight(Generic[T]):
+    """
+    Coalesces concurrent calls that share a key into a single operation.
+
+    The first caller for a key starts the operation in its own task; callers
+    arriving while it runs await the same task and receive the same result or
+    exception. A cancelled caller only stops waiting, the operation itself is
+    cancelled once no caller is left waiting for it.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, _Call[T]] = {}
+        self._leaders = 0
+        self._followers = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> tuple[T, bool]:
+        """
+        Run ``fn`` for ``key`` unless an identical call is already in flight.
+
+        Args:
+            key (Hashable): Identity of the operation
+            fn (Callable[[], Awaitable[T]]): Starts the operation when no call is in flight
+
+        Returns:
+            tuple[T, bool]: The operation result and whether this caller started it
+        """
+        call = self._calls.get(key)
+        leader = call is None
+
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            self._leaders += 1
+        else:
+            self._followers += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task), leader
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+
+    def stats(self) -> SingleFlightStats:
+        """
+        Return a snapshot of the group's counters.
+
+        Returns:
+            SingleFlightStats: The current statistics
+        """
+        return SingleFlightStats(
+            leaders=self._leaders,
+            followers=self._followers,
+            in_flight=len(self._calls),
+        )
+
+    def _forget(self, key: Hashable, call: _Call[T]) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
@@ -0,0 +1,19 @@
+def format_sse(data: str, event: str | None = None) -> str:
+    """
+    Format a payload as a single Server-Sent Events message.
+
+    Args:
+        data (str): The message payload; multi-line payloads are split into
+            several ``data:`` fields as required by the SSE specification
+        event (str | None): Optional event name for the message
+
+    Returns:
+        str: The encoded message, terminated by a blank line
+
+    Examples:
+        >>> format_sse('{"delta": "<div>"}', event="token")
+        'event: token\\ndata: {"delta": "<div>"}\\n\\n'
+    """
+    lines = [f"event: {event}"] if event else []
+    lines.extend(f"data: {line}" for line in data.splitlines() or [""])
+    return "\n".join(lines) + "\n\n"
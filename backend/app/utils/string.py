@@ -89,3 +89,22 @@ def index_to_letters(index: int) -> str:
         letters = chr(65 + (index % 26)) + letters
         index = index // 26 - 1
     return letters
+
+
+def normalize_whitespace(string: str) -> str:
+    """
+    Collapse runs of whitespace, trim and lower-case a free-text value.
+
+    Args:
+        string (str): The text to normalize
+            Examples: "  Dark   theme ", "Dark\\nTheme"
+
+    Returns:
+        str: The normalized text
+            Examples: "dark theme", "dark theme"
+
+    Examples:
+        >>> normalize_whitespace("  Dark   Theme ")
+        'dark theme'
+    """
+    return re.sub(r"\s+", " ", string).strip().lower()
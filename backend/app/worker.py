@@ -0,0 +1,89 @@
+"""
+Worker process for asynchronous generation jobs.
+
+Claims jobs queued by ``POST /generative/jobs`` and runs them, with
+GENERATION_JOB_WORKER_CONCURRENCY jobs in flight per process. Start as many
+processes as the LLM capacity allows, independently of the API workers::
+
+    python -m app.worker
+
+SIGINT/SIGTERM stop claiming new jobs; jobs in flight are finished first.
+"""
+
+import asyncio
+import signal
+
+import structlog
+
+from app.config import settings
+from app.database import sessionmanager
+from app.models.history_meta import versioned_session
+from app.services.core.generation_jobs import GenerationJobService
+from app.services.core.prompt_bandit import prompt_bandit
+
+logger = structlog.stdlib.get_logger(__name__)
+
+
+async def process_next_job() -> bool:
+    """
+    Claim one job and run it.
+
+    The claim is committed on its own so that the job is marked as running
+    for other workers before the (long) generation starts.
+
+    Returns:
+        bool: Whether a job was found
+    """
+    async with sessionmanager.session() as session:
+        job = await GenerationJobService(session).claim()
+        await session.commit()
+    if job is None:
+        return False
+
+    async with sessionmanager.session() as session:
+        versioned_session(session.sync_session)  # type: ignore
+        await GenerationJobService(session).run(job)
+        await session.commit()
+    return True
+
+
+async def work(stop: asyncio.Event) -> None:
+    """
+    Process jobs until ``stop`` is set, polling the queue while it is empty.
+
+    Args:
+        stop (asyncio.Event): Set to shut the worker down
+    """
+    while not stop.is_set():
+        try:
+            found = await process_next_job()
+        except Exception as exc:
+            # e.g. the database is unreachable; back off and keep the worker alive
+            logger.error(
+                "Generation job processing failed",
+                exception_type=exc.__class__.__name__,
+                exception_detail=str(exc),
+            )
+            found = False
+        if not found:
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=settings.GENERATION_JOB_POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+
+async def main() -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    logger.info("Generation worker started", concurrency=settings.GENERATION_JOB_WORKER_CONCURRENCY)
+    await asyncio.gather(*(work(stop) for _ in range(settings.GENERATION_JOB_WORKER_CONCURRENCY)))
+    await prompt_bandit.flush()
+    await sessionmanager.close()
+    logger.info("Generation worker stopped")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
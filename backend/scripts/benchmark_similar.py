@@ -0,0 +1,241 @@
+"""
+Recall/latency benchmark for the vector index behind ``GET /generative/similar``.
+
+Loads ``--rows`` synthetic, clustered vectors of EMBEDDING_DIMENSIONS into a
+scratch table, builds an HNSW (or IVFFlat) index with the same operator class
+as ``generated_components.embedding``, and runs ``--queries`` top-k queries
+for every value of the search parameter (``hnsw.ef_search`` or
+``ivfflat.probes``). Recall is measured against an exact scan of the table::
+
+    python -m scripts.benchmark_similar --rows 1000000 --ef-search 10 20 40 80 160
+
+The table is kept between runs with the same ``--rows`` and ``--index``, so
+loading and index builds are paid once; ``--drop`` removes it. The vectors
+are generated server-side, the script only needs a database connection.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from dataclasses import asdict, dataclass
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from app.config import settings
+
+TABLE = "benchmark_similar_vectors"
+INSERT_CHUNK_ROWS = 50_000
+
+
+@dataclass
+class BenchmarkResult:
+    """Recall and latency of the index for one search parameter value."""
+
+    parameter: str
+    value: int
+    recall: float
+    latency_p50_ms: float
+    latency_p95_ms: float
+    latency_p99_ms: float
+    queries_per_second: float
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of non-empty samples."""
+    ordered = sorted(samples)
+    return ordered[min(max(math.ceil(fraction * len(ordered)) - 1, 0), len(ordered) - 1)]
+
+
+async def table_matches(connection: AsyncConnection, rows: int, index: str) -> bool:
+    """Whether the scratch table exists with ``rows`` rows and an index of this type."""
+    exists = await connection.scalar(text("SELECT to_regclass(:table) IS NOT NULL"), {"table": TABLE})
+    if not exists:
+        return False
+    count = await connection.scalar(text(f"SELECT count(*) FROM {TABLE}"))
+    method = await connection.scalar(
+        text(
+            "SELECT am.amname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "JOIN pg_am am ON am.oid = c.relam "
+            "WHERE i.indrelid = to_regclass(:table) AND am.amname IN ('hnsw', 'ivfflat')"
+        ),
+        {"table": TABLE},
+    )
+    return count == rows and method == index
+
+
+async def load(connection: AsyncConnection, args: argparse.Namespace) -> None:
+    """Create the scratch table, fill it with clustered vectors and build the index."""
+    dimensions = settings.EMBEDDING_DIMENSIONS
+    await connection.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+    await connection.execute(text(f"CREATE TABLE {TABLE} (id bigserial PRIMARY KEY, embedding vector({dimensions}))"))
+
+    # Real embeddings are clustered (similar prompts, similar components); uniformly
+    # random vectors are all nearly equidistant and would understate recall
+    await connection.execute(
+        text(
+            "CREATE TEMP TABLE benchmark_centers AS "
+            "SELECT c AS id, array_agg(random() - 0.5 ORDER BY d) AS center "
+            "FROM generate_series(0, :clusters - 1) c, generate_series(1, :dimensions) d GROUP BY c"
+        ),
+        {"clusters": args.clusters, "dimensions": dimensions},
+    )
+    started = time.perf_counter()
+    for first in range(0, args.rows, INSERT_CHUNK_ROWS):
+        await connection.execute(
+            text(
+                f"INSERT INTO {TABLE} (embedding) "
+                "SELECT (SELECT array_agg(x + (random() - 0.5) * :noise ORDER BY o) "
+                "FROM unnest(center) WITH ORDINALITY AS t(x, o))::vector "
+                "FROM generate_series(:first, :last) n JOIN benchmark_centers ON id = n % :clusters"
+            ),
+            {
+                "noise": args.noise,
+                "first": first,
+                "last": min(first + INSERT_CHUNK_ROWS, args.rows) - 1,
+                "clusters": args.clusters,
+            },
+        )
+        await connection.commit()
+        print(f"loaded {min(first + INSERT_CHUNK_ROWS, args.rows)}/{args.rows} rows", flush=True)
+    print(f"load took {time.perf_counter() - started:.1f}s", flush=True)
+
+    # Building after the load is much faster than maintaining the index row by row
+    started = time.perf_counter()
+    await connection.execute(text(f"SET maintenance_work_mem = '{args.maintenance_work_mem}'"))
+    if args.index == "hnsw":
+        options = f"m = {args.m}, ef_construction = {args.ef_construction}"
+    else:
+        options = f"lists = {args.lists or max(args.rows // 1000, 10)}"
+    await connection.execute(
+        text(f"CREATE INDEX ON {TABLE} USING {args.index} (embedding vector_cosine_ops) WITH ({options})")
+    )
+    await connection.execute(text(f"ANALYZE {TABLE}"))
+    await connection.commit()
+    print(f"{args.index} index build ({options}) took {time.perf_counter() - started:.1f}s", flush=True)
+
+
+async def query_vectors(connection: AsyncConnection, count: int, noise: float) -> list[str]:
+    """Perturbed copies of random stored vectors, as pgvector text literals."""
+    result = await connection.execute(
+        text(f"SELECT embedding::text FROM {TABLE} ORDER BY random() LIMIT :count"), {"count": count}
+    )
+    queries = []
+    for (literal,) in result:
+        values = [float(value) + random.uniform(-noise, noise) for value in literal.strip("[]").split(",")]
+        queries.append("[" + ",".join(f"{value:.6f}" for value in values) + "]")
+    return queries
+
+
+async def top_k(connection: AsyncConnection, query: str, k: int) -> list[int]:
+    result = await connection.execute(
+        text(f"SELECT id FROM {TABLE} ORDER BY embedding <=> CAST(:query AS vector) LIMIT :k"),
+        {"query": query, "k": k},
+    )
+    return [row.id for row in result]
+
+
+async def exact_top_k(connection: AsyncConnection, queries: list[str], k: int) -> list[set[int]]:
+    """Ground truth from a sequential scan, with index scans disabled."""
+    truth = []
+    async with connection.begin():
+        await connection.execute(text("SET LOCAL enable_indexscan = off"))
+        for query in queries:
+            truth.append(set(await top_k(connection, query, k)))
+    return truth
+
+
+async def measure(
+    connection: AsyncConnection, parameter: str, value: int, queries: list[str], truth: list[set[int]], k: int
+) -> BenchmarkResult:
+    latencies = []
+    found = 0
+    async with connection.begin():
+        await connection.execute(text(f"SET LOCAL {parameter} = {int(value)}"))
+        # Warm up the index pages so the first values are not penalised by disk reads
+        for query in queries[: min(10, len(queries))]:
+            await top_k(connection, query, k)
+        started = time.perf_counter()
+        for query, expected in zip(queries, truth):
+            query_started = time.perf_counter()
+            ids = await top_k(connection, query, k)
+            latencies.append(time.perf_counter() - query_started)
+            found += len(expected.intersection(ids))
+        elapsed = time.perf_counter() - started
+
+    return BenchmarkResult(
+        parameter=parameter,
+        value=value,
+        recall=round(found / (k * len(queries)), 4),
+        latency_p50_ms=round(percentile(latencies, 0.5) * 1000, 2),
+        latency_p95_ms=round(percentile(latencies, 0.95) * 1000, 2),
+        latency_p99_ms=round(percentile(latencies, 0.99) * 1000, 2),
+        queries_per_second=round(len(queries) / elapsed, 1),
+    )
+
+
+async def run(args: argparse.Namespace) -> list[BenchmarkResult]:
+    engine = create_async_engine(settings.get_database_url())
+    try:
+        async with engine.connect() as connection:
+            if args.drop:
+                await connection.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+                await connection.commit()
+                return []
+
+            await connection.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+            await connection.commit()
+            if not await table_matches(connection, args.rows, args.index):
+                await load(connection, args)
+
+            queries = await query_vectors(connection, args.queries, args.noise / 2)
+            await connection.commit()
+            truth = await exact_top_k(connection, queries, args.k)
+
+            parameter = "hnsw.ef_search" if args.index == "hnsw" else "ivfflat.probes"
+            values = args.ef_search if args.index == "hnsw" else args.probes
+            results = []
+            for value in values:
+                result = await measure(connection, parameter, value, queries, truth, args.k)
+                if not args.json:
+                    print(
+                        f"{parameter}={value:<5} recall@{args.k}={result.recall:.3f} "
+                        f"p50={result.latency_p50_ms}ms p95={result.latency_p95_ms}ms "
+                        f"p99={result.latency_p99_ms}ms qps={result.queries_per_second}",
+                        flush=True,
+                    )
+                results.append(result)
+            return results
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000, help="Vectors in the scratch table")
+    parser.add_argument("--clusters", type=int, default=1000, help="Clusters the synthetic vectors are drawn around")
+    parser.add_argument("--noise", type=float, default=0.3, help="Spread of the vectors around their cluster center")
+    parser.add_argument("--index", choices=("hnsw", "ivfflat"), default="hnsw")
+    parser.add_argument("--m", type=int, default=16, help="HNSW links per node")
+    parser.add_argument("--ef-construction", type=int, default=64, help="HNSW candidate list size while building")
+    parser.add_argument("--lists", type=int, help="IVFFlat lists, defaults to rows / 1000")
+    parser.add_argument("--maintenance-work-mem", default="1GB", help="Memory for the index build")
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[10, 20, 40, 80, 160, 320])
+    parser.add_argument("--probes", type=int, nargs="+", default=[1, 2, 5, 10, 20, 50])
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("-k", type=int, default=10, help="Results per query")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    parser.add_argument("--drop", action="store_true", help="Drop the scratch table and exit")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    if args.json:
+        print(json.dumps([asdict(result) for result in results], indent=2))
+
+
+if __name__ == "__main__":
+    main()
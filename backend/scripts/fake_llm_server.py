@@ -0,0 +1,192 @@
+"""
+OpenAI-compatible stand-in for the chat completions API, for load tests.
+
+Runs FakeChatModel behind ``POST /v1/chat/completions`` (plain and streamed),
+so the real OpenAI client, HTTP stack and provider router are exercised
+without network access or cost. Point a backend at it with::
+
+    OPENAI_API_KEY=fake LLM_BACKENDS='[{"name": "fake-openai", "provider": "openai",
+        "model": "gpt-4.1-nano", "base_url": "http://localhost:9000/v1"}]'
+
+``POST /v1/completions`` answers a list of prompts with one latency, like a
+server decoding them together, for backends with ``batch_max_size``.
+
+Usage::
+
+    python -m scripts.fake_llm_server --port 9000 --latency 0.8 --sigma 0.4 --tps 150 --failure-rate 0.01
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from collections.abc import AsyncIterator
+from typing import Any
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from langchain_core.messages import HumanMessage
+
+from app.services.llm.fake import FakeChatModel, FakeLLMError, tokenize
+
+
+def create_app(model: FakeChatModel) -> FastAPI:
+    """
+    Build the fake chat completions app.
+
+    Args:
+        model (FakeChatModel): Supplies latency, speed, failures and completions
+
+    Returns:
+        FastAPI: The application
+    """
+    app = FastAPI(title="Fake LLM")
+
+    @app.post("/v1/chat/completions", response_model=None)
+    async def chat_completions(request: Request) -> JSONResponse | StreamingResponse:
+        body = await request.json()
+        prompt = [HumanMessage(" ".join(str(message.get("content", "")) for message in body.get("messages", [])))]
+
+        try:
+            model.maybe_fail()
+        except FakeLLMError as exc:
+            return JSONResponse(status_code=503, content={"error": {"message": str(exc), "type": "server_error"}})
+
+        if body.get("stream"):
+            include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+            return StreamingResponse(
+                stream_completion(model, body.get("model", model.model), prompt, include_usage),
+                media_type="text/event-stream",
+            )
+
+        completions = [model.completion_text() for _ in range(body.get("n", 1))]
+        await asyncio.sleep(model.sample_latency() + max(len(tokenize(text)) for text in completions) * model.token_delay())
+        usage = model.usage_metadata(prompt, "".join(completions))
+        return JSONResponse(
+            content={
+                "id": f"chatcmpl-{uuid.uuid4().hex}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", model.model),
+                "choices": [
+                    {"index": index, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}
+                    for index, text in enumerate(completions)
+                ],
+                "usage": openai_usage(usage),
+            }
+        )
+
+    @app.post("/v1/completions")
+    async def completions(request: Request) -> JSONResponse:
+        body = await request.json()
+        prompts = body.get("prompt", "")
+        prompts = [prompts] if isinstance(prompts, str) else prompts
+
+        try:
+            model.maybe_fail()
+        except FakeLLMError as exc:
+            return JSONResponse(status_code=503, content={"error": {"message": str(exc), "type": "server_error"}})
+
+        texts = [model.completion_text() for _ in prompts]
+        # The batch shares its decoding steps, so it takes as long as its longest completion
+        await asyncio.sleep(model.sample_latency() + max(len(tokenize(text)) for text in texts) * model.token_delay())
+        usage = model.usage_metadata([HumanMessage(prompt) for prompt in prompts], "".join(texts))
+        return JSONResponse(
+            content={
+                "id": f"cmpl-{uuid.uuid4().hex}",
+                "object": "text_completion",
+                "created": int(time.time()),
+                "model": body.get("model", model.model),
+                "choices": [
+                    {"index": index, "text": text, "finish_reason": "stop", "logprobs": None}
+                    for index, text in enumerate(texts)
+                ],
+                "usage": openai_usage(usage),
+            }
+        )
+
+    return app
+
+
+async def stream_completion(
+    model: FakeChatModel, model_name: str, prompt: list[HumanMessage], include_usage: bool
+) -> AsyncIterator[str]:
+    """
+    Stream one completion as chat.completion.chunk events.
+
+    Args:
+        model (FakeChatModel): The fake model
+        model_name (str): Model name echoed in the chunks
+        prompt (list[HumanMessage]): The prompt, for the usage estimate
+        include_usage (bool): Whether to send a final usage chunk
+
+    Yields:
+        str: Server-Sent Events lines
+    """
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    created = int(time.time())
+    text = model.completion_text()
+
+    def chunk(delta: dict[str, Any], finish_reason: str | None = None, usage: dict[str, int] | None = None) -> str:
+        payload: dict[str, Any] = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model_name,
+            "choices": [] if usage else [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        if usage:
+            payload["usage"] = usage
+        return f"data: {json.dumps(payload)}\n\n"
+
+    await asyncio.sleep(model.sample_latency())
+    yield chunk({"role": "assistant", "content": ""})
+    for token in tokenize(text):
+        yield chunk({"content": token})
+        await asyncio.sleep(model.token_delay())
+    yield chunk({}, finish_reason="stop")
+    if include_usage:
+        yield chunk({}, usage=openai_usage(model.usage_metadata(prompt, text)))
+    yield "data: [DONE]\n\n"
+
+
+def openai_usage(usage_metadata: dict[str, int]) -> dict[str, int]:
+    """
+    Convert LangChain usage metadata to the OpenAI ``usage`` object.
+
+    Args:
+        usage_metadata (dict[str, int]): Input, output and total token counts
+
+    Returns:
+        dict[str, int]: Prompt, completion and total token counts
+    """
+    return {
+        "prompt_tokens": usage_metadata["input_tokens"],
+        "completion_tokens": usage_metadata["output_tokens"],
+        "total_tokens": usage_metadata["total_tokens"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", type=float, default=1.0, help="Median seconds to first token")
+    parser.add_argument("--sigma", type=float, default=0.5, help="Log-normal spread of the latency, 0 for constant")
+    parser.add_argument("--tps", type=float, default=200.0, help="Streamed tokens per second, 0 for instant")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of calls answered with a 503")
+    args = parser.parse_args()
+
+    model = FakeChatModel(
+        latency_seconds=args.latency,
+        latency_sigma=args.sigma,
+        tokens_per_second=args.tps,
+        failure_rate=args.failure_rate,
+    )
+    uvicorn.run(create_app(model), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Open-loop load test for the generative endpoints.
+
+Requests are started at a fixed rate regardless of how many are still in
+flight, and each latency is measured from the moment its request was
+scheduled, so a slow server cannot hide queueing delay (coordinated
+omission). A background task samples event-loop lag while the test runs.
+
+Without ``--url`` the FastAPI app is driven in-process through ASGI, and the
+event-loop lag is the app's own. Pair it with the fake chat model to measure
+the service without spending on the provider::
+
+    LLM_BACKENDS='[{"name": "fake", "provider": "fake", "model": "fake", "options": {"latency_seconds": 0.5}}]' \\
+        python -m scripts.loadtest --rps 50 --duration 30
+
+Use ``--max-p99`` to fail (exit code 1) when the p99 latency regresses.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+
+import httpx
+
+ENDPOINTS = {
+    "react": "/api/v1/generative/react",
+    "stream": "/api/v1/generative/react/stream",
+    "batch": "/api/v1/generative/react/batch",
+}
+
+PREFERENCES = ("", "", "dark theme", "large touch targets", "a short form with only essential fields", "playful colors")
+
+
+@dataclass
+class LoadTestReport:
+    """Outcome of a load test run."""
+
+    endpoint: str
+    target_rps: float
+    duration_seconds: float
+    requests: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    status_codes: dict[str, int] = field(default_factory=dict)
+    throughput_rps: float = 0.0
+    latency_p50_ms: float | None = None
+    latency_p95_ms: float | None = None
+    latency_p99_ms: float | None = None
+    latency_max_ms: float | None = None
+    loop_lag_p50_ms: float | None = None
+    loop_lag_p99_ms: float | None = None
+    loop_lag_max_ms: float | None = None
+
+
+def percentile(samples: list[float], fraction: float) -> float | None:
+    """
+    Nearest-rank percentile.
+
+    Args:
+        samples (list[float]): The samples
+        fraction (float): The percentile, between 0 and 1
+
+    Returns:
+        float | None: The percentile, None without samples
+    """
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(max(math.ceil(fraction * len(ordered)) - 1, 0), len(ordered) - 1)]
+
+
+async def monitor_loop_lag(samples: list[float], interval: float, stop: asyncio.Event) -> None:
+    """
+    Record how late the event loop wakes up from a sleep of ``interval`` seconds.
+
+    Args:
+        samples (list[float]): Receives the lag of every wake-up, in seconds
+        interval (float): Sleep between samples
+        stop (asyncio.Event): Ends the monitor when set
+    """
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(max(time.perf_counter() - started - interval, 0.0))
+
+
+def request_body(endpoint: str, personas: int, designers: int) -> dict[str, object]:
+    """Build a request with a random persona, designer and (often empty) preferences."""
+    body: dict[str, object] = {
+        "userPrefferences": random.choice(PREFERENCES),
+        "personaId": random.randint(1, personas),
+        "designerId": random.randint(1, designers),
+    }
+    if endpoint == "batch":
+        body["count"] = 3
+    return body
+
+
+async def send(client: httpx.AsyncClient, endpoint: str, body: dict[str, object]) -> int:
+    """
+    Send one request and consume the full response.
+
+    Args:
+        client (httpx.AsyncClient): The HTTP client
+        endpoint (str): Key of ENDPOINTS
+        body (dict[str, object]): The JSON body
+
+    Returns:
+        int: The status code, 599 when a stream ended with an error event
+    """
+    if endpoint != "stream":
+        response = await client.post(ENDPOINTS[endpoint], json=body)
+        return response.status_code
+
+    async with client.stream("POST", ENDPOINTS[endpoint], json=body) as response:
+        failed = False
+        async for line in response.aiter_lines():
+            failed = failed or line == "event: error"
+        return 599 if failed else response.status_code
+
+
+async def run(args: argparse.Namespace) -> LoadTestReport:
+    if args.url:
+        transport = None
+        base_url = args.url
+    else:
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://loadtest"
+
+    report = LoadTestReport(endpoint=args.endpoint, target_rps=args.rps, duration_seconds=args.duration)
+    latencies: list[float] = []
+    lags: list[float] = []
+    statuses: Counter[str] = Counter()
+    in_flight = asyncio.Semaphore(args.max_in_flight)
+
+    async def one(client: httpx.AsyncClient, scheduled: float) -> None:
+        async with in_flight:
+            try:
+                status = await send(client, args.endpoint, request_body(args.endpoint, args.personas, args.designers))
+            except httpx.HTTPError as exc:
+                statuses[exc.__class__.__name__] += 1
+                return
+        statuses[str(status)] += 1
+        if status < 400:
+            # Measured from the scheduled start, so time spent waiting to be sent counts
+            latencies.append(time.perf_counter() - scheduled)
+
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(monitor_loop_lag(lags, args.lag_interval, stop))
+    timeout = httpx.Timeout(args.timeout)
+    limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=timeout, limits=limits) as client:
+        started = time.perf_counter()
+        tasks = []
+        total = int(args.rps * args.duration)
+        for index in range(total):
+            scheduled = started + index / args.rps
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(one(client, scheduled)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+    stop.set()
+    await monitor
+
+    report.requests = total
+    report.succeeded = len(latencies)
+    report.failed = total - len(latencies)
+    report.status_codes = dict(statuses)
+    report.throughput_rps = round(len(latencies) / elapsed, 2) if elapsed else 0.0
+    for name, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99), ("max", 1.0)):
+        value = percentile(latencies, fraction)
+        setattr(report, f"latency_{name}_ms", round(value * 1000, 1) if value is not None else None)
+    for name, fraction in (("p50", 0.5), ("p99", 0.99), ("max", 1.0)):
+        value = percentile(lags, fraction)
+        setattr(report, f"loop_lag_{name}_ms", round(value * 1000, 2) if value is not None else None)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Base URL of a running server, omit to drive the app in-process")
+    parser.add_argument("--endpoint", choices=sorted(ENDPOINTS), default="react")
+    parser.add_argument("--rps", type=float, default=10.0, help="Requests started per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to keep starting requests")
+    parser.add_argument("--max-in-flight", type=int, default=1000, help="Client-side cap on concurrent requests")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout in seconds")
+    parser.add_argument("--personas", type=int, default=3)
+    parser.add_argument("--designers", type=int, default=3)
+    parser.add_argument("--lag-interval", type=float, default=0.01, help="Event-loop lag sampling interval")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--max-p99", type=float, help="Exit with status 1 when the p99 latency exceeds this many ms")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+
+    if args.json:
+        print(json.dumps(asdict(report), indent=2))
+    else:
+        for key, value in asdict(report).items():
+            print(f"{key:>20}: {value}")
+
+    if args.max_p99 is not None and (report.latency_p99_ms is None or report.latency_p99_ms > args.max_p99):
+        print(f"p99 latency {report.latency_p99_ms} ms exceeds {args.max_p99} ms", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import asyncio
+from typing import Any
+
+import pytest
+from langchain_core.messages import HumanMessage, SystemMessage
+from openai.types import Completion, CompletionChoice, CompletionUsage
+
+from app.config import LLMBackendSettings
+from app.services.llm.batching import (
+    DEFAULT_MAX_TOKENS,
+    CompletionsBatchClient,
+    ConcurrentBatchClient,
+    MicroBatcher,
+)
+from app.services.llm.fake import FakeChatModel
+from app.services.llm.providers import build_batcher
+
+
+def stub_client(
+    monkeypatch: pytest.MonkeyPatch, requests: list[dict[str, Any]], options: dict[str, Any] | None = None
+) -> CompletionsBatchClient:
+    client = CompletionsBatchClient(
+        "http://localhost:8000/v1", "local", options={"temperature": 0.7, "n": 3} if options is None else options
+    )
+
+    async def create(**kwargs: Any) -> Completion:
+        requests.append(kwargs)
+        await asyncio.sleep(0.01)
+        # Servers may return the choices out of order
+        choices = [
+            CompletionChoice(index=index, text=f"reply {index}", finish_reason="stop")
+            for index in reversed(range(len(kwargs["prompt"])))
+        ]
+        usage = CompletionUsage(prompt_tokens=30, completion_tokens=9, total_tokens=39)
+        return Completion(id="cmpl", choices=choices, created=0, model="local", object="text_completion", usage=usage)
+
+    monkeypatch.setattr(client.client.completions, "create", create)
+    return client
+
+
+def test_concurrent_calls_are_sent_as_one_request(monkeypatch: pytest.MonkeyPatch) -> None:
+    requests: list[dict[str, Any]] = []
+    batcher = MicroBatcher("local", stub_client(monkeypatch, requests), max_size=3, max_wait_seconds=1)
+
+    async def scenario() -> list[str]:
+        replies = await asyncio.gather(*(batcher.ainvoke([HumanMessage(f"prompt {index}")]) for index in range(3)))
+        return [str(reply.content) for reply in replies]
+
+    assert asyncio.run(scenario()) == ["reply 0", "reply 1", "reply 2"]
+    assert len(requests) == 1
+    assert requests[0]["prompt"] == [f"<|im_start|>user\nprompt {index}<|im_end|>\n<|im_start|>assistant\n" for index in range(3)]
+    assert requests[0]["temperature"] == 0.7 and "n" not in requests[0]
+    assert requests[0]["max_tokens"] == DEFAULT_MAX_TOKENS
+    assert (batcher.stats().batches, batcher.stats().calls) == (1, 3)
+
+
+def test_batch_usage_is_split_across_the_calls(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = stub_client(monkeypatch, [])
+
+    replies = asyncio.run(client.abatch([[SystemMessage("s"), HumanMessage("a")], [HumanMessage("b")]]))
+
+    usages = [reply.usage_metadata for reply in replies]
+    assert sum(usage["input_tokens"] for usage in usages) == 30
+    assert sum(usage["output_tokens"] for usage in usages) == 9
+    assert usages[0]["input_tokens"] > usages[1]["input_tokens"]
+
+
+def test_unknown_prompt_format_is_rejected() -> None:
+    with pytest.raises(ValueError, match="prompt format"):
+        CompletionsBatchClient("http://localhost:8000/v1", "local", prompt_format="alpaca")
+
+
+def test_backend_max_tokens_overrides_the_default(monkeypatch: pytest.MonkeyPatch) -> None:
+    requests: list[dict[str, Any]] = []
+    client = stub_client(monkeypatch, requests, options={"max_tokens": 1500})
+
+    asyncio.run(client.abatch([[HumanMessage("a")]]))
+
+    assert requests[0]["max_tokens"] == 1500
+
+
+def test_concurrent_client_answers_each_call() -> None:
+    model = FakeChatModel(latency_seconds=0, latency_sigma=0, tokens_per_second=0, failure_rate=0)
+    batcher = MicroBatcher("ollama", ConcurrentBatchClient(model), max_size=4, max_wait_seconds=1)
+
+    async def scenario() -> list[str]:
+        replies = await asyncio.gather(*(batcher.ainvoke([HumanMessage("a")]) for _ in range(4)))
+        return [str(reply.content) for reply in replies]
+
+    assert all(asyncio.run(scenario()))
+    assert (batcher.stats().batches, batcher.stats().calls) == (1, 4)
+
+
+def test_batchers_by_provider() -> None:
+    ollama = LLMBackendSettings(name="ollama", provider="ollama", model="llama3.2:3b", batch_max_size=4)
+    vllm = LLMBackendSettings(name="vllm", provider="openai", model="qwen", base_url="http://vllm:8000/v1", batch_max_size=8)
+
+    assert isinstance(build_batcher(ollama).client, ConcurrentBatchClient)
+    assert isinstance(build_batcher(vllm).client, CompletionsBatchClient)
+    assert build_batcher(LLMBackendSettings(name="single", provider="openai", model="gpt-4.1-nano")) is None
+    with pytest.raises(ValueError, match="base_url"):
+        build_batcher(LLMBackendSettings(name="remote", provider="openai", model="qwen", batch_max_size=8))
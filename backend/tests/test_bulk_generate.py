@@ -0,0 +1,68 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from app.bulk_generate import expand_spec, load_checkpoint
+from app.services.core.catalog import CatalogSnapshot
+from app.types.catalog import CatalogEntryDetail
+
+CATALOG = CatalogSnapshot(
+    version=1,
+    personas={1: CatalogEntryDetail(id=1, name="HR Manager", prompt="An HR manager")},
+    designers={
+        1: CatalogEntryDetail(id=1, name="Minimal", prompt="Minimal"),
+        2: CatalogEntryDetail(id=2, name="Playful", prompt="Playful"),
+    },
+)
+
+
+def test_expand_spec_defaults_to_the_whole_catalog() -> None:
+    lines = ['{"id": "signup", "userPrefferences": "dark theme", "repeat": 2}\n', "\n", '{"designerIds": [2]}\n']
+
+    items = expand_spec(lines, CATALOG, fresh=True)
+
+    assert [item.key for item in items] == [
+        "signup:p1:d1:0",
+        "signup:p1:d1:1",
+        "signup:p1:d2:0",
+        "signup:p1:d2:1",
+        "3:p1:d2:0",
+    ]
+    assert items[0].request.user_prefferences == "dark theme"
+    assert items[0].request.fresh
+
+
+def test_expand_spec_reports_the_line_of_an_unknown_designer() -> None:
+    with pytest.raises(ValueError, match="Spec line 2: Designer with id 9 not found"):
+        expand_spec(['{"id": "a"}', '{"id": "b", "designerIds": [1, 9]}'], CATALOG, fresh=True)
+
+
+def test_expand_spec_rejects_duplicate_keys() -> None:
+    with pytest.raises(ValueError, match="Spec line 2: duplicate item a:p1:d1:0"):
+        expand_spec(['{"id": "a"}', '{"id": "a"}'], CATALOG, fresh=True)
+
+
+def test_missing_checkpoint_is_empty(tmp_path: Path) -> None:
+    assert load_checkpoint(str(tmp_path / "components.jsonl")) == set()
+
+
+def test_checkpoint_skips_failed_items(tmp_path: Path) -> None:
+    output = tmp_path / "components.jsonl"
+    records = [
+        {"key": "signup:p1:d1:0", "status": "succeeded"},
+        {"key": "signup:p1:d2:0", "status": "failed", "error": "FakeLLMError: Injected fake LLM failure"},
+        {"key": "signup:p2:d1:0", "status": "succeeded"},
+    ]
+    output.write_text("".join(json.dumps(record) + "\n" for record in records))
+
+    assert load_checkpoint(str(output)) == {"signup:p1:d1:0", "signup:p2:d1:0"}
+
+
+def test_partial_last_line_is_truncated(tmp_path: Path) -> None:
+    output = tmp_path / "components.jsonl"
+    complete = json.dumps({"key": "signup:p1:d1:0", "status": "succeeded"}) + "\n"
+    output.write_text(complete + '{"key": "signup:p1:d2:0", "sta')
+
+    assert load_checkpoint(str(output)) == {"signup:p1:d1:0"}
+    assert output.read_text() == complete
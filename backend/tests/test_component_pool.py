@@ -0,0 +1,76 @@
+import asyncio
+from collections.abc import Iterable
+
+from app.services.core.component_pool import ComponentPool, PoolKey
+from app.types.generative import GenerativeDetail
+
+
+def detail(persona_id: int, designer_id: int) -> GenerativeDetail:
+    return GenerativeDetail(
+        user_prefferences="", raw_component=f"export default function A() {{ return {persona_id}{designer_id} }}"
+    )
+
+
+def test_pool_drops_its_components_when_the_catalog_changes() -> None:
+    catalog: dict[str, object] = {"version": 1, "keys": [(1, 1)]}
+
+    async def keys() -> tuple[int, Iterable[PoolKey]]:
+        return catalog["version"], catalog["keys"]
+
+    async def factory(persona_id: int, designer_id: int) -> GenerativeDetail:
+        return detail(persona_id, designer_id)
+
+    async def scenario() -> None:
+        pool = ComponentPool(depth=2, max_age_seconds=60.0, refill_concurrency=1, catalog_check_seconds=0.01)
+        await pool.start(factory, keys, validator=lambda _: True)
+        await asyncio.sleep(0.02)
+        assert pool.stats().sizes == {"1:1": 2}
+
+        # A request checked against a newer catalog misses until the pool has caught up
+        assert pool.pop(1, 1, catalog_version=2) is None
+
+        catalog.update(version=2, keys=[(1, 1), (2, 1)])
+        await asyncio.sleep(0.05)
+        stats = pool.stats()
+        assert stats.invalidated == 2
+        assert stats.sizes == {"1:1": 2, "2:1": 2}
+        assert pool.pop(2, 1, catalog_version=2) is not None
+
+        # Pairs removed from the catalog stop being refilled
+        catalog.update(version=3, keys=[(2, 1)])
+        await asyncio.sleep(0.05)
+        assert pool.stats().sizes == {"2:1": 2}
+        assert pool.pop(1, 1, catalog_version=3) is None
+
+        await pool.stop()
+        assert not pool.running
+
+    asyncio.run(scenario())
+
+
+def test_component_generated_across_a_catalog_change_is_not_pooled() -> None:
+    release = asyncio.Event()
+
+    async def factory(persona_id: int, designer_id: int) -> GenerativeDetail:
+        await release.wait()
+        return detail(persona_id, designer_id)
+
+    async def keys() -> tuple[int, Iterable[PoolKey]]:
+        return 1, [(1, 1)]
+
+    async def scenario() -> None:
+        pool = ComponentPool(depth=1, max_age_seconds=60.0, refill_concurrency=1, catalog_check_seconds=60.0)
+        await pool.start(factory, keys, validator=lambda _: True)
+        await asyncio.sleep(0)
+
+        pool.sync(2, [(1, 1)])
+        release.set()
+        await asyncio.sleep(0.01)
+
+        stats = pool.stats()
+        # The refill started under version 1 is dropped, the next one is pooled
+        assert stats.invalidated == 1
+        assert stats.sizes == {"1:1": 1}
+        await pool.stop()
+
+    asyncio.run(scenario())
@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from app.services.llm.fake import FakeChatModel, FakeLLMError, tokenize
+
+PROMPT = [HumanMessage("A signup form")]
+
+
+def test_invoke_returns_n_completions_with_usage() -> None:
+    model = FakeChatModel(latency_seconds=0, latency_sigma=0, tokens_per_second=0, n=3)
+
+    result = asyncio.run(model.agenerate([PROMPT]))
+
+    generations = result.generations[0]
+    assert len(generations) == 3
+    assert all(generation.message.usage_metadata["output_tokens"] > 0 for generation in generations)
+
+
+def test_stream_joins_to_the_completion() -> None:
+    model = FakeChatModel(latency_seconds=0, latency_sigma=0, tokens_per_second=0)
+
+    async def stream() -> list[str]:
+        return [str(chunk.content) async for chunk in model.astream(PROMPT)]
+
+    chunks = asyncio.run(stream())
+
+    assert len(chunks) > 1
+    assert tokenize("".join(chunks)) == chunks[:-1]
+
+
+def test_constant_latency_without_sigma() -> None:
+    model = FakeChatModel(latency_seconds=0.3, latency_sigma=0)
+
+    assert {model.sample_latency() for _ in range(5)} == {0.3}
+
+
+def test_failure_rate_raises() -> None:
+    model = FakeChatModel(latency_seconds=0, latency_sigma=0, failure_rate=1.0)
+
+    with pytest.raises(FakeLLMError):
+        asyncio.run(model.ainvoke(PROMPT))
@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from app.services.core import generative
+from app.services.core.catalog import CatalogSnapshot
+from app.services.core.generative import GenerativeService
+from app.services.llm.usage import TokenUsageStats, metered_usage
+from app.types.generative import GenerativeCreate, GenerativeDetail
+
+
+def test_coalesced_callers_are_each_charged_the_shared_generation(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = 0
+
+    async def resolve_catalog(self: GenerativeService, generative_schema: GenerativeCreate) -> None:
+        return None
+
+    async def generate_component(
+        self: GenerativeService, generative_schema: GenerativeCreate, catalog: CatalogSnapshot | None = None
+    ) -> GenerativeDetail:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        generative.record_usage({"input_tokens": 100, "output_tokens": 50})
+        return GenerativeDetail(user_prefferences="", raw_component="export default function A() {}")
+
+    monkeypatch.setattr(GenerativeService, "resolve_catalog", resolve_catalog)
+    monkeypatch.setattr(GenerativeService, "pop_pooled_component", lambda self, generative_schema, catalog: None)
+    monkeypatch.setattr(GenerativeService, "generate_component", generate_component)
+
+    async def metered_request() -> TokenUsageStats:
+        usage = TokenUsageStats()
+        metered_usage.set(usage)
+        await GenerativeService().find_or_generate_component(GenerativeCreate(user_prefferences="dark"))
+        return usage
+
+    async def scenario() -> list[TokenUsageStats]:
+        # Each request runs in its own task, like the API's, and so meters into its own counters
+        return await asyncio.gather(*(asyncio.create_task(metered_request()) for _ in range(3)))
+
+    usages = asyncio.run(scenario())
+
+    assert calls == 1
+    assert [(usage.calls, usage.prompt_tokens, usage.completion_tokens) for usage in usages] == [(1, 100, 50)] * 3
+
+
+def test_flight_uses_the_catalog_resolved_by_its_leader(monkeypatch: pytest.MonkeyPatch) -> None:
+    snapshot = CatalogSnapshot(version=1, personas={}, designers={})
+    lookups = 0
+    received: list[CatalogSnapshot | None] = []
+
+    async def resolve_catalog(self: GenerativeService, generative_schema: GenerativeCreate) -> CatalogSnapshot:
+        nonlocal lookups
+        lookups += 1
+        return snapshot
+
+    async def generate_component(
+        self: GenerativeService, generative_schema: GenerativeCreate, catalog: CatalogSnapshot | None = None
+    ) -> GenerativeDetail:
+        received.append(catalog)
+        await asyncio.sleep(0.01)
+        return GenerativeDetail(user_prefferences="", raw_component="export default function A() {}")
+
+    monkeypatch.setattr(GenerativeService, "resolve_catalog", resolve_catalog)
+    monkeypatch.setattr(GenerativeService, "pop_pooled_component", lambda self, generative_schema, catalog: None)
+    monkeypatch.setattr(GenerativeService, "generate_component", generate_component)
+
+    async def scenario() -> None:
+        request = GenerativeCreate(user_prefferences="dark")
+        await asyncio.gather(*(GenerativeService().find_or_generate_component(request) for _ in range(3)))
+
+    asyncio.run(scenario())
+
+    # One lookup per caller before the flight, none inside it
+    assert lookups == 3
+    assert received == [snapshot]
@@ -0,0 +1,131 @@
+import asyncio
+
+import pytest
+
+from app.services.llm.hedging import HedgeAttempt, Hedger
+
+
+def test_fast_call_is_not_hedged() -> None:
+    hedger: Hedger[str] = Hedger(fixed_delay_seconds=0.05, max_extra_ratio=1)
+    attempts: list[int] = []
+
+    async def attempt(progress: HedgeAttempt) -> str:
+        progress.sent()
+        attempts.append(progress.number)
+        return "primary"
+
+    assert asyncio.run(hedger.run(attempt)) == "primary"
+    assert attempts == [0]
+    assert hedger.stats().hedged == 0
+
+
+def test_slow_call_is_won_by_the_hedge() -> None:
+    hedger: Hedger[str] = Hedger(fixed_delay_seconds=0.01, max_extra_ratio=1)
+
+    async def attempt(progress: HedgeAttempt) -> str:
+        progress.sent()
+        await asyncio.sleep(1 if progress.number == 0 else 0)
+        return f"attempt {progress.number}"
+
+    assert asyncio.run(hedger.run(attempt)) == "attempt 1"
+    stats = hedger.stats()
+    assert (stats.calls, stats.hedged, stats.hedge_wins) == (1, 1, 1)
+
+
+def test_delay_starts_once_the_call_is_sent() -> None:
+    hedger: Hedger[str] = Hedger(fixed_delay_seconds=0.05, max_extra_ratio=1)
+
+    async def attempt(progress: HedgeAttempt) -> str:
+        # Queued longer than the delay, then answered quickly by the provider
+        await asyncio.sleep(0.1)
+        progress.sent()
+        await asyncio.sleep(0.01)
+        return f"attempt {progress.number}"
+
+    assert asyncio.run(hedger.run(attempt)) == "attempt 0"
+    assert hedger.stats().hedged == 0
+
+
+def test_failed_primary_falls_back_to_the_hedge() -> None:
+    hedger: Hedger[str] = Hedger(fixed_delay_seconds=0.01, max_extra_ratio=1)
+
+    async def attempt(progress: HedgeAttempt) -> str:
+        progress.sent()
+        if progress.number == 0:
+            await asyncio.sleep(0.05)
+            raise RuntimeError("primary failed")
+        await asyncio.sleep(0.1)
+        return "hedge"
+
+    assert asyncio.run(hedger.run(attempt)) == "hedge"
+
+
+def test_primary_error_when_every_attempt_fails() -> None:
+    hedger: Hedger[str] = Hedger(fixed_delay_seconds=0.01, max_extra_ratio=1)
+
+    async def attempt(progress: HedgeAttempt) -> str:
+        progress.sent()
+        await asyncio.sleep(0.05 if progress.number == 0 else 0)
+        raise RuntimeError(f"attempt {progress.number} failed")
+
+    with pytest.raises(RuntimeError, match="attempt 0 failed"):
+        asyncio.run(hedger.run(attempt))
+
+
+def test_budget_and_allow_deny_hedges() -> None:
+    hedger: Hedger[int] = Hedger(fixed_delay_seconds=0.001, max_extra_ratio=0)
+
+    async def attempt(progress: HedgeAttempt) -> int:
+        progress.sent()
+        await asyncio.sleep(0.01)
+        return progress.number
+
+    async def scenario() -> None:
+        assert await hedger.run(attempt) == 0
+        hedger.max_extra_ratio = 1
+        assert await hedger.run(attempt, allow=lambda: False) == 0
+
+    asyncio.run(scenario())
+    stats = hedger.stats()
+    assert (stats.hedged, stats.budget_denied) == (0, 2)
+
+
+def test_streamed_call_is_hedged_on_the_first_output() -> None:
+    hedger: Hedger[str] = Hedger(fixed_delay_seconds=0.05, max_extra_ratio=1)
+
+    async def attempt(progress: HedgeAttempt) -> str:
+        progress.sent()
+        await asyncio.sleep(0.01)
+        progress.first_output()
+        # A long completion that started promptly is not hedged
+        await asyncio.sleep(0.2)
+        return f"attempt {progress.number}"
+
+    assert asyncio.run(hedger.run(attempt, streamed=True)) == "attempt 0"
+    assert hedger.stats().hedged == 0
+
+
+def test_only_the_primary_latency_is_recorded() -> None:
+    hedger: Hedger[int] = Hedger(percentile=0.5, min_samples=3)
+
+    async def attempt(progress: HedgeAttempt) -> int:
+        await asyncio.sleep(0.05)  # Queued
+        progress.sent()
+        progress.first_output()
+        return progress.number
+
+    async def scenario() -> list[float | None]:
+        delays = []
+        for _ in range(3):
+            delays.append(hedger.delay())
+            await hedger.run(attempt)
+        await hedger.run(attempt, streamed=True)
+        delays.append(hedger.delay())
+        return delays
+
+    delays = asyncio.run(scenario())
+    assert delays[:3] == [None, None, None]
+    # The queueing is left out of the samples
+    assert delays[3] is not None and delays[3] < 0.01
+    assert hedger.delay(streamed=True) is None
+    assert len(hedger._first_output_latencies) == 1
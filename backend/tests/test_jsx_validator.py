@@ -0,0 +1,94 @@
+import pytest
+
+from app.services.core.jsx_validator import (
+    JSXSyntaxError,
+    StreamingComponentValidator,
+    scan_jsx,
+    validate_component,
+)
+from app.services.llm.fake import FakeChatModel
+
+
+@pytest.fixture
+def component() -> str:
+    return FakeChatModel().completion_text()
+
+
+def test_fake_component_is_valid(component: str) -> None:
+    result = validate_component(component)
+
+    assert result.valid
+    assert result.repairs == []
+    assert result.code == component
+
+
+def test_repairs_fences_and_declaration(component: str) -> None:
+    result = validate_component(f"Here it is:\n```jsx\nconst Form = {component};\nexport default Form;\n```")
+
+    assert result.valid
+    assert result.code == component
+    assert "removed markdown fences" in result.repairs
+    assert "removed variable declaration" in result.repairs
+
+
+def test_removes_jsx_comments() -> None:
+    result = validate_component("<MUI.Box>{/* header */}<MUI.Typography>Hi</MUI.Typography></MUI.Box>")
+
+    assert result.valid
+    assert result.code == "<MUI.Box><MUI.Typography>Hi</MUI.Typography></MUI.Box>"
+    assert "removed comments" in result.repairs
+
+
+def test_reports_mismatched_closing_tag() -> None:
+    result = validate_component("<MUI.Box><MUI.Typography>Hi</MUI.Box></MUI.Typography>")
+
+    assert not result.valid
+    assert result.errors[0].startswith("Closing tag </MUI.Box> does not match <MUI.Typography>")
+
+
+def test_reports_unknown_icon() -> None:
+    result = validate_component('<MUI.Button startIcon={<ICONS.NotAnIcon />} endIcon={ICONS.NotAnIcon}>Go</MUI.Button>')
+
+    assert result.errors == ["Icons outside the allowed list: NotAnIcon"]
+
+
+def test_scan_rejects_unclosed_element() -> None:
+    with pytest.raises(JSXSyntaxError, match="Unclosed element <MUI.Box>"):
+        scan_jsx("<MUI.Box><MUI.Typography>Hi</MUI.Typography>")
+
+
+def test_streaming_accepts_complete_component(component: str) -> None:
+    validator = StreamingComponentValidator(check_interval=1)
+
+    for char in component:
+        assert validator.feed(char) is None
+    assert validator.check() is None
+
+
+def test_streaming_flags_settled_error(component: str) -> None:
+    validator = StreamingComponentValidator(check_interval=1)
+    broken = component.replace("</MUI.Typography>", "</MUI.Box>", 1)
+
+    violations = [validator.feed(char) for char in broken]
+
+    assert any(violation and violation.startswith("Closing tag </MUI.Box>") for violation in violations)
+
+
+LONG_VALUES = (
+    "<MUI.Box>"
+    "{/* A comment that is much longer than the settled distance, as models like to explain themselves */}"
+    '<MUI.TextField label="Tell us what you would like to achieve with the product in the next few months" />'
+    "<MUI.Typography>{`Welcome back, ${'a template literal that runs on and on for quite a while'}`}</MUI.Typography>"
+    '<MUI.Button onClick={() => alert("a JavaScript string that is also longer than the settled distance")}>Go</MUI.Button>'
+    "</MUI.Box>"
+)
+
+
+@pytest.mark.parametrize("complete", [FakeChatModel().completion_text(), LONG_VALUES])
+def test_streaming_accepts_every_prefix_of_a_valid_component(complete: str) -> None:
+    assert validate_component(complete).valid
+    for end in range(1, len(complete) + 1):
+        validator = StreamingComponentValidator()
+        validator.feed(complete[:end])
+
+        assert validator.check() is None, complete[:end]
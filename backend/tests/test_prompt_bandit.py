@@ -0,0 +1,141 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.config import settings
+from app.repositories.prompt_variant_stats_repository import PromptVariantStatsRepository
+from app.services.core import prompt_bandit as prompt_bandit_module
+from app.services.core.prompt_bandit import PromptBandit
+from app.services.core.prompt_registry import PromptRegistry
+from app.types.prompt_variant import PromptVariantStatsBase
+
+registry = PromptRegistry()
+
+
+def test_variant_ids_round_trip() -> None:
+    for variant_id in (0, 1, 1234, registry.variant_count - 1):
+        variant = registry.variant(variant_id)
+        assert registry.variant_id(variant.choices) == variant_id
+
+
+def test_collapse_resets_overridden_dimensions() -> None:
+    variant = registry.variant(registry.variant_count - 1, seed=7)
+
+    collapsed = registry.collapse(variant, ("design",))
+
+    assert collapsed.choice("design") == 0
+    assert collapsed.seed == 7
+    assert [collapsed.choice(name) for name, _ in registry.dimensions if name != "design"] == [
+        variant.choice(name) for name, _ in registry.dimensions if name != "design"
+    ]
+    assert registry.render(variant, design_guidelines="Designer") == registry.render(
+        collapsed, design_guidelines="Designer"
+    )
+
+
+def test_bandit_does_not_sample_overridden_dimensions() -> None:
+    bandit = PromptBandit(registry)
+
+    assert {bandit.choose(("design",)).choice("design") for _ in range(50)} == {0}
+
+
+def test_disabled_bandit_records_nothing(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "PROMPT_BANDIT_ENABLED", False)
+    bandit = PromptBandit(registry)
+
+    asyncio.run(bandit.record_compile(0, compiled=False))
+
+    assert bandit._pending == {}
+    assert bandit._options[0][0].compile_failed == 0
+
+
+def test_outcomes_are_buffered_until_the_refresh(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "PROMPT_BANDIT_ENABLED", True)
+    bandit = PromptBandit(registry, refresh_seconds=3600)
+    bandit._refreshed_at = time.monotonic()
+
+    async def scenario() -> None:
+        await bandit.record_generation(registry.variant(5), "valid", llm_seconds=0)
+        await bandit.record_generation(registry.variant(5), "invalid")
+        await bandit.record_compile(5, compiled=True)
+
+    asyncio.run(scenario())
+
+    assert bandit._pending == {
+        5: {"attempts": 2, "valid": 1, "reward": 1, "llm_seconds": 0, "invalid": 1, "compiled": 1}
+    }
+
+
+class FakeSession:
+    async def commit(self) -> None:
+        pass
+
+
+def fake_database(monkeypatch: pytest.MonkeyPatch, reload: asyncio.Event | None = None, fail: bool = False) -> dict[int, dict[str, float]]:
+    rows: dict[int, dict[str, float]] = {}
+
+    @asynccontextmanager
+    async def session() -> AsyncIterator[FakeSession]:
+        yield FakeSession()
+
+    async def record(self: PromptVariantStatsRepository, variant_id: int, **increments: float) -> None:
+        if fail:
+            raise ConnectionError("database down")
+        row = rows.setdefault(variant_id, {})
+        for name, amount in increments.items():
+            row[name] = row.get(name, 0) + amount
+
+    async def get_all(self: PromptVariantStatsRepository) -> list[PromptVariantStatsBase]:
+        if reload is not None:
+            await reload.wait()
+        return [PromptVariantStatsBase(variant_id=variant_id, **row) for variant_id, row in rows.items()]
+
+    monkeypatch.setattr(prompt_bandit_module.sessionmanager, "session", session)
+    monkeypatch.setattr(PromptVariantStatsRepository, "record", record)
+    monkeypatch.setattr(PromptVariantStatsRepository, "get_all", get_all)
+    return rows
+
+
+def attempts(bandit: PromptBandit) -> int:
+    return sum(option.attempts for option in bandit._options[0])
+
+
+def test_outcomes_recorded_during_a_sync_survive_the_reload(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "PROMPT_BANDIT_ENABLED", True)
+    reload = asyncio.Event()
+    rows = fake_database(monkeypatch, reload)
+    bandit = PromptBandit(registry, refresh_seconds=0)
+
+    async def scenario() -> None:
+        await bandit.record_generation(registry.variant(5), "valid", llm_seconds=0)
+        sync = bandit._sync_task
+        assert sync is not None
+        await asyncio.sleep(0)
+        # Recorded while the shared totals are being reloaded
+        await bandit.record_generation(registry.variant(5), "invalid")
+        reload.set()
+        await sync
+
+    asyncio.run(scenario())
+
+    assert rows == {5: {"attempts": 1, "valid": 1, "reward": 1, "llm_seconds": 0}}
+    assert bandit._pending == {5: {"attempts": 1, "invalid": 1}}
+    assert attempts(bandit) == 2
+
+
+def test_outcomes_kept_after_a_failed_flush_survive_the_reload(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "PROMPT_BANDIT_ENABLED", True)
+    fake_database(monkeypatch, fail=True)
+    bandit = PromptBandit(registry, refresh_seconds=0)
+
+    async def scenario() -> None:
+        await bandit.record_compile(5, compiled=False)
+        await bandit.flush()
+
+    asyncio.run(scenario())
+
+    assert bandit._pending == {5: {"compile_failed": 1}}
+    assert sum(option.compile_failed for option in bandit._options[0]) == 1
@@ -0,0 +1,48 @@
+from app.services.llm.fake import FakeChatModel
+from app.services.llm.providers import LLMBackend, ProviderRouter
+
+
+def backend(name: str, *samples: tuple[float, bool]) -> LLMBackend:
+    llm_backend = LLMBackend(name, FakeChatModel(), max_consecutive_failures=100)
+    for duration, success in samples:
+        llm_backend.record(duration, success)
+    return llm_backend
+
+
+def names(backends: list[LLMBackend]) -> list[str]:
+    return [llm_backend.name for llm_backend in backends]
+
+
+def test_latency_policy_prefers_the_fastest_reliable_backend() -> None:
+    router = ProviderRouter(
+        [backend("slow", (3.0, True)), backend("fast", (1.0, True)), backend("flaky", (0.5, True), (0.5, False))]
+    )
+
+    assert names(router.candidates()) == ["fast", "flaky", "slow"]
+
+
+def test_backend_that_only_failed_ranks_last() -> None:
+    router = ProviderRouter([backend("failing", (0.1, False), (0.1, False)), backend("ok", (2.0, True))])
+
+    assert names(router.candidates()) == ["ok", "failing"]
+
+
+def test_unmeasured_backend_is_ranked_at_the_median() -> None:
+    router = ProviderRouter(
+        [backend("slow", (4.0, True)), backend("new"), backend("fast", (1.0, True)), backend("medium", (2.0, True))]
+    )
+
+    # Assumed to take the median 2s, tied with "medium" and configured before it
+    assert names(router.candidates()) == ["fast", "new", "medium", "slow"]
+
+
+def test_without_any_measurement_the_configuration_order_is_kept() -> None:
+    router = ProviderRouter([backend("a"), backend("b")], default_latency_seconds=5.0)
+
+    assert names(router.candidates()) == ["a", "b"]
+
+
+def test_exploration_puts_another_backend_first() -> None:
+    router = ProviderRouter([backend("fast", (1.0, True)), backend("slow", (3.0, True))], exploration_rate=1.0)
+
+    assert names(router.candidates()) == ["slow", "fast"]
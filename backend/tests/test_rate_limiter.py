@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from app.errors import RateLimitExceededError
+from app.services.core import rate_limiter
+from app.services.core.rate_limiter import BucketLimit, GenerationQuota, InMemoryTokenBuckets
+from app.services.llm.usage import metered_usage
+from app.types.generative import TokenUsage
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock)
+    return clock
+
+
+def test_bucket_starts_full_and_refills(clock: Clock) -> None:
+    buckets = InMemoryTokenBuckets()
+    limit = BucketLimit(capacity=2, refill_per_second=1)
+
+    async def scenario() -> list[float]:
+        levels = [await buckets.level_before_take("key", 1, 1, limit) for _ in range(3)]
+        clock.now += 0.5
+        levels.append(await buckets.level_before_take("key", 1, 1, limit))
+        clock.now += 10
+        levels.append(await buckets.level_before_take("key", 1, 1, limit))
+        return levels
+
+    # The third take fails and leaves the bucket empty; the refill is capped at the capacity
+    assert asyncio.run(scenario()) == [2, 1, 0, 0.5, 2]
+
+
+def test_charge_may_leave_debt(clock: Clock) -> None:
+    buckets = InMemoryTokenBuckets()
+    limit = BucketLimit(capacity=10, refill_per_second=1)
+
+    async def scenario() -> float:
+        await buckets.level_before_take("key", 25, float("-inf"), limit)
+        return await buckets.level_before_take("key", 0, 1, limit)
+
+    assert asyncio.run(scenario()) == -15
+
+
+def test_least_recently_used_bucket_is_evicted(clock: Clock) -> None:
+    buckets = InMemoryTokenBuckets(max_keys=2)
+    limit = BucketLimit(capacity=1, refill_per_second=0)
+
+    async def scenario() -> float:
+        for key in ("a", "b", "c"):
+            await buckets.level_before_take(key, 1, 1, limit)
+        return await buckets.level_before_take("a", 1, 1, limit)
+
+    assert asyncio.run(scenario()) == 1
+
+
+def test_quota_rejects_exhausted_requests(clock: Clock) -> None:
+    quota = GenerationQuota(InMemoryTokenBuckets(), "user:a", BucketLimit(2, 1 / 60), BucketLimit(1000, 10))
+
+    async def scenario() -> None:
+        await quota.admit()
+        await quota.admit()
+        with pytest.raises(RateLimitExceededError) as rejection:
+            await quota.admit()
+        assert rejection.value.retry_after == pytest.approx(60)
+
+    asyncio.run(scenario())
+
+
+def test_quota_admits_large_batch_on_full_bucket(clock: Clock) -> None:
+    quota = GenerationQuota(InMemoryTokenBuckets(), "user:a", BucketLimit(2, 1), BucketLimit(1000, 10))
+
+    asyncio.run(quota.admit(cost=5))
+
+
+def test_metered_usage_is_charged_and_blocks_admission(clock: Clock) -> None:
+    quota = GenerationQuota(InMemoryTokenBuckets(), "user:a", BucketLimit(10, 1), BucketLimit(100, 1))
+
+    async def scenario() -> None:
+        async with quota.metered():
+            metered_usage.get().record(TokenUsage(prompt_tokens=80, completion_tokens=40))  # type: ignore
+        with pytest.raises(RateLimitExceededError) as rejection:
+            await quota.admit()
+        assert rejection.value.retry_after == pytest.approx(21)
+
+    asyncio.run(scenario())
+
+
+def test_disabled_quota_admits_everything() -> None:
+    quota = GenerationQuota(None, "user:a", BucketLimit(0, 0), BucketLimit(0, 0))
+
+    async def scenario() -> None:
+        for _ in range(10):
+            await quota.admit()
+        await quota.charge(1_000_000)
+
+    asyncio.run(scenario())
@@ -0,0 +1,19 @@
+from app.services.core.semantic_cache import cache_text
+from app.types.generative import GenerativeCreate
+
+
+def test_cache_text_is_the_normalised_preferences() -> None:
+    request = GenerativeCreate(user_prefferences="  Dark   THEME ", persona_id=2, designer_id=3)
+
+    assert cache_text(request) == "dark theme"
+
+
+def test_cache_text_ignores_the_persona_and_designer() -> None:
+    first = GenerativeCreate(user_prefferences="dark theme", persona_id=1, designer_id=1)
+    second = GenerativeCreate(user_prefferences="dark theme", persona_id=2, designer_id=5)
+
+    assert cache_text(first) == cache_text(second)
+
+
+def test_requests_without_preferences_have_no_cache_text() -> None:
+    assert cache_text(GenerativeCreate(user_prefferences="   ")) == ""
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from app.utils.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_operation() -> None:
+    calls = 0
+
+    async def fetch() -> str:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def scenario() -> list[tuple[str, bool]]:
+        group: SingleFlight[str] = SingleFlight()
+        results = await asyncio.gather(*(group.do("key", fetch) for _ in range(5)))
+        stats = group.stats()
+        assert (stats.leaders, stats.followers, stats.in_flight) == (1, 4, 0)
+        return results
+
+    results = asyncio.run(scenario())
+
+    assert calls == 1
+    assert [result for result, _ in results] == ["result"] * 5
+    assert [leader for _, leader in results] == [True, False, False, False, False]
+
+
+def test_different_keys_run_separately() -> None:
+    async def scenario() -> list[tuple[int, bool]]:
+        group: SingleFlight[int] = SingleFlight()
+
+        async def value(number: int) -> int:
+            await asyncio.sleep(0)
+            return number
+
+        return await asyncio.gather(group.do(1, lambda: value(1)), group.do(2, lambda: value(2)))
+
+    assert asyncio.run(scenario()) == [(1, True), (2, True)]
+
+
+def test_followers_receive_the_exception() -> None:
+    async def fail() -> None:
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def scenario() -> list[object]:
+        group: SingleFlight[None] = SingleFlight()
+        return await asyncio.gather(*(group.do("key", fail) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_cancelled_follower_does_not_cancel_the_operation() -> None:
+    async def scenario() -> None:
+        group: SingleFlight[str] = SingleFlight()
+        finished = asyncio.Event()
+
+        async def fetch() -> str:
+            await finished.wait()
+            return "result"
+
+        leader = asyncio.create_task(group.do("key", fetch))
+        follower = asyncio.create_task(group.do("key", fetch))
+        await asyncio.sleep(0)
+        follower.cancel()
+        await asyncio.sleep(0)
+        finished.set()
+
+        assert await leader == ("result", True)
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+
+    asyncio.run(scenario())
+
+
+def test_operation_cancelled_when_every_caller_left() -> None:
+    async def scenario() -> None:
+        group: SingleFlight[None] = SingleFlight()
+        cancelled = asyncio.Event()
+
+        async def fetch() -> None:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        caller = asyncio.create_task(group.do("key", fetch))
+        await asyncio.sleep(0)
+        caller.cancel()
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+        await asyncio.sleep(0)
+        assert group.stats().in_flight == 0
+
+    asyncio.run(scenario())
@@ -9,6 +9,7 @@ import RefreshIcon from '@mui/icons-material/Refresh';
 import HomeIcon from '@mui/icons-material/Home';
 
 interface GenerativeDetails {
+  id?: number;
   userPrefferences: string;
   rawComponent?: string;
   generatedPrompt?: string;
@@ -28,9 +29,35 @@ function App() {
   const retryCountRef = useRef(0); // Track retry attempts
   const [showPrompt, setShowPrompt] = useState(false); // State to toggle prompt visibility
 
+  const reportedIdsRef = useRef<Set<number>>(new Set()); // Components whose render outcome was sent
+
+  // Tell the backend whether the component rendered, once per component;
+  // the outcomes steer which prompt variants are used for later generations
+  const reportFeedback = useCallback((componentId: number | undefined, compiled: boolean, errorMessage?: string) => {
+    if (!componentId || reportedIdsRef.current.has(componentId)) {
+      return;
+    }
+    reportedIdsRef.current.add(componentId);
+    fetch(`http://localhost:8000/api/v1/generative/${componentId}/feedback`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ compiled, error: errorMessage?.slice(0, 2000) ?? null }),
+    }).catch((err) => console.error('Failed to send render feedback:', err));
+  }, []);
+
   const LiveErrorCustom = (props) => {
     const { error } = useContext(LiveContext);
 
+    // A component that is still error-free after a second counts as rendered
+    useEffect(() => {
+      if (error) {
+        reportFeedback(data?.id, false, error.toString());
+        return;
+      }
+      const timer = setTimeout(() => reportFeedback(data?.id, true), 1000);
+      return () => clearTimeout(timer);
+    }, [error]);
+
     // Retry up to 3 times before showing the error
     useEffect(() => {
       if (error) {
@@ -56,7 +83,9 @@ function App() {
     return (retryCountRef.current >= 2 && error) ? <span {...props}>{error}</span> : null;
   };
 
-  const handleSubmit = useCallback(async () => {
+  // `fresh` asks the backend for a new variation instead of a cached or
+  // shared result; every regeneration needs one.
+  const handleSubmit = useCallback(async (fresh = false) => {
     console.log("handleSubmit called with personaId:", personaId, "designerId:", designerId);
     
     if (!personaId || !designerId) {  
@@ -69,12 +98,13 @@ function App() {
     
     try {
       setLoading(true);
-      const response = await fetch('http://localhost:8000/api/v1/generative/react', {
+      const response = await fetch('http://localhost:8000/api/v1/generative/react?fields=id,userPrefferences,rawComponent', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ 
           personaId: parseInt(personaId, 10),
-          designerId: parseInt(designerId, 10)
+          designerId: parseInt(designerId, 10),
+          fresh,
         }),
       });
       
@@ -91,6 +121,23 @@ function App() {
     }
   }, [personaId, designerId]);
 
+  // The prompt is left out of the generation response and only loaded when asked for
+  const togglePrompt = useCallback(async () => {
+    setShowPrompt(!showPrompt);
+    if (showPrompt || !data?.id || data.generatedPrompt !== undefined) {
+      return;
+    }
+    try {
+      const response = await fetch(`http://localhost:8000/api/v1/generative/${data.id}?fields=generatedPrompt`);
+      if (response.ok) {
+        const { generatedPrompt } = await response.json();
+        setData((current) => current && current.id === data.id ? { ...current, generatedPrompt } : current);
+      }
+    } catch (err) {
+      console.error('Failed to load the prompt:', err);
+    }
+  }, [showPrompt, data]);
+
   // Handle LivePreview errors
   const handleLiveError = useCallback((errorMessage: string) => {
     console.error(`LivePreview error (after ${retryCountRef.current + 1} attempts):`, errorMessage);
@@ -108,7 +155,7 @@ function App() {
       retryCountRef.current = 0; // Reset retry count for manual regeneration
     }
 
-    handleSubmit();
+    handleSubmit(true);
   }, [handleSubmit]);
 
   useEffect(() => {
@@ -311,7 +358,7 @@ function App() {
           <Box sx={{ mt: 4, textAlign: 'center', display: livePreviewError ? 'none' : 'block' }}>
             <Button
               variant="outlined"
-              onClick={() => setShowPrompt(!showPrompt)}
+              onClick={togglePrompt}
               sx={{
                 fontSize: '1rem',
                 py: 1,